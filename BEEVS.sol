@@ -10,14 +10,17 @@ contract EVoting {
     }
 
     struct Voter {
+        uint256 id;
         bool isRegistered;
-        bool hasVoted;
+        bool hasVoted; // voted for at least one post
+        mapping(uint256 => bool) votedPost; // postId → voted
     }
 
     struct Candidate {
         uint256 id;
         string name;
         uint256 voteCount;
+        uint256 postId; // 0 for candidates added without a post
     }
 
     struct Election {
@@ -27,6 +30,7 @@ contract EVoting {
         uint256 startTime;
         uint256 endTime;
         uint256 candidateCount;
+        uint256 voterCount;
         mapping(uint256 => Candidate) candidates;
         mapping(bytes32 => Voter) voters; // voterIdHash → Voter
     }
@@ -37,12 +41,13 @@ contract EVoting {
     // EVENTS (These give you auditability on-chain)
     event ElectionCreated(uint256 indexed electionId, string name);
     event CandidateAdded(uint256 indexed electionId, uint256 candidateId, string name);
-    event VoterRegistered(uint256 indexed electionId, bytes32 indexed voterIdHash);
+    event VoterRegistered(uint256 indexed electionId, bytes32 indexed voterIdHash, uint256 voterId);
     event VoteCast(
         uint256 indexed electionId,
         bytes32 indexed voterIdHash,
         uint256 indexed candidateId
     );
+    event BallotCast(uint256 indexed electionId, bytes32 indexed voterIdHash, uint256 voteCount);
 
     constructor() {
         owner = msg.sender;
@@ -77,14 +82,34 @@ contract EVoting {
         Election storage e = elections[_electionId];
         require(e.id != 0, "Election not found");
 
+        _addCandidate(e, _electionId, 0, _name);
+    }
+
+    function addPostCandidate(
+        uint256 _electionId,
+        uint256 _postId,
+        string memory _name
+    ) external onlyOwner {
+        Election storage e = elections[_electionId];
+        require(e.id != 0, "Election not found");
+        require(_postId != 0, "Invalid post");
+
+        _addCandidate(e, _electionId, _postId, _name);
+    }
+
+    function _addCandidate(
+        Election storage e,
+        uint256 _electionId,
+        uint256 _postId,
+        string memory _name
+    ) private {
         e.candidateCount++;
         uint256 candidateId = e.candidateCount;
 
-        e.candidates[candidateId] = Candidate({
-            id: candidateId,
-            name: _name,
-            voteCount: 0
-        });
+        Candidate storage c = e.candidates[candidateId];
+        c.id = candidateId;
+        c.name = _name;
+        c.postId = _postId;
 
         emit CandidateAdded(_electionId, candidateId, _name);
     }
@@ -95,14 +120,39 @@ contract EVoting {
     ) external onlyOwner {
         Election storage e = elections[_electionId];
         require(e.id != 0, "Election not found");
+        require(!e.voters[voterIdHash].isRegistered, "Voter already registered");
 
-        Voter storage v = e.voters[voterIdHash];
-        require(!v.isRegistered, "Voter already registered");
+        _registerVoter(e, _electionId, voterIdHash);
+    }
+
+    // Batch registration; hashes that are already registered are skipped so one
+    // duplicate does not revert the whole batch
+    function registerVoters(
+        uint256 _electionId,
+        bytes32[] calldata voterIdHashes
+    ) external onlyOwner {
+        Election storage e = elections[_electionId];
+        require(e.id != 0, "Election not found");
 
+        for (uint256 i = 0; i < voterIdHashes.length; i++) {
+            if (!e.voters[voterIdHashes[i]].isRegistered) {
+                _registerVoter(e, _electionId, voterIdHashes[i]);
+            }
+        }
+    }
+
+    function _registerVoter(
+        Election storage e,
+        uint256 _electionId,
+        bytes32 voterIdHash
+    ) private {
+        e.voterCount++;
+
+        Voter storage v = e.voters[voterIdHash];
+        v.id = e.voterCount;
         v.isRegistered = true;
-        v.hasVoted = false;
 
-        emit VoterRegistered(_electionId, voterIdHash);
+        emit VoterRegistered(_electionId, voterIdHash, v.id);
     }
 
     // Backend calls this on behalf of users
@@ -111,20 +161,55 @@ contract EVoting {
         bytes32 voterIdHash,
         uint256 candidateId
     ) external onlyOwner {
+        Election storage e = elections[_electionId];
+        Voter storage v = _openBallot(e, voterIdHash);
+
+        _recordVote(e, v, _electionId, voterIdHash, candidateId);
+    }
+
+    // Whole ballot in one transaction: one candidate per post
+    function castBallot(
+        uint256 _electionId,
+        bytes32 voterIdHash,
+        uint256[] calldata candidateIds
+    ) external onlyOwner {
+        require(candidateIds.length > 0, "Empty ballot");
 
         Election storage e = elections[_electionId];
+        Voter storage v = _openBallot(e, voterIdHash);
+
+        for (uint256 i = 0; i < candidateIds.length; i++) {
+            _recordVote(e, v, _electionId, voterIdHash, candidateIds[i]);
+        }
+
+        emit BallotCast(_electionId, voterIdHash, candidateIds.length);
+    }
+
+    function _openBallot(
+        Election storage e,
+        bytes32 voterIdHash
+    ) private view returns (Voter storage v) {
         require(e.isActive, "Election inactive");
 
         require(block.timestamp >= e.startTime, "Voting not started");
         require(block.timestamp <= e.endTime, "Voting ended");
 
-        Voter storage v = e.voters[voterIdHash];
+        v = e.voters[voterIdHash];
         require(v.isRegistered, "Not registered");
-        require(!v.hasVoted, "Already voted");
+    }
 
+    function _recordVote(
+        Election storage e,
+        Voter storage v,
+        uint256 _electionId,
+        bytes32 voterIdHash,
+        uint256 candidateId
+    ) private {
         Candidate storage c = e.candidates[candidateId];
         require(c.id != 0, "Candidate not found");
+        require(!v.votedPost[c.postId], "Already voted");
 
+        v.votedPost[c.postId] = true;
         v.hasVoted = true;
         c.voteCount++;
 
@@ -144,6 +229,30 @@ contract EVoting {
         return (c.name, c.voteCount);
     }
 
+    // Batched read for results pages: one eth_call instead of one per candidate
+    function getCandidates(
+        uint256 electionId,
+        uint256[] calldata candidateIds
+    ) external view returns (string[] memory names, uint256[] memory votes) {
+        Election storage e = elections[electionId];
+        names = new string[](candidateIds.length);
+        votes = new uint256[](candidateIds.length);
+
+        for (uint256 i = 0; i < candidateIds.length; i++) {
+            Candidate storage c = e.candidates[candidateIds[i]];
+            names[i] = c.name;
+            votes[i] = c.voteCount;
+        }
+    }
+
+    function hasVotedForPost(
+        uint256 electionId,
+        bytes32 voterIdHash,
+        uint256 postId
+    ) external view returns (bool) {
+        return elections[electionId].voters[voterIdHash].votedPost[postId];
+    }
+
     function getElectionMeta(
         uint256 electionId
     ) external view returns (
@@ -0,0 +1,11 @@
+// Stored photos are served from /media/<sha256>.<ext>, with resized variants at
+// /media/<sha256>_<size>.webp and .jpg (see IMAGE_VARIANT_SIZES on the server).
+const MEDIA_NAME = /\/media\/([0-9a-f]{64})\.(png|jpg)$/
+
+// URL of a resized variant of a stored image. Older /static/images URLs have
+// no variants, so they are returned unchanged.
+export function variantUrl(imageUrl, size, format = 'webp') {
+  const match = MEDIA_NAME.exec(imageUrl || '')
+  if (!match) return imageUrl
+  return imageUrl.slice(0, match.index) + `/media/${match[1]}_${size}.${format}`
+}
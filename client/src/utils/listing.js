@@ -0,0 +1,12 @@
+// List endpoints (elections, voters, institutional records) return one page at
+// a time, LIST_PAGE_DEFAULT_SIZE rows unless ?limit= is given, and next_cursor
+// for the following page (null on the last one). ?fields= selects columns; id
+// is always included. See beevs/listing.py on the server.
+export function listUrl(path, { fields, limit, cursor } = {}) {
+  const params = new URLSearchParams()
+  if (fields && fields.length) params.set('fields', fields.join(','))
+  if (limit) params.set('limit', String(limit))
+  if (cursor !== null && cursor !== undefined) params.set('cursor', String(cursor))
+  const query = params.toString()
+  return query ? `${path}?${query}` : path
+}
@@ -4,29 +4,59 @@ from flask_bcrypt import Bcrypt
 from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
+from werkzeug.middleware.proxy_fix import ProxyFix
 from datetime import timedelta
 
-from beevs.response import APIResponse
+from beevs.response import APIResponse, json_serializer
 from beevs.config import Config
+from beevs.face import FaceEngine
+from beevs.contract import contract_services
+from beevs.cache import response_cache
 
 db = SQLAlchemy()
 bcrypt = Bcrypt()
 jwt = JWTManager()
+face_engine = FaceEngine()
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
+    if app.config['TRUSTED_PROXIES']:
+        # request.remote_addr (the login limiter's key) is the client, not the proxy
+        proxies = app.config['TRUSTED_PROXIES']
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies, x_proto=proxies)
+    json_serializer.init_app(app)
     
     db.init_app(app)
     bcrypt.init_app(app)
     jwt.init_app(app)
     CORS(app)
     Migrate(app, db)
+    face_engine.init_app(app)
+    contract_services.init_app(app)
+    response_cache.init_app(app)
 
     @app.route('/api/v1', strict_slashes=False)
     def home():
         return APIResponse.success(message="Welcome to BEEVS API v1")
 
+    from beevs.relayer import relayer
+    relayer.init_app(app)
+    from beevs.live import results_publisher
+    results_publisher.init_app(app)
+    from beevs.imports import import_jobs
+    import_jobs.init_app(app)
+    from beevs.images import image_store
+    image_store.init_app(app)
+    from beevs.ballots import ballot_guard
+    ballot_guard.init_app(app)
+    from beevs.passwords import password_hasher, login_limiter
+    password_hasher.init_app(app)
+    login_limiter.init_app(app)
+    # Tokens are parsed into a Principal once per request (see beevs.identity)
+    from beevs.identity import load_principal
+    jwt.user_lookup_loader(load_principal)
+
     with app.app_context():
         import beevs.error_handlers
         import beevs.endpoints
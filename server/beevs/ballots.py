@@ -0,0 +1,171 @@
+"""
+Duplicate-vote guard for the BEEVS application
+
+A ballot is one castBallot outbox transaction plus one audit Vote row per
+selected candidate. Two layers keep a voter to one ballot per election:
+
+- the schema: a unique partial index on outbox_transactions
+  (election_id, voter_id) WHERE action = 'vote' AND status <> 'failed'. Two
+  racing cast_vote requests can both pass the "has voted" check, but only
+  one of them can commit; the other gets the usual "already voted" error
+  from cast_ballot
+- a per-election bitmap of voter ids known to have voted, kept in each web
+  process. It is loaded with one query the first time an election is
+  checked and updated as ballots are cast, so repeated attempts by a voter
+  who has already voted (the common rejection at the kiosk) are answered
+  without a database round trip. Only positives are trusted: a voter that is
+  not in the bitmap is still checked against the votes table, since another
+  process may have taken the ballot.
+
+A ballot whose castBallot transaction failed does not count: the voter may
+vote again. The relayer drops the voter from its own process's bitmap when it
+marks the ballot failed (ballot_failed); other processes reload an election's
+bitmap every BALLOT_BITMAP_TTL seconds, so they let the voter in again within
+that time.
+"""
+
+import threading
+import time
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from beevs import db
+from beevs.models import Vote, Voter
+from beevs.relayer import relayer
+from beevs.exceptions import ValidationError
+from beevs import tallies
+
+
+class VoterBitmap:
+    """Set of voter ids as a bit array offset by the election's smallest voter id"""
+
+    def __init__(self, base=0):
+        self.base = base
+        self.bits = bytearray()
+        # ids below base (only possible if voters are re-keyed) fall back to a plain set
+        self.below = set()
+
+    def add(self, voter_id):
+        offset = voter_id - self.base
+        if offset < 0:
+            self.below.add(voter_id)
+            return
+        index = offset >> 3
+        if index >= len(self.bits):
+            self.bits.extend(bytes(max(index + 1 - len(self.bits), len(self.bits))))
+        self.bits[index] |= 1 << (offset & 7)
+
+    def discard(self, voter_id):
+        offset = voter_id - self.base
+        if offset < 0:
+            self.below.discard(voter_id)
+        elif (offset >> 3) < len(self.bits):
+            self.bits[offset >> 3] &= ~(1 << (offset & 7)) & 0xFF
+
+    def __contains__(self, voter_id):
+        offset = voter_id - self.base
+        if offset < 0:
+            return voter_id in self.below
+        index = offset >> 3
+        return index < len(self.bits) and bool(self.bits[index] & (1 << (offset & 7)))
+
+
+def already_voted_error():
+    return ValidationError(message='You have already voted in this election', status_code=400)
+
+
+class BallotGuard:
+    def __init__(self, app=None):
+        self.enabled = True
+        self.ttl = 60.0
+        self._bitmaps = {}  # election id -> (VoterBitmap, monotonic load time)
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('BALLOT_BITMAP', self.enabled)
+        self.ttl = app.config.get('BALLOT_BITMAP_TTL', self.ttl)
+        app.extensions['ballot_guard'] = self
+
+    def _fresh(self, entry):
+        return entry is not None and time.monotonic() - entry[1] < self.ttl
+
+    def _bitmap(self, election_id):
+        entry = self._bitmaps.get(election_id)
+        if self._fresh(entry):
+            return entry[0]
+        with self._lock:
+            entry = self._bitmaps.get(election_id)
+            if not self._fresh(entry):
+                base = db.session.query(func.min(Voter.id)).filter(Voter.election_id == election_id).scalar() or 0
+                bitmap = VoterBitmap(base)
+                voted = db.session.query(Vote.voter_id).filter(
+                    Vote.election_id == election_id, Vote.action == 'vote', Vote.status != 'failed', Vote.voter_id.isnot(None)
+                ).distinct()
+                for (voter_id,) in voted:
+                    bitmap.add(voter_id)
+                entry = self._bitmaps[election_id] = (bitmap, time.monotonic())
+        return entry[0]
+
+    def has_voted(self, election_id, voter_id):
+        """Whether the voter has a live ballot in the election; known voters skip the database"""
+        if self.enabled and voter_id in self._bitmap(election_id):
+            return True
+        voted = Vote.query.filter(
+            Vote.election_id == election_id, Vote.voter_id == voter_id, Vote.action == 'vote', Vote.status != 'failed'
+        ).first() is not None
+        if voted:
+            self.mark(election_id, voter_id)
+        return voted
+
+    def mark(self, election_id, voter_id):
+        if self.enabled:
+            with self._lock:
+                entry = self._bitmaps.get(election_id)
+                if entry is not None:
+                    entry[0].add(voter_id)
+
+    def forget(self, election_id, voter_id):
+        """Drop a deleted voter, so a reused id is not taken for a voter who has voted"""
+        with self._lock:
+            entry = self._bitmaps.get(election_id)
+            if entry is not None:
+                entry[0].discard(voter_id)
+
+    def ballot_failed(self, election_id, voter_id):
+        """The voter's castBallot failed; let them vote again"""
+        self.forget(election_id, voter_id)
+
+    def cast_ballot(self, election_id, voter_id, candidates, args):
+        """Queue castBallot with its audit Vote rows and tally updates, and commit.
+
+        Returns the outbox transaction. Raises the "already voted" ValidationError
+        when the voter's ballot was taken first, including by a concurrent request.
+        """
+        try:
+            tx = relayer.enqueue('castBallot', args, action='vote', election_id=election_id, voter_id=voter_id)
+            for candidate in candidates:
+                # record one audit Vote per selection, all tracking the same transaction
+                db.session.add(Vote(
+                    election_id=election_id,
+                    voter_id=voter_id,
+                    candidate_id=candidate.id,
+                    action='vote',
+                    status='pending',
+                    outbox=tx
+                ))
+            # the unique ballot index is hit here, before any counter moves
+            db.session.flush()
+            # live counters move in the same transaction as the Vote rows
+            tallies.record_ballot(election_id, candidates)
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            if self.has_voted(election_id, voter_id):
+                raise already_voted_error()
+            raise
+        self.mark(election_id, voter_id)
+        return tx
+
+
+ballot_guard = BallotGuard()
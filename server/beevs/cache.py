@@ -0,0 +1,214 @@
+"""
+Response cache for the BEEVS application
+
+Public, read-mostly GET endpoints (election results, post listings) are
+cached as serialized JSON bodies together with an ETag, keyed by namespace,
+election id and query string. Every key also carries the election's
+generation number; mutating endpoints call response_cache.invalidate(election_id)
+after committing, which bumps the generation so older entries are never read
+again and simply age out.
+
+Backends:
+- MemoryBackend: in-process LRU with TTL (default). Invalidations only reach
+  the worker that made them; other workers serve at most TTL-old data.
+- RedisBackend: shared across workers, selected with a redis:// URL in
+  RESPONSE_CACHE_BACKEND. Needs the optional `redis` package.
+
+Requests with a matching If-None-Match get a 304 straight from the stored
+ETag, without running the view or serializing anything.
+"""
+
+import json
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import request, current_app, make_response
+
+
+class MemoryBackend:
+    """Thread-safe LRU with per-entry TTL. Generations are kept apart so eviction never resets them."""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def generation(self, scope):
+        with self._lock:
+            return self._generations.get(scope, 0)
+
+    def bump(self, scope):
+        with self._lock:
+            self._generations[scope] = self._generations.get(scope, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+
+
+class RedisBackend:
+    """Shared backend; generations are plain INCR counters, entries expire by TTL."""
+
+    def __init__(self, url, prefix='beevs:cache:'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError('RESPONSE_CACHE_BACKEND points at redis but the redis package is not installed')
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, value, ex=max(int(ttl), 1))
+
+    def generation(self, scope):
+        value = self.client.get(f'{self.prefix}gen:{scope}')
+        return int(value) if value else 0
+
+    def bump(self, scope):
+        self.client.incr(f'{self.prefix}gen:{scope}')
+
+    def clear(self):
+        for key in self.client.scan_iter(self.prefix + '*'):
+            self.client.delete(key)
+
+
+def _pack(etag, body):
+    return etag.encode('ascii') + b'\n' + body
+
+
+def _unpack(value):
+    etag, body = value.split(b'\n', 1)
+    return etag.decode('ascii'), body
+
+
+class ResponseCache:
+    def __init__(self, app=None):
+        self.backend = None
+        self.ttl = 30
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        spec = (app.config.get('RESPONSE_CACHE_BACKEND') or 'memory').strip()
+        self.ttl = app.config.get('RESPONSE_CACHE_TTL', 30)
+        if spec == 'none':
+            self.backend = None
+        elif spec.startswith('redis://') or spec.startswith('rediss://'):
+            self.backend = RedisBackend(spec)
+        else:
+            self.backend = MemoryBackend(app.config.get('RESPONSE_CACHE_MAX_ENTRIES', 1024))
+        app.extensions['response_cache'] = self
+
+    def invalidate(self, election_id):
+        """Drop every cached response of an election (call after committing a change)."""
+        if self.backend is None or election_id is None:
+            return
+        try:
+            self.backend.bump(f'election:{int(election_id)}')
+        except Exception:
+            current_app.logger.exception('Failed to invalidate response cache for election %s', election_id)
+
+    def memoize(self, namespace, election_id, compute, ttl=None):
+        """compute(), cached under the election's generation like a response.
+
+        For small JSON-serializable values derived from an election's rows; they
+        are dropped by the same invalidate() calls as cached responses.
+        """
+        if self.backend is None:
+            return compute()
+        try:
+            key = f"{namespace}:{election_id}:{self.backend.generation(f'election:{election_id}')}"
+            hit = self.backend.get(key)
+        except Exception:
+            current_app.logger.exception('Response cache unavailable')
+            return compute()
+        if hit is not None:
+            return json.loads(hit)
+
+        value = compute()
+        try:
+            self.backend.set(key, json.dumps(value).encode('utf-8'), ttl or self.ttl)
+        except Exception:
+            current_app.logger.exception('Failed to store cached value')
+        return value
+
+    def _key(self, namespace, election_id):
+        generation = self.backend.generation(f'election:{election_id}')
+        params = '&'.join(f'{k}={v}' for k, v in sorted(request.args.items(multi=True)))
+        return f'{namespace}:{election_id}:{generation}:{params}'
+
+    def cached(self, namespace, ttl=None):
+        """Cache a GET view taking an election_id view argument, with ETag revalidation.
+
+        Only 200 responses are stored.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if self.backend is None:
+                    return view(*args, **kwargs)
+
+                election_id = kwargs.get('election_id')
+                try:
+                    key = self._key(namespace, election_id)
+                    hit = self.backend.get(key)
+                except Exception:
+                    current_app.logger.exception('Response cache unavailable')
+                    return view(*args, **kwargs)
+
+                if hit is not None:
+                    etag, body = _unpack(hit)
+                    return self._respond(etag, body)
+
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                body = response.get_data()
+                etag = hashlib.sha1(body).hexdigest()
+                try:
+                    self.backend.set(key, _pack(etag, body), ttl or self.ttl)
+                except Exception:
+                    current_app.logger.exception('Failed to store cached response')
+                return self._respond(etag, body, response)
+            return wrapper
+        return decorator
+
+    @staticmethod
+    def _respond(etag, body, response=None):
+        if etag in request.if_none_match:
+            response = current_app.response_class(status=304)
+        elif response is None:
+            response = current_app.response_class(body, status=200, mimetype='application/json')
+        response.set_etag(etag)
+        # Clients may keep the body but must revalidate; unchanged results cost a 304
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+
+response_cache = ResponseCache()
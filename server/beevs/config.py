@@ -19,4 +19,57 @@ class Config:
     CONTRACT_ABI_PATH = os.getenv("CONTRACT_ABI_PATH")
     RELAYER_PRIVATE_KEY = os.getenv("RELAYER_PRIVATE_KEY")
     CHAIN_ID = int(os.getenv("CHAIN_ID", "1"))
-    TX_CONFIRMATIONS = int(os.getenv("TX_CONFIRMATIONS", "1"))
\ No newline at end of file
+    TX_CONFIRMATIONS = int(os.getenv("TX_CONFIRMATIONS", "1"))
+    WEB3_POOL_SIZE = int(os.getenv("WEB3_POOL_SIZE", "10"))  # keep-alive connections to the RPC node
+    WEB3_REQUEST_TIMEOUT = float(os.getenv("WEB3_REQUEST_TIMEOUT", "10"))
+    TALLY_CHUNK_SIZE = int(os.getenv("TALLY_CHUNK_SIZE", "200"))  # candidate ids per getCandidates call
+    FACE_MODEL_NAME = os.getenv("FACE_MODEL_NAME", "ArcFace")
+    FACE_DETECTOR_BACKEND = os.getenv("FACE_DETECTOR_BACKEND", "retinaface")
+    FACE_DISTANCE_THRESHOLD = float(os.getenv("FACE_DISTANCE_THRESHOLD", "0.68"))  # DeepFace's ArcFace/cosine threshold
+    FACE_PRELOAD = os.getenv("FACE_PRELOAD", "false").lower() == "true"  # load the models in create_app; run.py and wsgi.py turn it on for processes that serve requests
+    FACE_POOL_WORKERS = int(os.getenv("FACE_POOL_WORKERS", "2"))  # 0 runs inference on the request thread
+    FACE_QUEUE_SIZE = int(os.getenv("FACE_QUEUE_SIZE", "8"))  # requests allowed to wait for a busy pool
+    FACE_TIMEOUT = float(os.getenv("FACE_TIMEOUT", "20"))
+    FACE_MAX_IMAGE_SIDE = int(os.getenv("FACE_MAX_IMAGE_SIDE", "640"))  # live captures are downscaled to this before detection
+    FACE_BATCH_SIZE = int(os.getenv("FACE_BATCH_SIZE", "16"))  # reference photos per recognizer forward pass
+    RELAYER_BACKGROUND = os.getenv("RELAYER_BACKGROUND", "true").lower() == "true"  # run the relayer thread inside web workers
+    RELAYER_BATCH_SIZE = int(os.getenv("RELAYER_BATCH_SIZE", "20"))
+    RELAYER_POLL_INTERVAL = float(os.getenv("RELAYER_POLL_INTERVAL", "2"))
+    RELAYER_RESUBMIT_AFTER = int(os.getenv("RELAYER_RESUBMIT_AFTER", "300"))  # seconds before a vanished tx is rebroadcast
+    VOTER_BATCH_MAX_SIZE = int(os.getenv("VOTER_BATCH_MAX_SIZE", "500"))  # voters per registerVoters tx, upper bound
+    VOTER_BATCH_GAS_TARGET = int(os.getenv("VOTER_BATCH_GAS_TARGET", "10000000"))  # batches are sized to stay under this
+    VOTER_BATCH_LINGER = float(os.getenv("VOTER_BATCH_LINGER", "5"))  # wait for new voters to stop arriving before batching
+    VOTER_REGISTRATION_MAX_ATTEMPTS = int(os.getenv("VOTER_REGISTRATION_MAX_ATTEMPTS", "3"))  # failed registerVoters batches before a voter is given up on
+    RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory")  # memory, none or a redis:// URL
+    RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "30"))
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+    LIVE_RESULTS_INTERVAL = float(os.getenv("LIVE_RESULTS_INTERVAL", "2"))  # seconds between tally checks per watched election
+    LIVE_RESULTS_KEEPALIVE = float(os.getenv("LIVE_RESULTS_KEEPALIVE", "15"))  # idle seconds before a stream sends a keepalive comment
+    LIST_PAGE_DEFAULT_SIZE = int(os.getenv("LIST_PAGE_DEFAULT_SIZE", "100"))  # rows per page when ?limit= is not given
+    LIST_PAGE_MAX_SIZE = int(os.getenv("LIST_PAGE_MAX_SIZE", "1000"))  # cap on ?limit=
+    INGEST_CHUNK_SIZE = int(os.getenv("INGEST_CHUNK_SIZE", "5000"))  # CSV rows validated and inserted per statement/commit
+    INGEST_MAX_ERRORS = int(os.getenv("INGEST_MAX_ERRORS", "1000"))  # row errors returned in an upload summary
+    IMPORT_WORKERS = int(os.getenv("IMPORT_WORKERS", "2"))  # background import threads per web process; 0 imports inside the request
+    IMPORT_SPOOL_DIR = os.getenv("IMPORT_SPOOL_DIR", "")  # where uploads wait for their job; defaults to <instance>/import_spool
+    IMPORT_STALE_AFTER = int(os.getenv("IMPORT_STALE_AFTER", "300"))  # seconds without progress before a running job is taken over
+    IMPORT_ERROR_SAMPLES = int(os.getenv("IMPORT_ERROR_SAMPLES", "50"))  # row errors kept on a job
+    ENROLL_LOOKUP_CHUNK = int(os.getenv("ENROLL_LOOKUP_CHUNK", "1000"))  # registration numbers per record lookup in bulk enrollment
+    ENROLL_MAX_PHOTO_BYTES = int(os.getenv("ENROLL_MAX_PHOTO_BYTES", str(10 * 1024 * 1024)))  # uncompressed size limit per photo in a bulk zip
+    IMAGE_STORE_DIR = os.getenv("IMAGE_STORE_DIR", "")  # content-addressed photo store; defaults to <instance>/images
+    IMAGE_VARIANT_SIZES = os.getenv("IMAGE_VARIANT_SIZES", "96,256")  # longest side of the WebP/JPEG variants made for each photo
+    IMAGE_VARIANT_QUALITY = int(os.getenv("IMAGE_VARIANT_QUALITY", "80"))
+    IMAGE_CACHE_MAX_AGE = int(os.getenv("IMAGE_CACHE_MAX_AGE", str(365 * 24 * 3600)))  # media names are content hashes, so responses never go stale
+    IMAGE_ACCEL_REDIRECT = os.getenv("IMAGE_ACCEL_REDIRECT", "")  # nginx internal location aliased to IMAGE_STORE_DIR; empty serves files from Flask
+    USE_X_SENDFILE = os.getenv("USE_X_SENDFILE", "false").lower() == "true"  # Flask's X-Sendfile for Apache/lighttpd
+    BALLOT_BITMAP = os.getenv("BALLOT_BITMAP", "true").lower() == "true"  # remember voters who have voted in memory so repeat attempts skip the database
+    BALLOT_BITMAP_TTL = float(os.getenv("BALLOT_BITMAP_TTL", "60"))  # reload an election's bitmap after this many seconds, dropping failed ballots
+    BCRYPT_LOG_ROUNDS = int(os.getenv("BCRYPT_LOG_ROUNDS", "12"))  # admin password cost; hashes with another cost are rehashed at their next login
+    BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", "2"))  # password check threads per web process; 0 checks on the request thread
+    BCRYPT_QUEUE_SIZE = int(os.getenv("BCRYPT_QUEUE_SIZE", "8"))  # logins allowed to wait for a busy pool before a 503
+    BCRYPT_TIMEOUT = float(os.getenv("BCRYPT_TIMEOUT", "10"))
+    LOGIN_LIMIT_WINDOW = int(os.getenv("LOGIN_LIMIT_WINDOW", "300"))  # seconds per login rate window
+    LOGIN_IP_LIMIT = int(os.getenv("LOGIN_IP_LIMIT", "30"))  # login attempts per client address per window; 0 disables
+    LOGIN_EMAIL_LIMIT = int(os.getenv("LOGIN_EMAIL_LIMIT", "5"))  # failed logins per email per window; 0 disables
+    LOGIN_LIMITER_MAX_KEYS = int(os.getenv("LOGIN_LIMITER_MAX_KEYS", "10000"))  # addresses and emails tracked per process
+    TRUSTED_PROXIES = int(os.getenv("TRUSTED_PROXIES", "0"))  # reverse proxies in front of the app; their X-Forwarded-For/-Proto give the client address
+    JSON_SERIALIZER = os.getenv("JSON_SERIALIZER", "auto")  # auto (orjson when installed), orjson or json
\ No newline at end of file
@@ -1,14 +1,144 @@
 import json
+import logging
 import os
 import time
+import threading
+from collections import Counter
+from functools import lru_cache
 from typing import Any, Dict, Optional, Sequence
 
-from web3 import Web3
-from web3.exceptions import TransactionNotFound
+import requests
+from requests.adapters import HTTPAdapter
+from flask import g, has_request_context
+from web3 import Web3, HTTPProvider
+from web3.middleware import construct_simple_cache_middleware
+from web3.exceptions import TransactionNotFound, ContractLogicError, BadFunctionCallOutput
 from eth_account import Account
 
 from beevs.config import Config
 
+logger = logging.getLogger(__name__)
+
+
+# JSON-RPC calls made by this process, by method; per-request counts live on flask.g
+rpc_calls = Counter()
+_rpc_calls_lock = threading.Lock()
+
+
+def record_rpc_call(method: str) -> None:
+    with _rpc_calls_lock:
+        rpc_calls[method] += 1
+    if has_request_context():
+        g.rpc_calls = g.get('rpc_calls', 0) + 1
+
+
+def rpc_call_counts() -> Dict[str, int]:
+    with _rpc_calls_lock:
+        return dict(rpc_calls)
+
+
+class PooledHTTPProvider(HTTPProvider):
+    """HTTPProvider that posts through one shared keep-alive session.
+
+    web3's own session cache is per thread, so every request thread would open
+    its own connections. This provider also counts calls (record_rpc_call) and
+    flags itself as failed on connection errors so the factory can rebuild it.
+    """
+
+    def __init__(self, endpoint_uri: str, session: requests.Session, request_kwargs: Optional[Any] = None) -> None:
+        super().__init__(endpoint_uri, request_kwargs=request_kwargs)
+        self.session = session
+        self.failed = False
+
+    def make_request(self, method, params):
+        record_rpc_call(method)
+        request_data = self.encode_rpc_request(method, params)
+        try:
+            response = self.session.post(self.endpoint_uri, data=request_data, **self.get_request_kwargs())
+            response.raise_for_status()
+        except (requests.ConnectionError, requests.Timeout):
+            self.failed = True
+            raise
+        return self.decode_rpc_response(response.content)
+
+
+def pooled_session(pool_size: int) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+@lru_cache(maxsize=8)
+def load_abi(path: str) -> Any:
+    """Load an ABI from a filepath or a JSON string/artifact, parsed once per process.
+
+    The function returns the ABI list suitable for passing to web3.eth.contract.
+    It will raise a ValueError if it cannot find a valid ABI list. The list is
+    shared; do not mutate it.
+    """
+    if os.path.exists(path):
+        with open(path, 'r') as fh:
+            parsed = json.load(fh)
+    else:
+        parsed = json.loads(path)
+
+    # If it's a compiled artifact with an 'abi' key, return that
+    if isinstance(parsed, dict):
+        if 'abi' in parsed and isinstance(parsed['abi'], list):
+            return parsed['abi']
+        if 'data' in parsed and isinstance(parsed['data'], dict) and 'abi' in parsed['data'] and isinstance(parsed['data']['abi'], list):
+            return parsed['data']['abi']
+        raise ValueError('ABI JSON does not contain an "abi" list')
+
+    if isinstance(parsed, list):
+        return parsed
+
+    raise ValueError('Invalid ABI content')
+
+
+def _abi_type(param: Dict[str, Any]) -> str:
+    if param['type'].startswith('tuple'):
+        return '(' + ','.join(_abi_type(c) for c in param['components']) + ')' + param['type'][len('tuple'):]
+    return param['type']
+
+
+def missing_selectors(artifact: Dict[str, Any]) -> list:
+    """ABI functions whose selector the artifact's deployed bytecode never dispatches.
+
+    solc's dispatcher compares the calldata selector against a PUSH4 of each
+    external function's selector, so an ABI entry without that PUSH4 was not
+    compiled into the bytecode (the ABI was edited without recompiling
+    BEEVS.sol). Returns the signatures; empty when ABI and bytecode agree.
+    """
+    data = artifact.get('data', artifact)
+    abi = artifact.get('abi') or data.get('abi') or []
+    return missing_functions(abi, data['deployedBytecode']['object'])
+
+
+def missing_functions(abi: Sequence[Dict[str, Any]], code: str) -> list:
+    """Signatures of the ABI functions that runtime bytecode (hex) does not dispatch."""
+    code = code.lower()
+    if code.startswith('0x'):
+        code = code[2:]
+    missing = []
+    for entry in abi:
+        if entry.get('type') != 'function':
+            continue
+        signature = f"{entry['name']}({','.join(_abi_type(p) for p in entry.get('inputs', []))})"
+        selector = Web3.keccak(text=signature)[:4].hex().replace('0x', '')
+        if not any(i % 2 == 0 for i in _find_all(code, '63' + selector)):
+            missing.append(signature)
+    return missing
+
+
+def _find_all(text: str, needle: str):
+    start = text.find(needle)
+    while start != -1:
+        yield start
+        start = text.find(needle, start + 1)
+
 
 class ContractService:
     """ContractService encapsulates web3.py interactions for EVoting.
@@ -27,6 +157,7 @@ class ContractService:
         abi_path: Optional[str] = None,
         private_key: Optional[str] = None,
         chain_id: Optional[int] = None,
+        session: Optional[requests.Session] = None,
     ) -> None:
         provider_url = provider_url or Config.WEB3_PROVIDER_URL
         contract_address = contract_address or Config.CONTRACT_ADDRESS
@@ -37,7 +168,19 @@ class ContractService:
         if not provider_url:
             raise RuntimeError("WEB3 provider URL is not configured")
 
-        self.w3 = Web3(Web3.HTTPProvider(provider_url))
+        # Standalone services get their own pooled session; the app-scoped one
+        # (see ContractServiceFactory) shares a single session across threads
+        self.provider = PooledHTTPProvider(
+            provider_url,
+            session or pooled_session(Config.WEB3_POOL_SIZE),
+            request_kwargs={'timeout': Config.WEB3_REQUEST_TIMEOUT}
+        )
+        self.w3 = Web3(self.provider)
+        # web3 asks for eth_chainId while filling in every call/tx; it cannot change under a live provider
+        self.w3.middleware_onion.add(
+            construct_simple_cache_middleware(rpc_whitelist=('eth_chainId', 'net_version')),
+            name='chain_id_cache'
+        )
         if not self.w3.is_connected():
             raise RuntimeError(f"Unable to connect to WEB3 provider at {provider_url}")
 
@@ -75,30 +218,17 @@ class ContractService:
         if self.contract_address and self.abi:
             self._contract = self.w3.eth.contract(address=self.contract_address, abi=self.abi)
 
-    def _load_abi(self, path: str) -> Any:
-        """Load an ABI from a filepath or a JSON string/artifact.
-
-        The function returns the ABI list suitable for passing to web3.eth.contract.
-        It will raise a ValueError if it cannot find a valid ABI list.
-        """
-        if os.path.exists(path):
-            with open(path, 'r') as fh:
-                parsed = json.load(fh)
-        else:
-            parsed = json.loads(path)
+        # False once the deployed contract turns out to predate the getCandidates view
+        self.has_get_candidates = True
+        self._deployed_missing = None
 
-        # If it's a compiled artifact with an 'abi' key, return that
-        if isinstance(parsed, dict):
-            if 'abi' in parsed and isinstance(parsed['abi'], list):
-                return parsed['abi']
-            if 'data' in parsed and isinstance(parsed['data'], dict) and 'abi' in parsed['data'] and isinstance(parsed['data']['abi'], list):
-                return parsed['data']['abi']
-            raise ValueError('ABI JSON does not contain an "abi" list')
-
-        if isinstance(parsed, list):
-            return parsed
+    def _load_abi(self, path: str) -> Any:
+        """Load an ABI from a filepath or a JSON string/artifact (cached, see load_abi)."""
+        return load_abi(path)
 
-        raise ValueError('Invalid ABI content')
+    @property
+    def healthy(self) -> bool:
+        return not self.provider.failed
 
     def get_contract(self):
         if not self._contract:
@@ -107,11 +237,82 @@ class ContractService:
             self._contract = self.w3.eth.contract(address=self.contract_address, abi=self.abi)
         return self._contract
 
+    def deployed_missing_functions(self) -> list:
+        """ABI functions the contract at contract_address does not implement.
+
+        Read from the deployed code once per service: a contract deployed from an
+        artifact whose ABI was edited without recompiling reverts these calls.
+        """
+        if self._deployed_missing is None:
+            self.get_contract()
+            code = self.w3.eth.get_code(self.contract_address)
+            if not code:
+                raise RuntimeError(f"No contract code at {self.contract_address}")
+            self._deployed_missing = missing_functions(self.abi, self.w3.to_hex(code))
+        return self._deployed_missing
+
+    def implements(self, function_name: str) -> bool:
+        """Whether the deployed contract has the ABI function (any overload) named function_name."""
+        return not any(sig.startswith(function_name + '(') for sig in self.deployed_missing_functions())
+
     def call(self, method_name: str, *args):
         contract = self.get_contract()
         method = getattr(contract.functions, method_name)
         return method(*args).call()
 
+    def get_candidate_votes(self, election_id: int, candidate_ids: Sequence[int], chunk_size: Optional[int] = None) -> Dict[int, int]:
+        """Vote counts for many candidates in one or a few round-trips.
+
+        Uses the getCandidates view, one eth_call per chunk of ids. Contracts
+        deployed before getCandidates existed are read with a single JSON-RPC
+        batch of getCandidate calls instead.
+        """
+        ids = [int(cid) for cid in candidate_ids]
+        if not ids:
+            return {}
+        chunk_size = chunk_size or Config.TALLY_CHUNK_SIZE
+
+        if not self.has_get_candidates:
+            return self._batch_get_candidate_votes(int(election_id), ids)
+
+        votes: Dict[int, int] = {}
+        try:
+            for start in range(0, len(ids), chunk_size):
+                chunk = ids[start:start + chunk_size]
+                _, counts = self.call('getCandidates', int(election_id), chunk)
+                votes.update(zip(chunk, (int(c) for c in counts)))
+        except (ContractLogicError, BadFunctionCallOutput) as e:
+            # remembered for the life of this service so later reads skip the failed probe
+            self.has_get_candidates = False
+            logger.warning('getCandidates failed on the contract at %s (%s); reading tallies with batched getCandidate calls',
+                           self.contract_address, e)
+            votes = self._batch_get_candidate_votes(int(election_id), ids)
+        return votes
+
+    def _batch_get_candidate_votes(self, election_id: int, ids: Sequence[int]) -> Dict[int, int]:
+        contract = self.get_contract()
+        payload = [{
+            'jsonrpc': '2.0',
+            'id': n,
+            'method': 'eth_call',
+            'params': [{'to': self.contract_address, 'data': contract.encodeABI(fn_name='getCandidate', args=[election_id, cid])}, 'latest'],
+        } for n, cid in enumerate(ids)]
+
+        # web3 v6 has no batch API; post the batch through the provider's pooled session
+        record_rpc_call('eth_call_batch')
+        response = self.provider.session.post(self.provider.endpoint_uri, data=json.dumps(payload), **self.provider.get_request_kwargs())
+        response.raise_for_status()
+        replies = {item['id']: item for item in response.json()}
+
+        votes: Dict[int, int] = {}
+        for n, cid in enumerate(ids):
+            reply = replies.get(n) or {}
+            if 'error' in reply or not reply.get('result'):
+                raise RuntimeError(f"getCandidate({election_id}, {cid}) failed: {reply.get('error')}")
+            _, count = self.w3.codec.decode(['string', 'uint256'], bytes.fromhex(reply['result'][2:]))
+            votes[cid] = int(count)
+        return votes
+
     def _prepare_fees(self, tx: Dict) -> None:
         """Populate EIP-1559 fee fields when supported, otherwise set legacy gasPrice.
 
@@ -163,11 +364,26 @@ class ContractService:
             if 'gasPrice' not in tx:
                 tx['gasPrice'] = self.w3.eth.gas_price
 
-    def build_tx(self, function_name: str, args: Sequence[Any], tx_from: str, gas: Optional[int] = None, gas_price: Optional[int] = None, value: int = 0) -> Dict:
+    def simulate(self, function_name: str, args: Sequence[Any], tx_from: Optional[str] = None):
+        """Dry-run a state-changing call with eth_call so reverts surface before queueing a tx.
+
+        Raises ContractLogicError with the revert reason; nothing is broadcast.
+        """
+        contract = self.get_contract()
+        tx_from = tx_from or self.relayer_address()
+        return getattr(contract.functions, function_name)(*args).call({'from': self.w3.to_checksum_address(tx_from)})
+
+    def relayer_address(self) -> str:
+        if not self.private_key:
+            raise RuntimeError('No private key configured for signing transactions')
+        return Account.from_key(self.private_key).address
+
+    def build_tx(self, function_name: str, args: Sequence[Any], tx_from: str, gas: Optional[int] = None, gas_price: Optional[int] = None, value: int = 0, nonce: Optional[int] = None) -> Dict:
         contract = self.get_contract()
         func = getattr(contract.functions, function_name)(*args)
 
-        nonce = self.w3.eth.get_transaction_count(self.w3.to_checksum_address(tx_from))
+        if nonce is None:
+            nonce = self.w3.eth.get_transaction_count(self.w3.to_checksum_address(tx_from))
 
         tx = func.build_transaction({
             'chainId': self.chain_id,
@@ -189,7 +405,7 @@ class ContractService:
 
         return tx
 
-    def sign_and_send_raw_tx(self, tx: Dict) -> str:
+    def _sign(self, tx: Dict):
         if not self.private_key:
             raise RuntimeError('No private key configured for signing transactions')
 
@@ -200,20 +416,38 @@ class ContractService:
         # Prepare gas pricing (may raise) - let errors propagate
         self._prepare_fees(tx)
 
-        # Sign and send
         signed = Account.sign_transaction(tx, self.private_key)
         # eth-account returns a SignedTransaction object whose raw bytes attribute
         # may be `raw_transaction` (newer versions) or `rawTransaction` (older).
         raw = getattr(signed, 'raw_transaction', None) or getattr(signed, 'rawTransaction', None)
         if raw is None:
             raise RuntimeError('Signed transaction object does not contain raw bytes')
+        return signed.hash, raw
+
+    def sign_and_send_raw_tx(self, tx: Dict) -> str:
+        _, raw = self._sign(tx)
         tx_hash = self.w3.eth.send_raw_transaction(raw)
         return self.w3.to_hex(tx_hash)
 
-    def send_transaction(self, function_name: str, args: Sequence[Any], tx_from: Optional[str] = None, wait_for_receipt: bool = False, timeout: int = 120) -> Dict:
+    def sign_transaction(self, function_name: str, args: Sequence[Any], tx_from: Optional[str] = None, nonce: Optional[int] = None) -> Dict:
+        """Build and sign a tx calling contract.function_name(*args) without broadcasting it.
+
+        Returns {'tx_hash', 'raw_tx'} as hex strings; the hash is known before the
+        node sees the tx, so callers can record it first (see beevs.relayer).
+        """
+        tx_from = tx_from or self.relayer_address()
+        tx_hash, raw = self._sign(self.build_tx(function_name, args, tx_from, nonce=nonce))
+        return {'tx_hash': self.w3.to_hex(tx_hash), 'raw_tx': self.w3.to_hex(raw)}
+
+    def send_raw_transaction(self, raw_tx: str) -> str:
+        """Broadcast an already signed tx (hex); sending the same tx again is harmless."""
+        return self.w3.to_hex(self.w3.eth.send_raw_transaction(raw_tx))
+
+    def send_transaction(self, function_name: str, args: Sequence[Any], tx_from: Optional[str] = None, wait_for_receipt: bool = False, timeout: int = 120, nonce: Optional[int] = None) -> Dict:
         """Build, sign and send a tx calling contract.function_name(*args).
 
         Returns a dict with at least 'tx_hash'. If wait_for_receipt True, returns the receipt under 'receipt'.
+        Pass `nonce` when the caller allocates nonces itself (see beevs.relayer).
         Exceptions are propagated to the caller.
         """
         if not tx_from:
@@ -222,7 +456,7 @@ class ContractService:
             acct = Account.from_key(self.private_key)
             tx_from = acct.address
 
-        tx = self.build_tx(function_name, args, tx_from)
+        tx = self.build_tx(function_name, args, tx_from, nonce=nonce)
 
         tx_hash = self.sign_and_send_raw_tx(tx)
 
@@ -232,6 +466,40 @@ class ContractService:
             result['receipt'] = dict(receipt) if receipt else None
         return result
 
+    def cast_ballot(self, election_id: int, voter_hash: str, candidate_ids: Sequence[int], **kwargs) -> Dict:
+        """Cast a whole ballot (one candidate per post) in a single castBallot transaction.
+
+        Keyword arguments are passed through to send_transaction.
+        """
+        return self.send_transaction('castBallot', ballot_args(election_id, voter_hash, candidate_ids), **kwargs)
+
+    def register_voters(self, election_id: int, voter_hashes: Sequence[str], **kwargs) -> Dict:
+        """Register a batch of voter hashes in a single registerVoters transaction.
+
+        Hashes that are already registered are skipped by the contract. Keyword
+        arguments are passed through to send_transaction.
+        """
+        return self.send_transaction('registerVoters', [int(election_id), list(voter_hashes)], **kwargs)
+
+    def estimate_gas(self, function_name: str, args: Sequence[Any], tx_from: Optional[str] = None) -> int:
+        contract = self.get_contract()
+        tx_from = tx_from or self.relayer_address()
+        return int(getattr(contract.functions, function_name)(*args).estimate_gas({'from': self.w3.to_checksum_address(tx_from)}))
+
+    def voter_batch_size(self, election_id: int, sample_hashes: Sequence[str], gas_target: int, max_size: int) -> int:
+        """Largest registerVoters batch expected to stay under gas_target.
+
+        Uses the marginal gas between a one- and a two-hash estimate, so the
+        sample hashes should be ones that are not registered yet.
+        """
+        if len(sample_hashes) < 2:
+            return max_size
+        one = self.estimate_gas('registerVoters', [int(election_id), list(sample_hashes[:1])])
+        two = self.estimate_gas('registerVoters', [int(election_id), list(sample_hashes[:2])])
+        per_voter = max(two - one, 1)
+        base = max(one - per_voter, 0)
+        return max(1, min(max_size, (int(gas_target) - base) // per_voter))
+
     def wait_for_receipt(self, tx_hash: str, timeout: int = 120, poll_interval: float = 2.0):
         # Use web3.wait_for_transaction_receipt which raises on timeout - propagate that
         return self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=timeout)
@@ -242,5 +510,68 @@ class ContractService:
         Example: compute_voter_hash(['uint256','string'], [election_id, registration_number])
         returns hex string (0x...)
         """
-        h = self.w3.solidity_keccak(list(types), list(values))
-        return self.w3.to_hex(h)
+        return compute_voter_hash(types, values)
+
+
+def compute_voter_hash(types: Sequence[str], values: Sequence[Any]) -> str:
+    """Offline variant of ContractService.compute_voter_hash; needs no provider connection."""
+    return Web3.to_hex(Web3.solidity_keccak(list(types), list(values)))
+
+
+def ballot_args(election_id: int, voter_hash: str, candidate_ids: Sequence[int]) -> list:
+    """Arguments for castBallot(electionId, voterIdHash, candidateIds)."""
+    return [int(election_id), voter_hash, [int(cid) for cid in candidate_ids]]
+
+
+
+class ContractServiceFactory:
+    """App-scoped ContractService.
+
+    One service per process is built on first use and then reused: one pooled
+    keep-alive session, chain id and connectivity checked once, ABI and
+    contract object parsed once. It is rebuilt (re-running those checks) only
+    after a connection error, or in a forked worker.
+    """
+
+    def __init__(self, app=None):
+        self._service = None
+        self._pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions['contract_services'] = self
+        app.after_request(self._report_rpc_calls)
+
+    def get(self) -> ContractService:
+        service = self._service
+        if service is not None and self._pid == os.getpid() and service.healthy:
+            return service
+        with self._lock:
+            service = self._service
+            if service is None or self._pid != os.getpid() or not service.healthy:
+                # Misconfiguration / unreachable node raises here, nothing is cached
+                service = ContractService(session=pooled_session(Config.WEB3_POOL_SIZE))
+                self._service = service
+                self._pid = os.getpid()
+            return service
+
+    def reset(self):
+        with self._lock:
+            self._service = None
+
+    @staticmethod
+    def _report_rpc_calls(response):
+        count = g.get('rpc_calls', 0)
+        if count:
+            response.headers['X-RPC-Calls'] = str(count)
+        return response
+
+
+contract_services = ContractServiceFactory()
+
+
+def get_contract_service() -> ContractService:
+    """The process-wide ContractService; use this instead of ContractService() in endpoints and jobs."""
+    return contract_services.get()
@@ -3,4 +3,8 @@ import beevs.endpoints.elections
 import beevs.endpoints.posts
 import beevs.endpoints.candidates
 import beevs.endpoints.institutional_records
-import beevs.endpoints.voters
\ No newline at end of file
+import beevs.endpoints.voters
+import beevs.endpoints.health
+import beevs.endpoints.transactions
+import beevs.endpoints.import_jobs
+import beevs.endpoints.media
\ No newline at end of file
@@ -1,7 +1,9 @@
 from flask import current_app as app, request
 from flask_jwt_extended import create_access_token, create_refresh_token
 from beevs.response import APIResponse
+from beevs import db
 from beevs.models import Admin
+from beevs.passwords import password_hasher, login_limiter
 from beevs.utils import validate_login
 from beevs.exceptions import AuthenticationError
 
@@ -18,19 +20,23 @@ def login():
     """
     data = request.get_json()
     email, password = validate_login(data)
+    # Throttle before any bcrypt work (see beevs.passwords)
+    login_limiter.check(request.remote_addr, email)
     admin = Admin.query.filter_by(email=email).first()
-    
-    if not admin:
-        raise AuthenticationError(
-            message="Invalid credentials",
-            status_code=401
-        )
-    
-    if not admin.check_password(password):
+
+    # Unknown emails are checked against a throwaway hash so they take as long as wrong passwords
+    if not password_hasher.verify(admin.password_hash if admin else None, password):
+        login_limiter.failed(email)
         raise AuthenticationError(
             message="Invalid credentials",
             status_code=401
         )
+    login_limiter.succeeded(email)
+
+    # Bring the hash to the configured cost while the plain password is at hand
+    if password_hasher.needs_rehash(admin.password_hash):
+        admin.password_hash = password_hasher.hash(password)
+        db.session.commit()
     
     additional_claims = {
         "role": admin.role.value,
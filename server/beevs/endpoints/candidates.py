@@ -1,14 +1,16 @@
-import os
 import uuid
 from flask import current_app as app, request
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 from werkzeug.utils import secure_filename
 from beevs.response import APIResponse
 from beevs import db
 from beevs.models import Candidate, Election, Post, Vote
-from beevs.contract import ContractService
-from hexbytes import HexBytes
-from beevs.exceptions import ValidationError, AuthorizationError, NotFoundError
+from beevs.relayer import relayer
+from beevs import tallies
+from beevs.cache import response_cache
+from beevs.images import image_store
+from beevs.identity import current_principal
+from beevs.exceptions import ValidationError, NotFoundError
 
 
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg'}
@@ -61,11 +63,7 @@ def create_candidate():
         raise ValidationError(message='Validation failed', errors={'post_id': 'Post does not belong to election'}, status_code=400)
 
     # Authorization: any logged-in admin may create a candidate (per earlier decision)
-    admin_id_raw = get_jwt_identity()
-    try:
-        admin_id = int(admin_id_raw)
-    except Exception:
-        raise AuthorizationError(message='Invalid token identity')
+    current_principal().require_admin()
 
     # If wallet_address not provided, generate one server-side and ensure uniqueness
     if not wallet_address:
@@ -92,14 +90,8 @@ def create_candidate():
     if file and allowed_file(file.filename):
         filename = secure_filename(file.filename)
         ext = filename.rsplit('.', 1)[1].lower()
-        new_name = f"{uuid.uuid4().hex}.{ext}"
-        images_dir = os.path.join(app.root_path, 'static', 'images')
-        os.makedirs(images_dir, exist_ok=True)
-        save_path = os.path.join(images_dir, new_name)
-        file.save(save_path)
         # Return a full URL pointing to the API host so the frontend can load images
-        base = request.host_url.rstrip('/')
-        image_url = f"{base}/static/images/{new_name}"
+        image_url = image_store.url(image_store.save(file, ext), request.host_url)
     else:
         raise ValidationError(message='Validation failed', errors={'image': 'Invalid image file'}, status_code=400)
 
@@ -112,71 +104,33 @@ def create_candidate():
     )
 
     db.session.add(candidate)
+    db.session.flush()
+    tallies.add_candidate(candidate)
+
+    # Queue addPostCandidate for the relayer if the election is already on-chain; otherwise
+    # the relayer queues it when createElection confirms. It sets candidate.onchain_id
+    # once the CandidateAdded event is confirmed.
+    # The post id scopes the one-vote-per-post check in castBallot.
+    tx = None
+    if election.onchain_id:
+        tx = relayer.enqueue('addPostCandidate', [int(election.onchain_id), int(candidate.post_id), candidate.name], action='add_candidate', election_id=election.id, candidate_id=candidate.id)
+        db.session.add(Vote(
+            election_id=election.id,
+            voter_id=None,
+            candidate_id=candidate.id,
+            action='add_candidate',
+            status='pending',
+            outbox=tx
+        ))
+
     db.session.commit()
+    response_cache.invalidate(election.id)
+
+    if tx is None:
+        return APIResponse.success(message='Candidate created', data={'candidate': candidate.to_dict()}, status_code=201)
 
-    # Attempt to add candidate on-chain if the election has an onchain_id and contract is configured
-    try:
-        if election.onchain_id:
-            cs = ContractService()
-            # send transaction: addCandidate(uint256 electionId, string name)
-            res = cs.send_transaction('addCandidate', [int(election.onchain_id), candidate.name], wait_for_receipt=True, timeout=120)
-            tx_hash = res.get('tx_hash')
-            receipt = res.get('receipt')
-
-            # record a Vote-like tx record for auditing
-            vote = Vote(
-                election_id=election.id,
-                voter_id=None,
-                candidate_id=candidate.id,
-                action='add_candidate',
-                tx_hash=tx_hash,
-                status='pending'
-            )
-
-            if receipt:
-                # sanitize receipt: convert HexBytes/bytes to hex strings
-                def _sanitize(obj):
-                    if obj is None:
-                        return None
-                    if isinstance(obj, HexBytes) or isinstance(obj, (bytes, bytearray)):
-                        return '0x' + bytes(obj).hex()
-                    if isinstance(obj, dict):
-                        return {k: _sanitize(v) for k, v in dict(obj).items()}
-                    if isinstance(obj, (list, tuple, set)):
-                        return [_sanitize(v) for v in obj]
-                    if isinstance(obj, (str, int, float, bool)):
-                        return obj
-                    try:
-                        return str(obj)
-                    except Exception:
-                        return None
-
-                vote.receipt = _sanitize(receipt)
-
-                # try parse event
-                try:
-                    contract = cs.get_contract()
-                    events = contract.events.CandidateAdded().process_receipt(receipt)
-                    if events:
-                        evt = events[0]
-                        onchain_cid = int(evt['args'].get('candidateId') or evt['args'].get('candidateId'))
-                        candidate.onchain_id = onchain_cid
-                        vote.status = 'confirmed'
-                        vote.block_number = int(receipt.get('blockNumber')) if receipt.get('blockNumber') else None
-                except Exception:
-                    # leave candidate.onchain_id unset; keep vote pending with receipt
-                    app.logger.exception('Failed to parse candidate add event')
-
-            db.session.add(vote)
-            db.session.add(candidate)
-            db.session.commit()
-
-    except Exception:
-        # Propagate contract errors so caller can see them — do not silently swallow
-        app.logger.exception('Failed to create candidate on-chain')
-        raise
-
-    return APIResponse.success(message='Candidate created', data={'candidate': candidate.to_dict()}, status_code=201)
+    relayer.notify()
+    return APIResponse.success(message='Candidate created; on-chain registration queued', data={'candidate': candidate.to_dict(), 'transaction': tx.to_dict()}, status_code=202)
 
 
 @app.route('/api/v1/candidates/<int:candidate_id>', methods=['DELETE'], strict_slashes=False)
@@ -184,23 +138,23 @@ def create_candidate():
 def delete_candidate(candidate_id):
     """
     Delete a candidate. Any logged-in admin may delete.
-    Also attempts to remove the candidate image file if present.
+    Also attempts to remove the candidate image file if nothing else uses it.
     """
     candidate = Candidate.query.get(candidate_id)
     if not candidate:
         raise NotFoundError(message='Candidate not found')
 
-    # attempt to remove the image file by filename (works whether image_url is absolute or relative)
-    if candidate.image_url:
-        filename = os.path.basename(candidate.image_url)
-        file_path = os.path.join(app.root_path, 'static', 'images', filename)
+    election_id = candidate.election_id
+    image_url = candidate.image_url
+    db.session.delete(candidate)
+    db.session.commit()
+    response_cache.invalidate(election_id)
+
+    # stored images are shared by identical uploads, so this only removes unreferenced files
+    if image_url:
         try:
-            if os.path.exists(file_path):
-                os.unlink(file_path)
+            image_store.release(image_url)
         except Exception:
             app.logger.exception('Failed to remove candidate image file')
 
-    db.session.delete(candidate)
-    db.session.commit()
-
     return APIResponse.success(message='Candidate deleted', data=None, status_code=200)
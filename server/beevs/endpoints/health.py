@@ -0,0 +1,44 @@
+from flask import current_app as app
+from beevs.response import APIResponse
+from beevs import face_engine
+from beevs.contract import rpc_call_counts, get_contract_service
+
+
+@app.route('/api/v1/health/ready', methods=['GET'], strict_slashes=False)
+def readiness():
+    """
+    Readiness probe. Reports 503 until the face models are loaded in this worker
+    so load balancers only route voters to warm workers.
+    """
+    status = {'face_engine': face_engine.status()}
+    if not face_engine.loaded:
+        return APIResponse.error(message='Face models not loaded', errors=status, status_code=503)
+    return APIResponse.success(message='Ready', data=status, status_code=200)
+
+
+@app.route('/api/v1/health/rpc', methods=['GET'], strict_slashes=False)
+def rpc_stats():
+    """
+    JSON-RPC calls made by this worker since start, by method. Each response also
+    carries an X-RPC-Calls header with the calls made while serving it.
+    """
+    calls = rpc_call_counts()
+    return APIResponse.success(message='RPC call counters', data={'total': sum(calls.values()), 'by_method': calls}, status_code=200)
+
+
+@app.route('/api/v1/health/contract', methods=['GET'], strict_slashes=False)
+def contract_check():
+    """
+    Checks the deployed EVoting contract against the ABI the app calls it with.
+    Reports 503 with the missing functions when the contract was deployed from
+    an artifact that was not compiled from BEEVS.sol (see scripts/build_contract.py).
+    """
+    try:
+        cs = get_contract_service()
+        missing = cs.deployed_missing_functions()
+    except Exception as e:
+        return APIResponse.error(message='Contract unavailable', errors={'contract': str(e)}, status_code=503)
+    status = {'address': cs.contract_address, 'missing_functions': missing}
+    if missing:
+        return APIResponse.error(message='Deployed contract does not implement the ABI', errors=status, status_code=503)
+    return APIResponse.success(message='Contract matches the ABI', data=status, status_code=200)
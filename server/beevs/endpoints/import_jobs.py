@@ -0,0 +1,20 @@
+from flask import current_app as app
+from flask_jwt_extended import jwt_required
+from beevs.response import APIResponse
+from beevs.models import ImportJob
+from beevs.exceptions import NotFoundError
+
+
+@app.route('/api/v1/import-jobs/<int:job_id>', methods=['GET'], strict_slashes=False)
+@jwt_required()
+def get_import_job(job_id):
+    """Track a background roster import by the id returned with a 202 upload response.
+
+    Reports rows processed, saved and rejected so far, the current rate and a
+    sample of row errors.
+    """
+    job = ImportJob.query.get(job_id)
+    if not job:
+        raise NotFoundError(message='Import job not found')
+
+    return APIResponse.success(message='Import job fetched', data={'job': job.to_dict()}, status_code=200)
@@ -1,11 +1,13 @@
-import io
-import csv
 from flask import request, current_app as app
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 from beevs.response import APIResponse
 from beevs import db
 from beevs.models import InstitutionalRecord, Election, Admin
 from beevs.exceptions import ValidationError, NotFoundError
+from beevs.listing import paginate, parse_int_arg, like_pattern
+from beevs.imports import import_jobs
+from beevs.cache import response_cache
+from beevs.identity import current_principal
 
 
 @app.route('/api/v1/elections/<int:election_id>/institutional-records/upload', methods=['POST'], strict_slashes=False)
@@ -15,6 +17,11 @@ def upload_institutional_records(election_id):
     Upload a CSV of institutional records for an election. Expects multipart/form-data with a file field named 'file'.
 
     Required CSV columns (case-insensitive): name, registration_number, department, faculty, level
+
+    The file is spooled to disk and loaded by a background import job (see
+    beevs.imports); the response is 202 with the job, whose progress is at
+    GET /api/v1/import-jobs/<id>. Uploading the same file again resumes an
+    unfinished job from its last committed chunk.
     """
     # validate election exists
     election = Election.query.get(election_id)
@@ -28,88 +35,46 @@ def upload_institutional_records(election_id):
     if not file or file.filename == '':
         raise ValidationError(message='No file provided', status_code=400)
 
-    # read CSV
-    try:
-        stream = io.TextIOWrapper(file.stream, encoding='utf-8')
-        reader = csv.DictReader(stream)
-    except Exception as e:
-        raise ValidationError(message='Failed to read CSV file', errors={'file': str(e)}, status_code=400)
-
-    required_cols = {'name', 'registration_number', 'department', 'faculty', 'level'}
-    header_cols = {c.strip().lower() for c in reader.fieldnames or []}
-    missing = required_cols - header_cols
-    if missing:
-        raise ValidationError(message='CSV missing required columns', errors={'missing_columns': list(missing)}, status_code=400)
-
-    saved = []
-    errors = []
-    seen_reg_nos = set()
+    job = import_jobs.create_job(election_id, file, admin_id=current_principal().admin_id)
+    db.session.commit()
 
-    # preload existing registration_numbers for this election to check uniqueness quickly
-    try:
-        existing_regs = {r[0] for r in InstitutionalRecord.query.with_entities(InstitutionalRecord.registration_number).filter_by(election_id=election_id).all()}
-    except Exception:
-        existing_regs = set()
-
-    for idx, row in enumerate(reader, start=1):
-        # normalize keys
-        data = {k.strip().lower(): (v.strip() if v is not None else '') for k, v in row.items()}
-        row_errors = {}
-        for col in required_cols:
-            if not data.get(col):
-                row_errors[col] = 'Required field missing'
-
-        # validate level int
-        if 'level' not in row_errors:
-            try:
-                data['level'] = int(data['level'])
-            except Exception:
-                row_errors['level'] = 'Level must be an integer'
-
-        reg_no = data.get('registration_number')
-        if reg_no:
-            if reg_no in seen_reg_nos:
-                row_errors['registration_number'] = 'Duplicate registration_number in CSV'
-            if reg_no in existing_regs:
-                row_errors['registration_number'] = 'registration_number already exists for this election'
-
-        if row_errors:
-            errors.append({'row': idx, 'errors': row_errors, 'data': data})
-            continue
-
-        # create record
-        record = InstitutionalRecord(
-            name=data['name'],
-            registration_number=reg_no,
-            department=data['department'],
-            faculty=data['faculty'],
-            level=data['level'],
-            election_id=election_id
-        )
-        db.session.add(record)
-        saved.append(record)
-        seen_reg_nos.add(reg_no)
-
-    # commit saved records
-    try:
-        db.session.commit()
-    except Exception as e:
-        db.session.rollback()
-        raise ValidationError(message='Failed to save records', errors={'db': str(e)}, status_code=500)
+    if import_jobs.workers <= 0:
+        # No background pool configured: load it now, inside the request
+        job = import_jobs.run_job(job.id)
+        return APIResponse.success(message='CSV processed', data={'job': job.to_dict()}, status_code=201)
 
-    return APIResponse.success(message='CSV processed', data={'saved_count': len(saved), 'errors': errors, 'saved': [r.to_dict() for r in saved]}, status_code=201)
+    import_jobs.submit(job.id)
+    return APIResponse.success(message='CSV upload queued for import', data={'job': job.to_dict()}, status_code=202)
 
 
 @app.route('/api/v1/elections/<int:election_id>/institutional-records', methods=['GET'], strict_slashes=False)
 @jwt_required()
 def list_institutional_records(election_id):
-    """List all institutional records for an election."""
+    """List institutional records for an election.
+
+    Supports ?fields=, ?limit=&cursor= (see beevs.listing) and the search
+    filters name (substring), registration_number, department and level.
+    """
     election = Election.query.get(election_id)
     if not election:
         raise NotFoundError(message='Election not found')
 
-    records = InstitutionalRecord.query.filter_by(election_id=election_id).order_by(InstitutionalRecord.id.asc()).all()
-    return APIResponse.success(data={'records': [r.to_dict() for r in records]}, status_code=200)
+    query = InstitutionalRecord.query.filter(InstitutionalRecord.election_id == election_id)
+    name = request.args.get('name')
+    if name:
+        query = query.filter(InstitutionalRecord.name.ilike(like_pattern(name), escape='\\'))
+    registration_number = request.args.get('registration_number')
+    if registration_number:
+        query = query.filter(InstitutionalRecord.registration_number == registration_number)
+    department = request.args.get('department')
+    if department:
+        query = query.filter(InstitutionalRecord.department == department)
+    level = parse_int_arg('level')
+    if level is not None:
+        query = query.filter(InstitutionalRecord.level == level)
+
+    records, next_cursor = paginate(query, InstitutionalRecord.id, InstitutionalRecord.list_columns())
+    return APIResponse.success(data={'records': records, 'next_cursor': next_cursor}, status_code=200)
 
 
 @app.route('/api/v1/institutional-records/<int:record_id>', methods=['DELETE'], strict_slashes=False)
@@ -120,8 +85,10 @@ def delete_institutional_record(record_id):
     if not record:
         raise NotFoundError(message='Record not found')
 
+    election_id = record.election_id
     db.session.delete(record)
     db.session.commit()
+    response_cache.invalidate(election_id)
     return APIResponse.success(message='Record deleted', data=None, status_code=200)
 
 
@@ -139,5 +106,6 @@ def delete_all_institutional_records(election_id):
     except Exception as e:
         db.session.rollback()
         raise ValidationError(message='Failed to delete records', errors={'db': str(e)}, status_code=500)
+    response_cache.invalidate(election_id)
 
     return APIResponse.success(message='Records deleted', data={'deleted_count': deleted}, status_code=200)
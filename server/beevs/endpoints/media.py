@@ -0,0 +1,33 @@
+import os
+from flask import current_app as app, send_file, make_response
+from beevs.images import image_store, NAME_PATTERN, MIMETYPES
+from beevs.exceptions import NotFoundError
+
+
+@app.route('/media/<name>', methods=['GET'], strict_slashes=False)
+def get_media(name):
+    """Serve a stored image or one of its resized variants (<digest>[_<size>].<ext>).
+
+    Names are content hashes, so responses are cacheable for IMAGE_CACHE_MAX_AGE
+    and marked immutable. send_file answers If-None-Match and Range requests and
+    streams the body with the server's sendfile; with IMAGE_ACCEL_REDIRECT set
+    the file is handed to nginx instead.
+    """
+    path = image_store.file_for(name)
+    if path is None:
+        raise NotFoundError(message='Image not found')
+
+    mimetype = MIMETYPES[NAME_PATTERN.match(name).group('ext')]
+    max_age = app.config.get('IMAGE_CACHE_MAX_AGE', 31536000)
+    accel_prefix = app.config.get('IMAGE_ACCEL_REDIRECT')
+    if accel_prefix:
+        response = make_response('')
+        response.mimetype = mimetype
+        response.headers['X-Accel-Redirect'] = f"{accel_prefix.rstrip('/')}/{os.path.relpath(path, image_store.root)}"
+    else:
+        response = send_file(path, mimetype=mimetype, conditional=True, etag=name.split('.', 1)[0], max_age=max_age)
+
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    response.cache_control.immutable = True
+    return response
@@ -1,8 +1,10 @@
 from flask import current_app as app, request
-from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from flask_jwt_extended import jwt_required
 from beevs.response import APIResponse
 from beevs import db
 from beevs.models import Post, Election, Candidate
+from beevs.cache import response_cache
+from beevs.identity import current_principal
 from beevs.exceptions import ValidationError, AuthorizationError, NotFoundError
 from datetime import datetime
 
@@ -36,11 +38,7 @@ def create_post():
         raise NotFoundError(message='Election not found')
 
     # Only the super_admin assigned to the election can create posts
-    admin_id_raw = get_jwt_identity()
-    try:
-        admin_id = int(admin_id_raw)
-    except Exception:
-        raise AuthorizationError(message='Invalid token identity')
+    admin_id = current_principal().require_admin()
 
     if election.super_admin_id != admin_id:
         raise AuthorizationError(message='Only the election super admin can create posts')
@@ -48,6 +46,7 @@ def create_post():
     post = Post(title=title, election_id=election_id)
     db.session.add(post)
     db.session.commit()
+    response_cache.invalidate(election.id)
 
     return APIResponse.success(message='Post created', data={'post': post.to_dict()}, status_code=201)
 
@@ -72,11 +71,13 @@ def delete_post(post_id):
     # Delete the post (candidates will be cascaded by DB)
     db.session.delete(post)
     db.session.commit()
+    response_cache.invalidate(election.id)
 
     return APIResponse.success(message='Post deleted', data=None, status_code=200)
 
 
 @app.route('/api/v1/elections/<int:election_id>/posts', methods=['GET'], strict_slashes=False)
+@response_cache.cached('posts')
 def list_posts(election_id):
     """
     List posts for an election. Query param include_candidates=true will include nested candidates
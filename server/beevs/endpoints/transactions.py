@@ -0,0 +1,38 @@
+from flask import current_app as app, request
+from flask_jwt_extended import jwt_required
+from beevs.response import APIResponse
+from beevs.models import OutboxTransaction
+from beevs.exceptions import NotFoundError
+from beevs.identity import current_principal
+from beevs.relayer import relayer
+
+
+@app.route('/api/v1/transactions/<int:transaction_id>', methods=['GET'], strict_slashes=False)
+@jwt_required()
+def get_transaction(transaction_id):
+    """Track a relayed on-chain transaction by the id returned with a 202 response.
+
+    Admin tokens may read any transaction; voter tokens only their own.
+    """
+    tx = OutboxTransaction.query.get(transaction_id)
+    if not tx:
+        raise NotFoundError(message='Transaction not found')
+
+    principal = current_principal()
+    if principal.is_voter and tx.voter_id != principal.voter_id:
+        raise NotFoundError(message='Transaction not found')
+
+    return APIResponse.success(message='Transaction fetched', data={'transaction': tx.to_dict()}, status_code=200)
+
+
+@app.route('/api/v1/transactions/voter-registrations/abandoned', methods=['GET'], strict_slashes=False)
+@jwt_required()
+def get_abandoned_voter_registrations():
+    """Voters the relayer stopped registering after VOTER_REGISTRATION_MAX_ATTEMPTS failed batches.
+
+    Admin only. Optional election_id query parameter.
+    """
+    current_principal().require_admin()
+    election_id = request.args.get('election_id', type=int)
+    voters = relayer.abandoned_voter_registrations(election_id)
+    return APIResponse.success(message='Abandoned voter registrations fetched', data={'voters': voters, 'max_attempts': relayer.voter_max_attempts}, status_code=200)
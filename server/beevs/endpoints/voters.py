@@ -1,17 +1,28 @@
+import io
 import os
+import json
+import time
 import uuid
 import logging
 from datetime import timedelta
-from flask import request, current_app as app
-from flask_jwt_extended import jwt_required, create_access_token, get_jwt
+from flask import request, current_app as app, Response, stream_with_context
+from flask_jwt_extended import jwt_required, create_access_token
 from werkzeug.utils import secure_filename
 from beevs.response import APIResponse
-from beevs import db
+from beevs import db, face_engine
 from beevs.models import Voter, Election, InstitutionalRecord, Post, Candidate, Vote
-from beevs.exceptions import ValidationError, NotFoundError
-from deepface import DeepFace
-from beevs.contract import ContractService
-from hexbytes import HexBytes
+from beevs.exceptions import ValidationError, NotFoundError, ServiceUnavailableError
+from beevs.face import store_embedding, decode_image, reference_image_path
+from beevs.contract import get_contract_service, compute_voter_hash, ballot_args
+from beevs.relayer import relayer
+from beevs.cache import response_cache
+from beevs.stats import election_stats
+from beevs.ballots import ballot_guard, already_voted_error
+from beevs.identity import current_principal, identity_map
+from beevs.images import image_store
+from beevs.live import results_publisher
+from beevs.listing import paginate, parse_int_arg, like_pattern
+from beevs.enrollment import open_archive, close_archive, read_manifest, plan_enrollment, enroll
 from web3.exceptions import ContractLogicError
 
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg'}
@@ -90,14 +101,9 @@ def vote_auth(election_id):
     if not voter:
         raise ValidationError(message='No registered voter found for this registration number', status_code=400)
 
-    # Check if voter has already cast any votes
-    existing_vote = Vote.query.filter_by(
-        election_id=election_id,
-        voter_id=voter.id,
-        action='vote'
-    ).first()
-    if existing_vote:
-        raise ValidationError(message='You have already voted in this election', status_code=400)
+    # Check if voter has already cast a ballot (answered from memory for known voters)
+    if ballot_guard.has_voted(election_id, voter.id):
+        raise already_voted_error()
 
     if not voter.image_url:
         raise ValidationError(message='No reference image available for this voter. Please register with a photo first.', status_code=400)
@@ -106,52 +112,40 @@ def vote_auth(election_id):
     if not file or not allowed_file(file.filename):
         raise ValidationError(message='Validation failed', errors={'image': 'Invalid image file'}, status_code=400)
 
-    filename = secure_filename(file.filename)
-    ext = filename.rsplit('.', 1)[1].lower()
-    temp_name = f"vote_live_{uuid.uuid4().hex}.{ext}"
-    images_dir = os.path.join(app.root_path, 'static', 'images')
-    os.makedirs(images_dir, exist_ok=True)
-    temp_path = os.path.join(images_dir, temp_name)
-    file.save(temp_path)
+    # Decode the capture in memory; nothing is written to disk
+    try:
+        live_image = decode_image(file)
+    except ValueError:
+        raise ValidationError(message='Validation failed', errors={'image': 'Invalid image file'}, status_code=400)
 
     try:
-        known_filename = os.path.basename(voter.image_url)
-        known_path = os.path.join(app.root_path, 'static', 'images', known_filename)
+        known = face_engine.reference_embedding(voter)
+        if db.session.is_modified(voter):
+            # persist an embedding computed for a voter registered before the store existed
+            db.session.commit()
+        result = face_engine.verify(known, live_image)
+    except ValueError as ve:
+        logging.error("Face detection error", exc_info=True)
+        # Face wasn't detected in one of the images
+        raise ValidationError(message=(
+            'Face could not be detected in the image'
+        ), status_code=400)
+    except ServiceUnavailableError:
+        # verification pool saturated or timed out: tell the kiosk to retry
+        raise
+    except Exception as e:
+        raise ValidationError(message=f'Face verification failed: {str(e)}', status_code=500)
 
-        try:
-            result = DeepFace.verify(
-                img1_path=known_path,
-                img2_path=temp_path,
-                model_name='ArcFace',
-                detector_backend='retinaface',
-                distance_metric='cosine',
-                enforce_detection=False
-            )
-        except ValueError as ve:
-            logging.error("Face detection error", exc_info=True)
-            # Face wasn't detected in one of the images
-            raise ValidationError(message=(
-                'Face could not be detected in the image'
-            ), status_code=400)
-        except Exception as e:
-            raise ValidationError(message=f'Face verification failed: {str(e)}', status_code=500)
-
-        is_match = bool(result.get('verified', False))
-        distance = result.get('distance')
-        threshold = result.get('threshold')
-
-        if not is_match:
-            raise ValidationError(message='Face did not match', errors={"error": "Can not authenticate! Face did not match"}, status_code=401)
-
-        token = create_access_token(identity=f"voter:{voter.id}", additional_claims={'vote_auth': True, 'election_id': election_id, 'voter_id': voter.id}, expires_delta=timedelta(minutes=10))
-
-        return APIResponse.success(message='Voter authenticated', data={'token': token}, status_code=200)
-    finally:
-        try:
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
-        except Exception:
-            app.logger.exception('Failed to remove temporary live image')
+    is_match = bool(result.get('verified', False))
+    distance = result.get('distance')
+    threshold = result.get('threshold')
+
+    if not is_match:
+        raise ValidationError(message='Face did not match', errors={"error": "Can not authenticate! Face did not match"}, status_code=401)
+
+    token = create_access_token(identity=f"voter:{voter.id}", additional_claims={'vote_auth': True, 'election_id': election_id, 'voter_id': voter.id}, expires_delta=timedelta(minutes=10))
+
+    return APIResponse.success(message='Voter authenticated', data={'token': token}, status_code=200)
 
 
 @app.route('/api/v1/voters', methods=['POST'], strict_slashes=False)
@@ -226,13 +220,9 @@ def create_voter():
 
     filename = secure_filename(file.filename)
     ext = filename.rsplit('.', 1)[1].lower()
-    new_name = f"{uuid.uuid4().hex}.{ext}"
-    images_dir = os.path.join(app.root_path, 'static', 'images')
-    os.makedirs(images_dir, exist_ok=True)
-    save_path = os.path.join(images_dir, new_name)
-    file.save(save_path)
-    base = request.host_url.rstrip('/')
-    image_url = f"{base}/static/images/{new_name}"
+    stored_name = image_store.save(file, ext)
+    save_path = image_store.path(stored_name)
+    image_url = image_store.url(stored_name, request.host_url)
 
     voter = Voter(
         name=name,
@@ -242,96 +232,203 @@ def create_voter():
         student_record_id=int(record.id)
     )
 
+    # Embed the reference photo once so authentication only has to embed the live capture
+    try:
+        store_embedding(voter, face_engine.embed(save_path))
+    except Exception:
+        app.logger.exception('Failed to compute face embedding; it will be computed on first authentication')
+
     db.session.add(voter)
     db.session.commit()
+    response_cache.invalidate(election.id)
 
-    # After creating the voter locally, attempt to register on-chain if election has onchain_id
-    try:
-        if election.onchain_id:
-            cs = ContractService()
-            # compute a solidity keccak for voter identity: (uint256 electionId, string registration_number)
-            voter_hash = cs.compute_voter_hash(['uint256', 'string'], [int(election.onchain_id), record.registration_number])
-            res = cs.send_transaction('registerVoter', [int(election.onchain_id), voter_hash], wait_for_receipt=True, timeout=120)
-            tx_hash = res.get('tx_hash')
-            receipt = res.get('receipt')
-
-            vote = Vote(
-                election_id=election.id,
-                voter_id=voter.id,
-                candidate_id=None,
-                action='register_voter',
-                tx_hash=tx_hash,
-                status='pending'
-            )
-
-            if receipt:
-                # sanitize receipt (convert HexBytes/bytes to hex strings)
-                def _sanitize(obj):
-                    if obj is None:
-                        return None
-                    if isinstance(obj, HexBytes) or isinstance(obj, (bytes, bytearray)):
-                        return '0x' + bytes(obj).hex()
-                    if isinstance(obj, dict):
-                        return {k: _sanitize(v) for k, v in dict(obj).items()}
-                    if isinstance(obj, (list, tuple, set)):
-                        return [_sanitize(v) for v in obj]
-                    if isinstance(obj, (str, int, float, bool)):
-                        return obj
-                    try:
-                        return str(obj)
-                    except Exception:
-                        return None
-
-                vote.receipt = _sanitize(receipt)
-                try:
-                    contract = cs.get_contract()
-                    events = contract.events.VoterRegistered().process_receipt(receipt)
-                    if events:
-                        # event args may include voterId; set if present
-                        evt = events[0]
-                        maybe_id = evt['args'].get('voterId') if 'args' in evt and 'voterId' in evt.get('args', {}) else None
-                        if maybe_id is not None:
-                            try:
-                                voter.onchain_id = int(maybe_id)
-                            except Exception:
-                                pass
-                        vote.status = 'confirmed'
-                        vote.block_number = int(receipt.get('blockNumber')) if receipt.get('blockNumber') else None
-                except Exception:
-                    app.logger.exception('Failed to parse voter registered event')
+    if not election.onchain_id:
+        return APIResponse.success(message='Voter created', data={'voter': voter.to_dict()}, status_code=201)
 
-            db.session.add(vote)
-            db.session.add(voter)
-            db.session.commit()
+    # On-chain registration is batched: the relayer gathers unregistered voters into
+    # registerVoters transactions and sets voter.onchain_id from the VoterRegistered events
+    relayer.notify()
+    return APIResponse.success(message='Voter created; on-chain registration queued', data={'voter': voter.to_dict()}, status_code=201)
+
+
+@app.route('/api/v1/elections/<int:election_id>/voters/bulk', methods=['POST'], strict_slashes=False)
+@jwt_required()
+def bulk_create_voters(election_id):
+    """Enroll many voters from a zip of photos and a CSV manifest.
+
+    Expects multipart/form-data with 'photos' (zip) and 'manifest' (CSV with
+    registration_number and photo columns, optionally name; a manifest.csv
+    inside the zip is used when the field is omitted). Streams one NDJSON line
+    per manifest row: { row, registration_number, status, error | embedding_ok }
+    followed by a summary. Rows whose photo shows no face are rejected unless
+    require_face=false. See beevs.enrollment.
+    """
+    election = Election.query.get(election_id)
+    if not election:
+        raise NotFoundError(message='Election not found')
+
+    photos = request.files.get('photos')
+    if not photos or photos.filename == '':
+        raise ValidationError(message='Validation failed', errors={'photos': 'A zip of photos is required'}, status_code=400)
+
+    archive, members = open_archive(photos)
+    try:
+        manifest = request.files.get('manifest')
+        if manifest and manifest.filename:
+            rows = read_manifest(manifest.stream)
+        elif 'manifest.csv' in members:
+            with archive.open(members['manifest.csv']) as f:
+                rows = read_manifest(io.BytesIO(f.read()))
+        else:
+            raise ValidationError(message='Validation failed', errors={'manifest': 'A manifest CSV is required'}, status_code=400)
+        entries, rejected = plan_enrollment(election_id, rows, members)
     except Exception:
-        app.logger.exception('Failed to register voter on-chain')
-        # Propagate so caller is aware (per request to not hide errors)
+        close_archive(archive)
         raise
+    require_face = request.form.get('require_face', 'true').lower() != 'false'
+    host_url = request.host_url
+    onchain = bool(election.onchain_id)
+
+    def generate():
+        summary = {'summary': True, 'rows': len(rows), 'enrolled': 0, 'rejected': len(rejected)}
+        for line in rejected:
+            yield json.dumps(line) + '\n'
+        try:
+            for line in enroll(election_id, archive, entries, host_url, require_face=require_face):
+                summary['enrolled' if line['status'] == 'enrolled' else 'rejected'] += 1
+                yield json.dumps(line) + '\n'
+        finally:
+            close_archive(archive)
+        if summary['enrolled']:
+            response_cache.invalidate(election_id)
+        if onchain and summary['enrolled']:
+            # the relayer batches the new voters into registerVoters transactions
+            relayer.notify()
+        yield json.dumps(summary) + '\n'
 
-    return APIResponse.success(message='Voter created', data={'voter': voter.to_dict()}, status_code=201)
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson', status=200)
 
 
 @app.route('/api/v1/elections/<int:election_id>/voters', methods=['GET'], strict_slashes=False)
 @jwt_required()
 def list_voters(election_id):
+    """List an election's voters.
+
+    Supports ?fields=, ?limit=&cursor= (see beevs.listing) and the search
+    filters name (substring), registration_number, department and level, the
+    last three matched against the voter's institutional record.
+    registration_number can also be requested as a field.
+    """
     election = Election.query.get(election_id)
     if not election:
         raise NotFoundError(message='Election not found')
-    voters = Voter.query.filter_by(election_id=election_id).order_by(Voter.id.asc()).all()
-    
-    # Count cast votes (unique voters who have voted)
-    cast_votes_count = db.session.query(Vote.voter_id).filter(
-        Vote.election_id == election_id,
-        Vote.action == 'vote',
-        Vote.voter_id.isnot(None)
-    ).distinct().count()
-    
+
+    query = Voter.query.filter(Voter.election_id == election_id)
+    name = request.args.get('name')
+    if name:
+        query = query.filter(Voter.name.ilike(like_pattern(name), escape='\\'))
+    registration_number = request.args.get('registration_number')
+    department = request.args.get('department')
+    level = parse_int_arg('level')
+    if registration_number or department or level is not None:
+        query = query.join(InstitutionalRecord, InstitutionalRecord.id == Voter.student_record_id)
+        if registration_number:
+            query = query.filter(InstitutionalRecord.registration_number == registration_number)
+        if department:
+            query = query.filter(InstitutionalRecord.department == department)
+        if level is not None:
+            query = query.filter(InstitutionalRecord.level == level)
+
+    # the record's registration number, so the dashboard needs no copy of the roster to label voters
+    columns = dict(Voter.list_columns(), registration_number=db.select(InstitutionalRecord.registration_number).where(
+        InstitutionalRecord.id == Voter.student_record_id
+    ).correlate(Voter).scalar_subquery())
+    voters, next_cursor = paginate(query, Voter.id, columns)
+
+    # Dashboard counters (see beevs.stats), so the page needs no full roster to show them
+    stats = election_stats(election_id)
     return APIResponse.success(data={
-        'voters': [v.to_dict() for v in voters],
-        'cast_votes': cast_votes_count
+        'voters': voters,
+        'next_cursor': next_cursor,
+        'cast_votes': stats['cast_votes'],
+        'voter_count': stats['voter_count'],
+        'record_count': stats['record_count']
     }, status_code=200)
 
 
+@app.route('/api/v1/elections/<int:election_id>/voters/face-check', methods=['POST'], strict_slashes=False)
+@jwt_required()
+def check_voter_faces(election_id):
+    """Re-verify every voter's reference photo for an election.
+
+    Photos are pushed through the detector and recognizer in chunks of
+    FACE_BATCH_SIZE and one JSON object per voter is streamed back as NDJSON:
+    { voter_id, face_present, embedding_ok, confidence, face_size, sharpness, quality, error }.
+    The last line is a summary. Pass ?update_embeddings=true to store the freshly
+    computed embeddings.
+    """
+    election = Election.query.get(election_id)
+    if not election:
+        raise NotFoundError(message='Election not found')
+
+    update_embeddings = request.args.get('update_embeddings', 'false').lower() == 'true'
+    batch_size = max(int(app.config.get('FACE_BATCH_SIZE') or 1), 1)
+    voter_rows = db.session.query(Voter.id, Voter.image_url).filter(
+        Voter.election_id == election_id
+    ).order_by(Voter.id.asc()).all()
+
+    def _check_chunk(paths):
+        # Wait out a saturated pool rather than failing the whole roll
+        for attempt in range(5):
+            try:
+                return face_engine.check_references(paths)
+            except ServiceUnavailableError as e:
+                if attempt == 4:
+                    raise
+                time.sleep(e.retry_after)
+
+    def generate():
+        summary = {'summary': True, 'checked': 0, 'passed': 0, 'failed': 0}
+        for start in range(0, len(voter_rows), batch_size):
+            chunk = voter_rows[start:start + batch_size]
+            lines = {}
+            pending = []
+            for voter_id, image_url in chunk:
+                path = reference_image_path(image_url) if image_url else None
+                if not path or not os.path.exists(path):
+                    lines[voter_id] = {'voter_id': voter_id, 'face_present': False, 'embedding_ok': False,
+                                       'quality': 0.0, 'error': 'Reference image missing'}
+                else:
+                    pending.append((voter_id, path))
+
+            if pending:
+                try:
+                    checks = _check_chunk([path for _, path in pending])
+                except Exception as e:
+                    app.logger.exception('Face check failed for chunk')
+                    checks = [{'face_present': False, 'embedding': None, 'quality': 0.0, 'error': str(e)} for _ in pending]
+
+                for (voter_id, _), check in zip(pending, checks):
+                    embedding = check.pop('embedding', None)
+                    check.update({'voter_id': voter_id, 'embedding_ok': embedding is not None})
+                    lines[voter_id] = check
+                    if update_embeddings and embedding is not None:
+                        voter = Voter.query.get(voter_id)
+                        store_embedding(voter, embedding)
+                if update_embeddings:
+                    db.session.commit()
+
+            for voter_id, _ in chunk:
+                line = lines[voter_id]
+                summary['checked'] += 1
+                summary['passed' if line['embedding_ok'] else 'failed'] += 1
+                yield json.dumps(line) + '\n'
+
+        yield json.dumps(summary) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson', status=200)
+
+
 @app.route('/api/v1/voters/<int:voter_id>', methods=['DELETE'], strict_slashes=False)
 @jwt_required()
 def delete_voter(voter_id):
@@ -339,17 +436,19 @@ def delete_voter(voter_id):
     if not voter:
         raise NotFoundError(message='Voter not found')
 
-    if voter.image_url:
-        filename = os.path.basename(voter.image_url)
-        file_path = os.path.join(app.root_path, 'static', 'images', filename)
+    image_url = voter.image_url
+    election_id = voter.election_id
+    db.session.delete(voter)
+    db.session.commit()
+    response_cache.invalidate(election_id)
+    ballot_guard.forget(election_id, voter_id)
+
+    # stored images are shared by identical uploads, so this only removes unreferenced files
+    if image_url:
         try:
-            if os.path.exists(file_path):
-                os.unlink(file_path)
+            image_store.release(image_url)
         except Exception:
             app.logger.exception('Failed to remove voter image file')
-
-    db.session.delete(voter)
-    db.session.commit()
     return APIResponse.success(message='Voter deleted', data=None, status_code=200)
 
 
@@ -360,33 +459,21 @@ def cast_vote(election_id):
 
     Body: { votes: [{ positionId, selectedCandidate: { id } }, ... ] }
     """
-    claims = get_jwt()
-    if not claims.get('vote_auth'):
-        raise ValidationError(message='Unauthorized to vote', status_code=401)
-
-    token_eid = claims.get('election_id')
-    voter_id = claims.get('voter_id')
-    if token_eid is None or int(token_eid) != int(election_id):
-        raise ValidationError(message='Token election mismatch', status_code=401)
-
-    if voter_id is None:
-        raise ValidationError(message='Invalid voter token', status_code=401)
-
-    voter = Voter.query.get(int(voter_id))
-    if not voter:
-        raise NotFoundError(message='Voter not found')
-
-    election = Election.query.get(election_id)
-    if not election:
-        raise NotFoundError(message='Election not found')
+    # voter, election and institutional record come back from one query (see beevs.identity)
+    voter, election, record = current_principal().voter_session('vote_auth', election_id, load_record=True)
 
     payload = request.get_json() or {}
     votes = payload.get('votes')
     if not isinstance(votes, list) or len(votes) == 0:
         raise ValidationError(message='No votes provided', status_code=400)
 
+    # A voter casts one ballot per election; a racing duplicate is stopped by the
+    # unique ballot index in cast_ballot
+    if ballot_guard.has_voted(election.id, voter.id):
+        raise already_voted_error()
+
     # Validate votes and prepare on-chain operations
-    ops = []
+    candidate_ids = []
     for v in votes:
         candidate_id = None
         if isinstance(v, dict):
@@ -401,8 +488,13 @@ def cast_vote(election_id):
 
         if not candidate_id:
             raise ValidationError(message='Invalid vote payload', status_code=400)
+        candidate_ids.append(int(candidate_id))
 
-        candidate = Candidate.query.get(int(candidate_id))
+    # every selected candidate in one IN query
+    candidates = identity_map.load_many(Candidate, candidate_ids)
+    ops = []
+    for candidate_id in candidate_ids:
+        candidate = candidates[candidate_id]
         if not candidate or candidate.election_id != int(election_id):
             raise ValidationError(message=f'Candidate {candidate_id} invalid for election', status_code=400)
 
@@ -411,77 +503,47 @@ def cast_vote(election_id):
 
         ops.append({'candidate': candidate})
 
+    # One candidate per post; castBallot would revert on the duplicate anyway
+    post_ids = [op['candidate'].post_id for op in ops]
+    if len(set(post_ids)) != len(post_ids):
+        raise ValidationError(message='Only one candidate may be selected per post', status_code=400)
+
     # Prepare voter_hash
     if not election.onchain_id:
         raise ValidationError(message='Election not registered on-chain', status_code=400)
 
     # Need institutional registration number to compute same hash used during registration
-    record = InstitutionalRecord.query.get(voter.student_record_id)
     if not record:
         raise ValidationError(message='Voter institutional record not found', status_code=400)
 
     try:
-        cs = ContractService()
+        cs = get_contract_service()
     except Exception as e:
         app.logger.exception('ContractService not configured')
         raise
 
-    voter_hash = cs.compute_voter_hash(['uint256', 'string'], [int(election.onchain_id), record.registration_number])
+    voter_hash = compute_voter_hash(['uint256', 'string'], [int(election.onchain_id), record.registration_number])
 
-    results = []
-    # For each vote, send a transaction calling voteOnBehalf(electionId, voterHash, candidateOnchainId)
-    for op in ops:
-        candidate = op['candidate']
-        try:
-            res = cs.send_transaction('voteOnBehalf', [int(election.onchain_id), voter_hash, int(candidate.onchain_id)], wait_for_receipt=True, timeout=120)
-            tx_hash = res.get('tx_hash')
-            receipt = res.get('receipt')
-
-            # record audit Vote
-            vote_record = Vote(
-                election_id=election.id,
-                voter_id=voter.id,
-                candidate_id=candidate.id,
-                action='vote',
-                tx_hash=tx_hash,
-                status='pending'
-            )
-            if receipt:
-                # sanitize receipt
-                def _sanitize(obj):
-                    if obj is None:
-                        return None
-                    if isinstance(obj, HexBytes) or isinstance(obj, (bytes, bytearray)):
-                        return '0x' + bytes(obj).hex()
-                    if isinstance(obj, dict):
-                        return {k: _sanitize(v) for k, v in dict(obj).items()}
-                    if isinstance(obj, (list, tuple, set)):
-                        return [_sanitize(v) for v in obj]
-                    if isinstance(obj, (str, int, float, bool)):
-                        return obj
-                    try:
-                        return str(obj)
-                    except Exception:
-                        return None
-
-                vote_record.receipt = _sanitize(receipt)
-                vote_record.status = 'confirmed'
-                vote_record.block_number = int(receipt.get('blockNumber')) if receipt.get('blockNumber') else None
-
-            db.session.add(vote_record)
-            db.session.commit()
-            results.append({'candidate_id': candidate.id, 'tx_hash': tx_hash, 'status': vote_record.status})
-        except ContractLogicError as cle:
-            # Extract and return a friendly revert reason to the client
-            reason = _extract_revert_reason(cle)
-            app.logger.warning('Contract reverted while casting vote: %s', reason)
-            return APIResponse.error(message=f'Contract error: {reason}', errors={'contract': reason}, status_code=400)
-        except Exception as e:
-            app.logger.exception('Failed to send vote tx')
-            # propagate so client sees the failure
-            raise
+    # The whole ballot goes on-chain as a single castBallot(electionId, voterHash, candidateIds)
+    # transaction. It is dry-run first so reverts (not registered, voting closed, already
+    # voted for a post, ...) still reach the voter synchronously; confirmation happens in the relayer.
+    args = ballot_args(election.onchain_id, voter_hash, [op['candidate'].onchain_id for op in ops])
+    try:
+        cs.simulate('castBallot', args)
+    except ContractLogicError as cle:
+        # Extract and return a friendly revert reason to the client
+        db.session.rollback()
+        reason = _extract_revert_reason(cle)
+        app.logger.warning('Contract reverted while casting vote: %s', reason)
+        return APIResponse.error(message=f'Contract error: {reason}', errors={'contract': reason}, status_code=400)
 
-    return APIResponse.success(message='Votes cast', data={'results': results}, status_code=200)
+    tx = ballot_guard.cast_ballot(election.id, voter.id, [op['candidate'] for op in ops], args)
+    response_cache.invalidate(election.id)
+    results_publisher.notify(election.id)
+    relayer.notify()
+
+    results = [{'candidate_id': op['candidate'].id, 'transaction_id': tx.id, 'status': 'pending'} for op in ops]
+    return APIResponse.success(message='Ballot accepted; on-chain submission queued', data={'results': results, 'transaction': tx.to_dict()}, status_code=202)
 
 
 @app.route('/api/v1/elections/<int:election_id>/audit-auth', methods=['POST'], strict_slashes=False)
@@ -515,54 +577,42 @@ def audit_auth(election_id):
     if not file or not allowed_file(file.filename):
         raise ValidationError(message='Validation failed', errors={'image': 'Invalid image file'}, status_code=400)
 
-    filename = secure_filename(file.filename)
-    ext = filename.rsplit('.', 1)[1].lower()
-    temp_name = f"audit_live_{uuid.uuid4().hex}.{ext}"
-    images_dir = os.path.join(app.root_path, 'static', 'images')
-    os.makedirs(images_dir, exist_ok=True)
-    temp_path = os.path.join(images_dir, temp_name)
-    file.save(temp_path)
+    # Decode the capture in memory; nothing is written to disk
+    try:
+        live_image = decode_image(file)
+    except ValueError:
+        raise ValidationError(message='Validation failed', errors={'image': 'Invalid image file'}, status_code=400)
 
     try:
-        known_filename = os.path.basename(voter.image_url)
-        known_path = os.path.join(app.root_path, 'static', 'images', known_filename)
+        known = face_engine.reference_embedding(voter)
+        if db.session.is_modified(voter):
+            # persist an embedding computed for a voter registered before the store existed
+            db.session.commit()
+        result = face_engine.verify(known, live_image)
+    except ValueError as ve:
+        logging.error("Face detection error", exc_info=True)
+        raise ValidationError(message='Face could not be detected in the image', status_code=400)
+    except ServiceUnavailableError:
+        # verification pool saturated or timed out: tell the kiosk to retry
+        raise
+    except Exception as e:
+        raise ValidationError(message=f'Face verification failed: {str(e)}', status_code=500)
 
-        try:
-            result = DeepFace.verify(
-                img1_path=known_path,
-                img2_path=temp_path,
-                model_name='ArcFace',
-                detector_backend='retinaface',
-                distance_metric='cosine',
-                enforce_detection=False
-            )
-        except ValueError as ve:
-            logging.error("Face detection error", exc_info=True)
-            raise ValidationError(message='Face could not be detected in the image', status_code=400)
-        except Exception as e:
-            raise ValidationError(message=f'Face verification failed: {str(e)}', status_code=500)
-
-        is_match = bool(result.get('verified', False))
-        distance = result.get('distance')
-        threshold = result.get('threshold')
-
-        if not is_match:
-            raise ValidationError(message='Face did not match', errors={"error": "Can not authenticate! Face did not match"}, status_code=401)
-
-        # Create audit token (10 minutes validity)
-        token = create_access_token(
-            identity=f"voter:{voter.id}",
-            additional_claims={'audit_auth': True, 'election_id': election_id, 'voter_id': voter.id},
-            expires_delta=timedelta(minutes=10)
-        )
-
-        return APIResponse.success(message='Voter authenticated for audit', data={'token': token}, status_code=200)
-    finally:
-        try:
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
-        except Exception:
-            app.logger.exception('Failed to remove temporary audit image')
+    is_match = bool(result.get('verified', False))
+    distance = result.get('distance')
+    threshold = result.get('threshold')
+
+    if not is_match:
+        raise ValidationError(message='Face did not match', errors={"error": "Can not authenticate! Face did not match"}, status_code=401)
+
+    # Create audit token (10 minutes validity)
+    token = create_access_token(
+        identity=f"voter:{voter.id}",
+        additional_claims={'audit_auth': True, 'election_id': election_id, 'voter_id': voter.id},
+        expires_delta=timedelta(minutes=10)
+    )
+
+    return APIResponse.success(message='Voter authenticated for audit', data={'token': token}, status_code=200)
 
 
 @app.route('/api/v1/elections/<int:election_id>/audit', methods=['GET'], strict_slashes=False)
@@ -573,25 +623,7 @@ def get_audit(election_id):
     Returns the list of candidates the voter voted for, along with transaction hashes.
     Requires a JWT with 'audit_auth' claim from the audit-auth endpoint.
     """
-    claims = get_jwt()
-    if not claims.get('audit_auth'):
-        raise ValidationError(message='Unauthorized to view audit', status_code=401)
-
-    token_eid = claims.get('election_id')
-    voter_id = claims.get('voter_id')
-    if token_eid is None or int(token_eid) != int(election_id):
-        raise ValidationError(message='Token election mismatch', status_code=401)
-
-    if voter_id is None:
-        raise ValidationError(message='Invalid audit token', status_code=401)
-
-    voter = Voter.query.get(int(voter_id))
-    if not voter:
-        raise NotFoundError(message='Voter not found')
-
-    election = Election.query.get(election_id)
-    if not election:
-        raise NotFoundError(message='Election not found')
+    voter, election, _ = current_principal().voter_session('audit_auth', election_id)
 
     # Get all vote records for this voter in this election
     votes = Vote.query.filter_by(
@@ -604,11 +636,14 @@ def get_audit(election_id):
         return APIResponse.success(message='No votes found', data={'votes': [], 'voter': voter.to_dict()}, status_code=200)
 
     # Build response with candidate details and transaction info
+    # candidates and their posts are batch-loaded, not fetched per vote
+    candidates = identity_map.load_many(Candidate, [vote.candidate_id for vote in votes if vote.candidate_id])
+    posts = identity_map.load_many(Post, [c.post_id for c in candidates.values() if c])
     vote_details = []
     for vote in votes:
-        candidate = Candidate.query.get(vote.candidate_id) if vote.candidate_id else None
-        post = Post.query.get(candidate.post_id) if candidate else None
-        
+        candidate = candidates.get(vote.candidate_id)
+        post = posts.get(candidate.post_id) if candidate else None
+
         vote_detail = {
             'id': vote.id,
             'tx_hash': vote.tx_hash,
@@ -0,0 +1,260 @@
+"""
+Bulk voter enrollment for the BEEVS application
+
+POST /api/v1/elections/<id>/voters/bulk takes a zip of reference photos and a
+CSV manifest (registration_number, photo[, name]) and enrolls every listed
+student in one request:
+
+- institutional records and existing voters for the whole manifest are
+  resolved with one set-based query per ENROLL_LOOKUP_CHUNK registration
+  numbers, instead of a record lookup and a voter lookup per student
+- wallet addresses are random 128-bit hex strings; the unique constraint is
+  the only check, instead of a uniqueness query per generated value
+- photos are extracted chunk by chunk and embedded FACE_BATCH_SIZE at a time,
+  with several chunks in flight so every face pool worker stays busy
+- voters are inserted with one executemany per chunk and picked up by the
+  relayer's batched on-chain registration
+
+Results are streamed back as NDJSON, one line per manifest row and a final
+summary, so a long roster does not sit behind a proxy timeout.
+"""
+
+import csv
+import io
+import os
+import time
+import uuid
+import shutil
+import tempfile
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import and_, insert
+from beevs import db, face_engine
+from beevs.models import Voter, InstitutionalRecord
+from beevs.face import embedding_version, encode_embedding
+from beevs.exceptions import ValidationError, ServiceUnavailableError
+from beevs.images import image_store
+
+PHOTO_EXTENSIONS = {'png', 'jpg', 'jpeg'}
+
+
+def open_archive(file_storage):
+    """Open an uploaded zip. It is copied to a private temporary file first
+    because the upload is closed before a streamed response finishes."""
+    spooled = tempfile.TemporaryFile()
+    shutil.copyfileobj(file_storage.stream, spooled, 1024 * 1024)
+    spooled.seek(0)
+    try:
+        archive = zipfile.ZipFile(spooled)
+    except zipfile.BadZipFile:
+        spooled.close()
+        raise ValidationError(message='Validation failed', errors={'photos': 'Not a valid zip archive'}, status_code=400)
+    # index members by their path and by their bare file name
+    members = {}
+    for info in archive.infolist():
+        if info.is_dir():
+            continue
+        members.setdefault(info.filename, info)
+        members.setdefault(os.path.basename(info.filename), info)
+    return archive, members
+
+
+def close_archive(archive):
+    fp = archive.fp
+    archive.close()
+    if fp is not None:
+        fp.close()
+
+
+def read_manifest(binary_stream):
+    """Rows of (row number, registration_number, photo, name or None) from the manifest CSV."""
+    try:
+        reader = csv.DictReader(io.TextIOWrapper(binary_stream, encoding='utf-8'))
+        fieldnames = [c.strip().lower() for c in reader.fieldnames or []]
+    except Exception as e:
+        raise ValidationError(message='Failed to read manifest', errors={'manifest': str(e)}, status_code=400)
+    missing = {'registration_number', 'photo'} - set(fieldnames)
+    if missing:
+        raise ValidationError(message='Manifest missing required columns', errors={'missing_columns': sorted(missing)}, status_code=400)
+
+    rows = []
+    try:
+        for idx, row in enumerate(reader, start=1):
+            data = {k.strip().lower(): (v.strip() if v is not None else '') for k, v in row.items() if k is not None}
+            rows.append((idx, data.get('registration_number', ''), data.get('photo', ''), data.get('name') or None))
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise ValidationError(message='Failed to read manifest', errors={'manifest': str(e)}, status_code=400)
+    return rows
+
+
+def resolve_records(election_id, reg_nos):
+    """registration_number -> (record id, record name, existing voter id or None), set-based."""
+    chunk_size = current_app.config.get('ENROLL_LOOKUP_CHUNK', 1000)
+    resolved = {}
+    reg_nos = list(reg_nos)
+    for start in range(0, len(reg_nos), chunk_size):
+        rows = db.session.query(
+            InstitutionalRecord.registration_number,
+            InstitutionalRecord.id,
+            InstitutionalRecord.name,
+            Voter.id
+        ).outerjoin(
+            Voter, and_(Voter.student_record_id == InstitutionalRecord.id, Voter.election_id == election_id)
+        ).filter(
+            InstitutionalRecord.election_id == election_id,
+            InstitutionalRecord.registration_number.in_(reg_nos[start:start + chunk_size])
+        ).all()
+        for reg_no, record_id, name, voter_id in rows:
+            resolved[reg_no] = (record_id, name, voter_id)
+    return resolved
+
+
+def plan_enrollment(election_id, rows, members):
+    """Split manifest rows into enrollable entries and row results for the rejected ones."""
+    resolved = resolve_records(election_id, {reg_no for _, reg_no, _, _ in rows if reg_no})
+    seen = set()
+    entries, rejected = [], []
+
+    def reject(idx, reg_no, error):
+        rejected.append({'row': idx, 'registration_number': reg_no, 'status': 'rejected', 'error': error})
+
+    for idx, reg_no, photo, name in rows:
+        if not reg_no or not photo:
+            reject(idx, reg_no, 'registration_number and photo are required')
+            continue
+        if reg_no in seen:
+            reject(idx, reg_no, 'Duplicate registration_number in manifest')
+            continue
+        seen.add(reg_no)
+        record = resolved.get(reg_no)
+        if record is None:
+            reject(idx, reg_no, 'Institutional record not found')
+            continue
+        record_id, record_name, voter_id = record
+        if name and name.strip() != record_name.strip():
+            reject(idx, reg_no, 'Name does not match the institutional record')
+            continue
+        if voter_id is not None:
+            reject(idx, reg_no, 'This student is already registered to vote')
+            continue
+        info = members.get(photo)
+        ext = photo.rsplit('.', 1)[-1].lower() if '.' in photo else ''
+        if info is None:
+            reject(idx, reg_no, f'Photo {photo} not found in archive')
+            continue
+        if ext not in PHOTO_EXTENSIONS:
+            reject(idx, reg_no, 'Invalid image file')
+            continue
+        if info.file_size > current_app.config.get('ENROLL_MAX_PHOTO_BYTES', 10 * 1024 * 1024):
+            reject(idx, reg_no, 'Photo is too large')
+            continue
+        entries.append({'row': idx, 'registration_number': reg_no, 'record_id': record_id,
+                        'name': record_name, 'member': info, 'ext': ext})
+    return entries, rejected
+
+
+def _extract(archive, entries):
+    """Store each entry's photo in the image store; entries whose photo does not decode get no filename"""
+    for entry in entries:
+        try:
+            with archive.open(entry['member']) as src:
+                entry['filename'] = image_store.save(src, entry['ext'])
+        except ValidationError:
+            entry['filename'] = None
+            continue
+        entry['path'] = image_store.path(entry['filename'])
+
+
+def _check_chunk(entries):
+    """Face checks aligned with `entries` (None for entries without a stored photo)"""
+    paths = [entry['path'] for entry in entries if entry['filename']]
+    checks = []
+    # Wait out a saturated pool rather than failing the whole roster
+    for attempt in range(5 if paths else 0):
+        try:
+            checks = face_engine.check_references(paths)
+            break
+        except ServiceUnavailableError as e:
+            if attempt == 4:
+                raise
+            time.sleep(e.retry_after)
+    checks = iter(checks)
+    return [next(checks) if entry['filename'] else None for entry in entries]
+
+
+def _insert_voters(election_id, entries, host_url, version):
+    now = datetime.now()
+    rows = [{
+        'name': entry['name'],
+        'image_url': image_store.url(entry['filename'], host_url),
+        'wallet_address': uuid.uuid4().hex,
+        'created_at': now,
+        'election_id': election_id,
+        'student_record_id': entry['record_id'],
+        'face_embedding': encode_embedding(entry['embedding']) if entry.get('embedding') is not None else None,
+        'face_embedding_version': version if entry.get('embedding') is not None else None
+    } for entry in entries]
+    if rows:
+        db.session.execute(insert(Voter.__table__), rows)
+    db.session.commit()
+
+
+def enroll(election_id, archive, entries, host_url, require_face=True):
+    """Extract, embed and insert `entries`; yields one result dict per entry."""
+    batch_size = max(int(current_app.config.get('FACE_BATCH_SIZE') or 1), 1)
+    parallel = max(face_engine.pool_workers, 1)
+    version = embedding_version()
+    chunks = [entries[start:start + batch_size] for start in range(0, len(entries), batch_size)]
+
+    with ThreadPoolExecutor(max_workers=parallel, thread_name_prefix='beevs-enroll') as executor:
+        in_flight = deque()
+        next_chunk = 0
+        while next_chunk < len(chunks) or in_flight:
+            # keep every pool worker fed; photos are extracted just before their chunk is submitted
+            while next_chunk < len(chunks) and len(in_flight) < parallel:
+                chunk = chunks[next_chunk]
+                _extract(archive, chunk)
+                in_flight.append((chunk, executor.submit(_check_chunk, chunk)))
+                next_chunk += 1
+
+            chunk, future = in_flight.popleft()
+            try:
+                checks = future.result()
+            except Exception as e:
+                current_app.logger.exception('Face check failed during bulk enrollment')
+                checks = [{'embedding': None, 'error': str(e)} for _ in chunk]
+
+            accepted, unused, results = [], [], []
+            for entry, check in zip(chunk, checks):
+                if entry['filename'] is None:
+                    results.append({'row': entry['row'], 'registration_number': entry['registration_number'],
+                                    'status': 'rejected', 'error': 'Invalid image file'})
+                    continue
+                entry['embedding'] = check.get('embedding')
+                if entry['embedding'] is None and require_face:
+                    unused.append(entry)
+                    results.append({'row': entry['row'], 'registration_number': entry['registration_number'],
+                                    'status': 'rejected', 'error': check.get('error') or 'No face detected'})
+                    continue
+                accepted.append(entry)
+                results.append({'row': entry['row'], 'registration_number': entry['registration_number'],
+                                'status': 'enrolled', 'embedding_ok': entry['embedding'] is not None})
+
+            try:
+                _insert_voters(election_id, accepted, host_url, version)
+            except Exception as e:
+                db.session.rollback()
+                current_app.logger.exception('Failed to insert enrolled voters')
+                unused.extend(accepted)
+                results = [dict(r, status='rejected', error=f'Failed to save voter: {e}') if r['status'] == 'enrolled' else r
+                           for r in results]
+
+            # photos are shared by identical uploads, so only unreferenced ones are removed
+            for entry in unused:
+                image_store.release(image_store.url(entry['filename'], host_url))
+
+            for result in results:
+                yield result
@@ -6,7 +6,7 @@ from flask import current_app as app
 from flask_jwt_extended import JWTManager
 from flask_jwt_extended.exceptions import JWTExtendedException
 from beevs.response import APIResponse
-from beevs.exceptions import ValidationError, AuthenticationError, AuthorizationError, NotFoundError
+from beevs.exceptions import ValidationError, AuthenticationError, AuthorizationError, NotFoundError, ServiceUnavailableError, TooManyRequestsError
 from beevs import jwt
 
 
@@ -50,6 +50,30 @@ def handle_not_found_error(error):
     )
 
 
+@app.errorhandler(ServiceUnavailableError)
+def handle_service_unavailable_error(error):
+    """Handle ServiceUnavailableError exceptions"""
+    response, status_code = APIResponse.error(
+        message=error.message,
+        errors={"service": error.message},
+        status_code=error.status_code
+    )
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, status_code
+
+
+@app.errorhandler(TooManyRequestsError)
+def handle_too_many_requests_error(error):
+    """Handle TooManyRequestsError exceptions"""
+    response, status_code = APIResponse.error(
+        message=error.message,
+        errors={"rate_limit": error.message},
+        status_code=error.status_code
+    )
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, status_code
+
+
 @app.errorhandler(500)
 def handle_internal_error(error):
     """Handle internal server errors"""
@@ -46,3 +46,27 @@ class NotFoundError(Exception):
         self.message = message
         self.status_code = status_code
         super().__init__(self.message)
+
+
+class ServiceUnavailableError(Exception):
+    """
+    Custom service unavailable exception
+    Used when a bounded resource is saturated and the client should retry later
+    """
+    def __init__(self, message="Service temporarily unavailable, retry later", retry_after=5, status_code=503):
+        self.message = message
+        self.retry_after = retry_after
+        self.status_code = status_code
+        super().__init__(self.message)
+
+
+class TooManyRequestsError(Exception):
+    """
+    Custom rate limit exception
+    Used when a client has made too many attempts and should retry after retry_after seconds
+    """
+    def __init__(self, message="Too many requests, retry later", retry_after=60, status_code=429):
+        self.message = message
+        self.retry_after = retry_after
+        self.status_code = status_code
+        super().__init__(self.message)
@@ -0,0 +1,422 @@
+"""
+Face recognition engine for the BEEVS application
+
+Reference photos are embedded once (at registration or by the backfill script)
+and stored on the voter row as float32 bytes, so authentication only has to
+embed the live capture and compare it against the stored vector.
+
+The engine keeps the detector and recognizer resident. It is created alongside
+the other extensions and preloaded in create_app(), so the first voter on a
+worker does not pay for model loading. Inference runs in a dedicated process
+pool behind a bounded number of slots: when every slot is taken the request is
+rejected with a 503 instead of queueing behind the camera line, and the Flask
+worker threads stay free for admin and results traffic.
+"""
+
+import os
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+import cv2
+from flask import current_app as app
+from deepface import DeepFace
+from beevs.config import Config
+from beevs.exceptions import ServiceUnavailableError
+
+
+def embedding_version():
+    """Identifier for the model/detector pair that produced an embedding"""
+    return f"{Config.FACE_MODEL_NAME}/{Config.FACE_DETECTOR_BACKEND}"
+
+
+def reference_image_path(image_url):
+    """Resolve a stored image_url to its original file in the image store (or static/images)"""
+    return app.extensions['image_store'].resolve(image_url)
+
+
+def decode_image(file, max_side=None):
+    """Decode an uploaded image (FileStorage, stream or bytes) into a BGR array.
+
+    Large captures are downscaled so the longest side is at most `max_side`
+    (FACE_MAX_IMAGE_SIDE by default); the detector resizes internally anyway, so
+    shrinking early only saves decode-to-inference copying. Raises ValueError
+    when the payload is not a decodable image.
+    """
+    if isinstance(file, (bytes, bytearray)):
+        data = bytes(file)
+    else:
+        stream = getattr(file, 'stream', file)
+        data = stream.read()
+
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    image = cv2.imdecode(buffer, cv2.IMREAD_COLOR) if buffer.size else None
+    if image is None:
+        raise ValueError('Invalid image file')
+
+    max_side = Config.FACE_MAX_IMAGE_SIDE if max_side is None else max_side
+    height, width = image.shape[:2]
+    if max_side and max(height, width) > max_side:
+        scale = max_side / float(max(height, width))
+        image = cv2.resize(image, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+    return image
+
+
+def encode_embedding(vector):
+    return np.asarray(vector, dtype=np.float32).tobytes()
+
+
+def decode_embedding(blob):
+    return np.frombuffer(blob, dtype=np.float32)
+
+
+def cosine_distance(a, b):
+    a = np.asarray(a, dtype=np.float32)
+    b = np.asarray(b, dtype=np.float32)
+    denom = float(np.linalg.norm(a) * np.linalg.norm(b))
+    if denom == 0.0:
+        return 1.0
+    return 1.0 - float(np.dot(a, b)) / denom
+
+
+def store_embedding(voter, vector):
+    """Attach an embedding to a voter. The caller is responsible for committing."""
+    voter.face_embedding = encode_embedding(vector)
+    voter.face_embedding_version = embedding_version()
+
+
+def _load_models(model_name, detector_backend):
+    DeepFace.build_model(model_name)
+    # A throwaway pass builds the detector and traces the inference graph
+    blank = np.zeros((224, 224, 3), dtype=np.uint8)
+    DeepFace.represent(
+        img_path=blank,
+        model_name=model_name,
+        detector_backend=detector_backend,
+        enforce_detection=False
+    )
+
+
+def _represent(image, model_name, detector_backend):
+    """Embed the largest face in `image` (path or array) as float32."""
+    representations = DeepFace.represent(
+        img_path=image,
+        model_name=model_name,
+        detector_backend=detector_backend,
+        enforce_detection=False
+    )
+    if not representations:
+        raise ValueError('Face could not be detected in the image')
+
+    def _area(rep):
+        area = rep.get('facial_area') or {}
+        return int(area.get('w') or 0) * int(area.get('h') or 0)
+
+    best = max(representations, key=_area)
+    return np.asarray(best['embedding'], dtype=np.float32)
+
+
+# Laplacian variance at which a face crop counts as fully sharp for quality scoring
+_SHARPNESS_REFERENCE = 100.0
+
+
+def _largest_face(faces):
+    def _area(face):
+        area = face.get('facial_area') or {}
+        return int(area.get('w') or 0) * int(area.get('h') or 0)
+    return max(faces, key=_area) if faces else None
+
+
+def _embed_faces(crops, model_name):
+    """Embed detected face crops in one forward pass.
+
+    Mirrors DeepFace.represent's preprocessing (RGB crop -> BGR, padded resize to
+    the model input) so the vectors match the ones stored at registration. Falls
+    back to one represent() call per crop on DeepFace versions without the
+    preprocessing module.
+    """
+    try:
+        from deepface.modules import preprocessing
+    except ImportError:
+        preprocessing = None
+
+    model = DeepFace.build_model(model_name)
+    if preprocessing is None or not hasattr(model, 'model') or not hasattr(model, 'input_shape'):
+        return [
+            _represent((crop[:, :, ::-1] * 255).astype(np.uint8), model_name, 'skip')
+            for crop in crops
+        ]
+
+    target_h, target_w = model.input_shape[1], model.input_shape[0]
+    batch = np.concatenate([
+        preprocessing.resize_image(img=crop[:, :, ::-1], target_size=(target_h, target_w))
+        for crop in crops
+    ])
+    vectors = model.model.predict(batch, verbose=0)
+    return [np.asarray(v, dtype=np.float32) for v in vectors]
+
+
+def _check_references(paths, model_name, detector_backend):
+    """Detect and embed a chunk of reference photos, reporting per-image quality.
+
+    Detection runs per image; recognition runs once for the whole chunk.
+    """
+    results = []
+    crops = []
+    for path in paths:
+        result = {'face_present': False, 'embedding': None, 'confidence': None,
+                  'face_size': None, 'sharpness': None, 'quality': 0.0, 'error': None}
+        results.append(result)
+        try:
+            faces = DeepFace.extract_faces(
+                img_path=path,
+                detector_backend=detector_backend,
+                enforce_detection=True,
+                align=True
+            )
+        except ValueError:
+            result['error'] = 'No face detected'
+            continue
+        except Exception as e:
+            result['error'] = str(e)
+            continue
+
+        best = _largest_face(faces)
+        crop = best['face']
+        area = best.get('facial_area') or {}
+        confidence = float(best.get('confidence') or 0.0)
+        gray = cv2.cvtColor((crop * 255).astype(np.uint8), cv2.COLOR_RGB2GRAY)
+        sharpness = float(cv2.Laplacian(gray, cv2.CV_64F).var())
+
+        result.update({
+            'face_present': True,
+            'confidence': confidence,
+            'face_size': min(int(area.get('w') or 0), int(area.get('h') or 0)),
+            'sharpness': round(sharpness, 2),
+            'quality': round(confidence * min(1.0, sharpness / _SHARPNESS_REFERENCE), 3)
+        })
+        crops.append((result, crop))
+
+    if crops:
+        try:
+            vectors = _embed_faces([crop for _, crop in crops], model_name)
+            for (result, _), vector in zip(crops, vectors):
+                result['embedding'] = vector
+        except Exception as e:
+            for result, _ in crops:
+                result['error'] = f'Embedding failed: {str(e)}'
+    return results
+
+
+def _worker_ready():
+    """No-op task used to make sure a pool worker has run its initializer."""
+    return os.getpid()
+
+
+class FaceEngine:
+    """Face detector + recognizer with an optional inference process pool.
+
+    With FACE_POOL_WORKERS > 0 every worker process loads the models once in its
+    initializer and embed() submits to the pool; at most FACE_POOL_WORKERS +
+    FACE_QUEUE_SIZE embeddings may be running or waiting at a time. With
+    FACE_POOL_WORKERS = 0 the models live in the web process and run on the
+    request thread.
+    """
+
+    def __init__(self, app=None):
+        self.model_name = Config.FACE_MODEL_NAME
+        self.detector_backend = Config.FACE_DETECTOR_BACKEND
+        self.threshold = Config.FACE_DISTANCE_THRESHOLD
+        self.pool_workers = Config.FACE_POOL_WORKERS
+        self.queue_size = Config.FACE_QUEUE_SIZE
+        self.timeout = Config.FACE_TIMEOUT
+        self.loaded = False
+        self.load_seconds = None
+        self.load_error = None
+        self._lock = threading.Lock()
+        self._executor = None
+        self._executor_pid = None
+        self._slots = threading.BoundedSemaphore(max(self.pool_workers + self.queue_size, 1))
+        self._in_flight = 0
+        self._in_flight_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions['face_engine'] = self
+
+        if app.config.get('FACE_PRELOAD'):
+            try:
+                self.preload()
+            except Exception:
+                # Keep serving; readiness reports the failure and embed() retries the load
+                app.logger.exception('Failed to preload face models')
+
+    def _get_executor(self):
+        """Return this process's pool, recreating it after a fork or a crashed worker."""
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.pool_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_load_models,
+                    initargs=(self.model_name, self.detector_backend)
+                )
+                self._executor_pid = os.getpid()
+                self._warm(self._executor)
+            return self._executor
+
+    def _reset_executor(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self.loaded = False
+
+    def _warm(self, executor):
+        """Start every worker of a new pool; `loaded` flips once all have loaded the models."""
+        self.loaded = False
+        started = time.monotonic()
+        futures = [executor.submit(_worker_ready) for _ in range(self.pool_workers)]
+        remaining = [len(futures)]
+        counter_lock = threading.Lock()
+
+        def _done(future):
+            error = None if future.cancelled() else future.exception()
+            with counter_lock:
+                if error is not None:
+                    self.load_error = str(error)
+                    return
+                remaining[0] -= 1
+                if remaining[0] == 0 and self._executor is executor:
+                    self.loaded = True
+                    self.load_error = None
+                    self.load_seconds = time.monotonic() - started
+
+        for future in futures:
+            future.add_done_callback(_done)
+
+    def preload(self):
+        """Load and warm the recognizer and detector (idempotent).
+
+        In pool mode this starts the workers and returns immediately; `loaded`
+        flips once all of them have finished loading.
+        """
+        if self.pool_workers > 0:
+            self._get_executor()
+            return
+        if self.loaded:
+            return
+        with self._lock:
+            if self.loaded:
+                return
+            started = time.monotonic()
+            try:
+                _load_models(self.model_name, self.detector_backend)
+            except Exception as e:
+                self.load_error = str(e)
+                raise
+            self.loaded = True
+            self.load_error = None
+            self.load_seconds = time.monotonic() - started
+
+    def status(self):
+        return {
+            'loaded': self.loaded,
+            'model': self.model_name,
+            'detector': self.detector_backend,
+            'load_seconds': self.load_seconds,
+            'error': self.load_error,
+            'pool_workers': self.pool_workers,
+            'capacity': self.pool_workers + self.queue_size,
+            'in_flight': self._in_flight
+        }
+
+    def _submit(self, fn, *args, timeout=None):
+        """Run fn(*args) in the pool, rejecting immediately when every slot is taken."""
+        if not self._slots.acquire(blocking=False):
+            raise ServiceUnavailableError(message='Face verification is busy, please retry shortly')
+
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            self._reset_executor()
+            raise ServiceUnavailableError(message='Face verification is unavailable, please retry shortly')
+
+        # The slot is held until the task really finishes, even if the caller gave up on it
+        with self._in_flight_lock:
+            self._in_flight += 1
+
+        def _release(_):
+            with self._in_flight_lock:
+                self._in_flight -= 1
+            self._slots.release()
+
+        future.add_done_callback(_release)
+
+        try:
+            return future.result(timeout=timeout or self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise ServiceUnavailableError(message='Face verification timed out, please retry')
+        except BrokenProcessPool:
+            self._reset_executor()
+            raise ServiceUnavailableError(message='Face verification is unavailable, please retry shortly')
+
+    def embed(self, image):
+        """Detect the face in `image` (path or array) and return its embedding as float32.
+
+        When several faces are found the largest one is used. Raises ValueError when
+        no face can be detected, mirroring DeepFace, and ServiceUnavailableError when
+        the pool is saturated or times out.
+        """
+        if self.pool_workers > 0:
+            return self._submit(_represent, image, self.model_name, self.detector_backend)
+
+        self.preload()
+        return _represent(image, self.model_name, self.detector_backend)
+
+    def check_references(self, paths):
+        """Check a chunk of reference photos in one pool task.
+
+        Returns one dict per path with face_present, embedding (float32 or None),
+        confidence, face_size, sharpness, quality (0..1) and error.
+        """
+        if self.pool_workers > 0:
+            # One task covers the whole chunk, so allow it a per-image budget
+            return self._submit(_check_references, list(paths), self.model_name, self.detector_backend,
+                                timeout=self.timeout * max(len(paths), 1))
+
+        self.preload()
+        return _check_references(list(paths), self.model_name, self.detector_backend)
+
+    def verify(self, known, live):
+        """Compare a known face against a live image.
+
+        `known` may be a stored embedding vector or an image. Returns a dict shaped
+        like DeepFace.verify's result: verified, distance, threshold.
+        """
+        if not isinstance(known, np.ndarray) or known.ndim != 1:
+            known = self.embed(known)
+        distance = cosine_distance(known, self.embed(live))
+        return {
+            'verified': distance <= self.threshold,
+            'distance': distance,
+            'threshold': self.threshold
+        }
+
+    def reference_embedding(self, voter):
+        """Return the stored embedding for a voter, computing it from the photo if missing or stale.
+
+        A freshly computed embedding is stored on the voter; the caller is responsible
+        for committing.
+        """
+        if voter.face_embedding and voter.face_embedding_version == embedding_version():
+            return decode_embedding(voter.face_embedding)
+
+        vector = self.embed(reference_image_path(voter.image_url))
+        store_embedding(voter, vector)
+        return vector
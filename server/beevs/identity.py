@@ -0,0 +1,164 @@
+"""
+Request principal and identity map for the BEEVS application
+
+Tokens carry two kinds of identity: admin tokens have the admin id as the
+subject and a 'role' claim; voter tokens (from vote-auth / audit-auth) have a
+'voter:<id>' subject with 'election_id', 'voter_id' and a 'vote_auth' or
+'audit_auth' claim. load_principal is registered as the JWTManager user
+lookup, so the claims are parsed once per request into a Principal, which
+handlers get from current_principal() instead of calling get_jwt() and
+casting ids themselves. The loader does no database work: entities are
+loaded on first use.
+
+Entities go through a per-request identity map kept on flask.g. get() loads
+a row by primary key at most once per request (misses are remembered too),
+load_many() fetches every id that is not already mapped with one IN query,
+and the voter session loader fetches the election, voter and institutional
+record a voter handler needs in a single statement.
+"""
+
+from flask import g
+from flask_jwt_extended import get_current_user
+from beevs import db
+from beevs.models import Admin, Election, Voter, InstitutionalRecord
+from beevs.exceptions import AuthorizationError, NotFoundError, ValidationError
+
+
+class IdentityMap:
+    """Per-request (model, primary key) -> instance map; None marks a known miss"""
+
+    @property
+    def _entries(self):
+        entries = g.get('_beevs_identity_map')
+        if entries is None:
+            entries = g._beevs_identity_map = {}
+        return entries
+
+    def get(self, model, ident):
+        if ident is None:
+            return None
+        key = (model, int(ident))
+        entries = self._entries
+        if key not in entries:
+            entries[key] = db.session.get(model, key[1])
+        return entries[key]
+
+    def load_many(self, model, idents):
+        """Map each id to its instance (or None), with one query for the ids not yet loaded"""
+        idents = [int(i) for i in idents]
+        entries = self._entries
+        missing = list({i for i in idents if (model, i) not in entries})
+        if missing:
+            for instance in model.query.filter(model.id.in_(missing)).all():
+                entries[(model, instance.id)] = instance
+            for i in missing:
+                entries.setdefault((model, i), None)
+        return {i: entries[(model, i)] for i in idents}
+
+    def add(self, instance):
+        self._entries[(type(instance), instance.id)] = instance
+        return instance
+
+
+identity_map = IdentityMap()
+
+
+class Principal:
+    """The caller behind a verified JWT"""
+
+    def __init__(self, identity, claims):
+        self.identity = identity
+        self.claims = claims
+        self.role = claims.get('role')
+        self.admin_id = None
+        self.voter_id = None
+        if isinstance(identity, str) and identity.startswith('voter:'):
+            self.voter_id = _int_or_none(claims.get('voter_id', identity.split(':', 1)[1]))
+        else:
+            self.admin_id = _int_or_none(identity)
+        self.election_id = _int_or_none(claims.get('election_id'))
+
+    @property
+    def is_voter(self):
+        return self.voter_id is not None
+
+    @property
+    def is_super_admin(self):
+        return self.admin_id is not None and self.role == 'super_admin'
+
+    def require_admin(self):
+        """The admin id; raises AuthorizationError for voter or malformed tokens"""
+        if self.admin_id is None:
+            raise AuthorizationError(message='Invalid token identity')
+        return self.admin_id
+
+    @property
+    def admin(self):
+        return identity_map.get(Admin, self.admin_id)
+
+    @property
+    def voter(self):
+        return identity_map.get(Voter, self.voter_id)
+
+    def voter_session(self, claim, election_id, load_record=False):
+        """Check a voter token for the given election and load what the handler needs.
+
+        claim is 'vote_auth' or 'audit_auth'. Returns (voter, election, record),
+        fetched together in one statement; record is None unless load_record.
+        """
+        unauthorized, invalid = _VOTER_TOKEN_ERRORS[claim]
+        if not self.claims.get(claim):
+            raise ValidationError(message=unauthorized, status_code=401)
+        if self.election_id is None or self.election_id != int(election_id):
+            raise ValidationError(message='Token election mismatch', status_code=401)
+        if self.voter_id is None:
+            raise ValidationError(message=invalid, status_code=401)
+
+        election, voter, record = load_voter_session(int(election_id), self.voter_id, load_record)
+        if not voter:
+            raise NotFoundError(message='Voter not found')
+        if not election:
+            raise NotFoundError(message='Election not found')
+        return voter, election, record
+
+
+_VOTER_TOKEN_ERRORS = {
+    'vote_auth': ('Unauthorized to vote', 'Invalid voter token'),
+    'audit_auth': ('Unauthorized to view audit', 'Invalid audit token'),
+}
+
+
+def _int_or_none(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def load_voter_session(election_id, voter_id, load_record=False):
+    """(election, voter, record) with one query; voter is None unless it belongs to the election"""
+    entities = [Election, Voter] + ([InstitutionalRecord] if load_record else [])
+    query = db.session.query(*entities).select_from(Election).outerjoin(
+        Voter, db.and_(Voter.id == voter_id, Voter.election_id == Election.id)
+    )
+    if load_record:
+        query = query.outerjoin(InstitutionalRecord, InstitutionalRecord.id == Voter.student_record_id)
+    row = query.filter(Election.id == election_id).first()
+    if row is None:
+        # no election; report the voter as the handlers always have
+        return None, identity_map.get(Voter, voter_id), None
+
+    for instance in row:
+        if instance is not None:
+            identity_map.add(instance)
+    election, voter = row[0], row[1]
+    return election, voter, row[2] if load_record else None
+
+
+def load_principal(jwt_header, jwt_data):
+    """JWTManager user lookup: parse the verified claims once per request"""
+    return Principal(jwt_data.get('sub'), jwt_data)
+
+
+def current_principal():
+    return get_current_user()
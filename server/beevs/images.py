@@ -0,0 +1,213 @@
+"""
+Image storage for the BEEVS application
+
+Candidate and voter photos are stored by content: an upload is hashed
+(SHA-256) while it is copied and kept once as <root>/<aa>/<digest>.<ext>, so
+the same photo uploaded twice takes one file and one URL. Resized variants,
+bounded by each of IMAGE_VARIANT_SIZES, are written next to it as WebP and
+JPEG (<digest>_<size>.webp / .jpg) when the photo is stored, so list views
+load a few-kilobyte avatar instead of the full upload.
+
+Files are served by GET /media/<name>. A name never changes content, so
+responses carry a long-lived immutable Cache-Control, are conditional
+(ETag / If-None-Match) and honour Range requests. The body goes out through
+the server's sendfile (wsgi.file_wrapper), or is handed to the proxy with
+X-Sendfile (USE_X_SENDFILE) or X-Accel-Redirect (IMAGE_ACCEL_REDIRECT).
+
+Photos stored before this module keep their /static/images URLs and are
+resolved from static/images; scripts/migrate_images.py moves them over.
+"""
+
+import os
+import re
+import glob
+import hashlib
+import tempfile
+import cv2
+from beevs import db
+from beevs.models import Candidate, Voter
+from beevs.exceptions import ValidationError
+
+_COPY_BUFSIZE = 1024 * 1024
+
+# accepted upload extensions and the extension they are stored under
+IMAGE_EXTENSIONS = {'png': 'png', 'jpg': 'jpg', 'jpeg': 'jpg'}
+VARIANT_FORMATS = ('webp', 'jpg')
+MIMETYPES = {'png': 'image/png', 'jpg': 'image/jpeg', 'webp': 'image/webp'}
+NAME_PATTERN = re.compile(r'^(?P<digest>[0-9a-f]{64})(?:_(?P<size>\d+))?\.(?P<ext>png|jpg|webp)$')
+
+
+class ImageStore:
+    def __init__(self, app=None):
+        self.root = None
+        self.legacy_dir = None
+        self.sizes = (96, 256)
+        self.quality = 80
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.root = app.config.get('IMAGE_STORE_DIR') or os.path.join(app.instance_path, 'images')
+        self.legacy_dir = os.path.join(app.root_path, 'static', 'images')
+        sizes = app.config.get('IMAGE_VARIANT_SIZES')
+        if sizes:
+            self.sizes = tuple(sorted({int(s) for s in str(sizes).split(',') if s.strip()}))
+        self.quality = app.config.get('IMAGE_VARIANT_QUALITY', self.quality)
+        app.extensions['image_store'] = self
+
+    # ------------------------------------------------------------------
+    # Names, paths and URLs
+    # ------------------------------------------------------------------
+
+    def path(self, name):
+        """File path of a stored original or variant name"""
+        return os.path.join(self.root, name[:2], name)
+
+    def url(self, name, base):
+        """Public URL of a stored name; base is the API host (request.host_url)"""
+        return f"{base.rstrip('/')}/media/{name}"
+
+    def name_from_url(self, image_url):
+        """Stored original name of an image_url, or None for a legacy /static/images URL"""
+        name = os.path.basename(image_url or '')
+        match = NAME_PATTERN.match(name)
+        if not match or match.group('size') or '/media/' not in image_url:
+            return None
+        return name
+
+    def resolve(self, image_url):
+        """Local file of the original image behind an image_url"""
+        name = self.name_from_url(image_url)
+        if name is None:
+            return os.path.join(self.legacy_dir, os.path.basename(image_url))
+        return self.path(name)
+
+    # ------------------------------------------------------------------
+    # Storing
+    # ------------------------------------------------------------------
+
+    def save(self, file, ext):
+        """Store an upload (FileStorage or binary stream) and its variants.
+
+        Returns the stored name, '<digest>.<ext>'. Raises ValidationError when
+        the extension is not allowed or the payload is not a decodable image.
+        """
+        ext = IMAGE_EXTENSIONS.get((ext or '').lower())
+        if ext is None:
+            raise ValidationError(message='Validation failed', errors={'image': 'Invalid image file'}, status_code=400)
+
+        os.makedirs(self.root, exist_ok=True)
+        stream = getattr(file, 'stream', file)
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                while True:
+                    block = stream.read(_COPY_BUFSIZE)
+                    if not block:
+                        break
+                    digest.update(block)
+                    out.write(block)
+            name = f'{digest.hexdigest()}.{ext}'
+            path = self.path(name)
+            image = None
+            if os.path.exists(path):
+                # already stored: the new copy is dropped
+                os.remove(tmp_path)
+            else:
+                image = cv2.imread(tmp_path, cv2.IMREAD_COLOR)
+                if image is None:
+                    raise ValidationError(message='Validation failed', errors={'image': 'Invalid image file'}, status_code=400)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        self.ensure_variants(name, image)
+        return name
+
+    def _variant_name(self, digest, size, fmt):
+        return f'{digest}_{size}.{fmt}'
+
+    def ensure_variants(self, name, image=None):
+        """Write any missing variants of a stored original (decoded only if something is missing)"""
+        digest = name.split('.', 1)[0]
+        for size in self.sizes:
+            for fmt in VARIANT_FORMATS:
+                path = self.path(self._variant_name(digest, size, fmt))
+                if os.path.exists(path):
+                    continue
+                if image is None:
+                    image = cv2.imread(self.path(name), cv2.IMREAD_COLOR)
+                    if image is None:
+                        return
+                self._write_variant(image, size, fmt, path)
+
+    def _write_variant(self, image, size, fmt, path):
+        height, width = image.shape[:2]
+        scale = size / max(height, width)
+        if scale < 1:
+            image = cv2.resize(image, (max(int(width * scale), 1), max(int(height * scale), 1)), interpolation=cv2.INTER_AREA)
+        if fmt == 'webp':
+            params = [cv2.IMWRITE_WEBP_QUALITY, self.quality]
+        else:
+            params = [cv2.IMWRITE_JPEG_QUALITY, self.quality, cv2.IMWRITE_JPEG_PROGRESSIVE, 1]
+        ok, buffer = cv2.imencode(f'.{fmt}', image, params)
+        if not ok:
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # written under a temporary name so a concurrent reader never sees half a file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.part')
+        with os.fdopen(fd, 'wb') as out:
+            out.write(buffer.tobytes())
+        os.replace(tmp_path, path)
+
+    # ------------------------------------------------------------------
+    # Serving and removal
+    # ------------------------------------------------------------------
+
+    def file_for(self, name):
+        """Path to serve for a /media/<name> request, or None. Variants of a
+        configured size that are missing (the size was added later) are made on demand."""
+        match = NAME_PATTERN.match(name)
+        if not match:
+            return None
+        path = self.path(name)
+        if os.path.exists(path):
+            return path
+        size = match.group('size')
+        if size is None or int(size) not in self.sizes or match.group('ext') not in VARIANT_FORMATS:
+            return None
+        originals = glob.glob(os.path.join(self.root, name[:2], f"{match.group('digest')}.*"))
+        if not originals:
+            return None
+        self.ensure_variants(os.path.basename(originals[0]))
+        return path if os.path.exists(path) else None
+
+    def in_use(self, pattern):
+        """Whether any candidate or voter image_url ends in /media/<pattern> (a LIKE pattern)"""
+        suffix = f'%/media/{pattern}'
+        return (db.session.query(Candidate.id).filter(Candidate.image_url.like(suffix)).first() is not None
+                or db.session.query(Voter.id).filter(Voter.image_url.like(suffix)).first() is not None)
+
+    def release(self, image_url):
+        """Remove an image once nothing refers to it; call after the owning row's delete is committed.
+        Stored files are shared between identical uploads, so they are only removed when unused."""
+        name = self.name_from_url(image_url)
+        if name is None:
+            paths = [os.path.join(self.legacy_dir, os.path.basename(image_url))]
+        elif self.in_use(name):
+            return
+        else:
+            digest = name.split('.', 1)[0]
+            paths = [self.path(name)]
+            # the same bytes uploaded as .png and .jpg share their variants
+            if not self.in_use(f'{digest}.%'):
+                paths += glob.glob(os.path.join(self.root, name[:2], f'{digest}_*'))
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+image_store = ImageStore()
@@ -0,0 +1,234 @@
+"""
+Background import jobs for the BEEVS application
+
+Roster uploads are no longer parsed inside the HTTP request. The upload
+endpoint spools the file to IMPORT_SPOOL_DIR while hashing it, creates an
+ImportJob row and returns 202; a small thread pool in the web process
+(IMPORT_WORKERS) then feeds the spooled file through beevs.ingest.
+
+- progress (rows processed, saved, error count and a sample of row errors)
+  is written to the job row in the same transaction as each chunk, so
+  GET /api/v1/import-jobs/<id> always reflects committed data
+- a job that failed or whose worker died resumes from its last committed
+  chunk: re-uploading the same file for the same election reuses the
+  unfinished job, and jobs left running with no progress for
+  IMPORT_STALE_AFTER seconds are picked up again by any worker
+- jobs are claimed with a conditional UPDATE, so several web processes can
+  share one spool directory without running a job twice
+"""
+
+import os
+import hashlib
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy import or_, and_
+from beevs import db
+from beevs.models import ImportJob
+from beevs.ingest import open_csv, ingest_records, IngestSummary
+from beevs.cache import response_cache
+
+_COPY_BUFSIZE = 1024 * 1024
+
+
+class ImportJobRunner:
+    def __init__(self, app=None):
+        self.workers = 2
+        self.spool_dir = None
+        self.stale_after = 300
+        self.error_samples = 50
+        self._app = None
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self._app = app
+        self.workers = app.config.get('IMPORT_WORKERS', self.workers)
+        self.spool_dir = app.config.get('IMPORT_SPOOL_DIR') or os.path.join(app.instance_path, 'import_spool')
+        self.stale_after = app.config.get('IMPORT_STALE_AFTER', self.stale_after)
+        self.error_samples = app.config.get('IMPORT_ERROR_SAMPLES', self.error_samples)
+        app.extensions['import_jobs'] = self
+        if self.workers > 0:
+            # Started lazily (like the relayer) so forked workers get their own pool
+            app.before_request(self._ensure_recovered)
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+
+    def spool(self, file_storage):
+        """Copy an upload to the spool directory. Returns (path, sha256 hex, size)."""
+        os.makedirs(self.spool_dir, exist_ok=True)
+        path = os.path.join(self.spool_dir, f'{uuid.uuid4().hex}.csv')
+        digest = hashlib.sha256()
+        size = 0
+        with open(path, 'wb') as out:
+            while True:
+                block = file_storage.stream.read(_COPY_BUFSIZE)
+                if not block:
+                    break
+                digest.update(block)
+                out.write(block)
+                size += len(block)
+        return path, digest.hexdigest(), size
+
+    def create_job(self, election_id, file_storage, admin_id=None):
+        """Spool the upload and create (or reuse, for a re-upload) a job. The caller commits and then calls submit()."""
+        path, sha256, size = self.spool(file_storage)
+        try:
+            with open(path, 'rb') as f:
+                open_csv(f)  # reject files without the required columns up front
+        except Exception:
+            os.remove(path)
+            raise
+
+        job = ImportJob.query.filter(
+            ImportJob.election_id == election_id,
+            ImportJob.file_sha256 == sha256,
+            ImportJob.status.in_(('queued', 'running', 'failed'))
+        ).order_by(ImportJob.id.desc()).first()
+        if job is not None:
+            # Same file again: keep the job and its committed progress, drop the new copy
+            # unless the old spool file is gone
+            if os.path.exists(job.spool_path):
+                os.remove(path)
+            else:
+                job.spool_path = path
+            if job.status == 'failed':
+                job.status = 'queued'
+                job.error = None
+            return job
+
+        job = ImportJob(
+            election_id=election_id,
+            admin_id=admin_id,
+            filename=file_storage.filename,
+            spool_path=path,
+            file_sha256=sha256,
+            file_size=size,
+            status='queued'
+        )
+        db.session.add(job)
+        return job
+
+    def submit(self, job_id):
+        """Run a committed job on the pool (no-op without workers; run it with run_job)."""
+        executor = self._get_executor()
+        if executor is not None:
+            executor.submit(self._run_in_app, job_id)
+
+    # ------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------
+
+    def _get_executor(self):
+        if self.workers <= 0:
+            return None
+        if self._executor is None or self._executor_pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._executor_pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='beevs-import')
+                    self._executor_pid = os.getpid()
+        return self._executor
+
+    def _ensure_recovered(self):
+        if self._executor_pid == os.getpid():
+            return
+        self._get_executor()
+        self._executor.submit(self._recover_in_app)
+
+    def _recover_in_app(self):
+        with self._app.app_context():
+            try:
+                for job_id in self.resumable_job_ids():
+                    self._executor.submit(self._run_in_app, job_id)
+            except Exception:
+                self._app.logger.exception('Import job recovery failed')
+            finally:
+                db.session.remove()
+
+    def resumable_job_ids(self):
+        """Queued jobs plus running jobs whose worker stopped making progress."""
+        stale = datetime.now() - timedelta(seconds=self.stale_after)
+        rows = db.session.query(ImportJob.id).filter(or_(
+            ImportJob.status == 'queued',
+            and_(ImportJob.status == 'running', ImportJob.updated_at < stale)
+        )).order_by(ImportJob.id.asc()).all()
+        return [row[0] for row in rows]
+
+    def _claim(self, job_id):
+        """Atomically move a job to running; False if another worker has it."""
+        stale = datetime.now() - timedelta(seconds=self.stale_after)
+        now = datetime.now()
+        claimed = ImportJob.query.filter(
+            ImportJob.id == job_id,
+            or_(ImportJob.status == 'queued', and_(ImportJob.status == 'running', ImportJob.updated_at < stale))
+        ).update({
+            'status': 'running',
+            'started_at': now,
+            'updated_at': now,
+            'resumed_from': ImportJob.rows_processed,
+            'attempts': ImportJob.attempts + 1
+        }, synchronize_session=False)
+        db.session.commit()
+        return claimed == 1
+
+    def _run_in_app(self, job_id):
+        with self._app.app_context():
+            try:
+                self.run_job(job_id)
+            except Exception:
+                self._app.logger.exception('Import job %s crashed', job_id)
+            finally:
+                db.session.remove()
+
+    def run_job(self, job_id):
+        """Claim and run one job to completion in the current app context. Returns the job."""
+        if not self._claim(job_id):
+            return db.session.get(ImportJob, job_id)
+        job = db.session.get(ImportJob, job_id)
+
+        summary = IngestSummary(self.error_samples)
+        summary.rows_processed = job.rows_processed
+        summary.saved_count = job.saved_count
+        summary.error_count = job.error_count
+        summary.errors = list(job.error_samples or [])
+
+        def checkpoint(s):
+            job.rows_processed = s.rows_processed
+            job.saved_count = s.saved_count
+            job.error_count = s.error_count
+            job.error_samples = list(s.errors)
+            job.updated_at = datetime.now()
+
+        try:
+            with open(job.spool_path, 'rb') as f:
+                ingest_records(job.election_id, open_csv(f), skip_rows=job.rows_processed, on_chunk=checkpoint, summary=summary)
+        except Exception as e:
+            db.session.rollback()
+            job = db.session.get(ImportJob, job_id)
+            job.status = 'failed'
+            job.error = str(e)[:2000]
+            job.finished_at = datetime.now()
+            db.session.commit()
+            # chunks committed before the failure are kept, so the election's counters changed too
+            response_cache.invalidate(job.election_id)
+            self._app.logger.warning('Import job %s failed after %s rows: %s', job_id, job.rows_processed, e)
+            return job
+
+        job.status = 'completed'
+        job.finished_at = datetime.now()
+        db.session.commit()
+        response_cache.invalidate(job.election_id)
+        try:
+            os.remove(job.spool_path)
+        except OSError:
+            pass
+        return job
+
+
+import_jobs = ImportJobRunner()
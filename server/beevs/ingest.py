@@ -0,0 +1,210 @@
+"""
+Bulk CSV ingest for the BEEVS application
+
+Institutional records are read from the CSV as a stream and handled in
+chunks of INGEST_CHUNK_SIZE rows:
+
+- rows are validated per chunk; registration numbers are checked against the
+  database with one IN query per chunk (served by the unique index) instead
+  of preloading the whole election
+- valid rows are written with a single statement per chunk: COPY on
+  PostgreSQL (psycopg2), an executemany INSERT elsewhere
+- each chunk is committed, so memory stays flat and a failure loses at most
+  the chunk in flight; callers can record progress in the same transaction
+  (on_chunk) and resume later with skip_rows
+
+Only a summary comes back: counts plus the first INGEST_MAX_ERRORS row errors.
+"""
+
+import csv
+import io
+import time
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from beevs import db
+from beevs.models import InstitutionalRecord
+from beevs.exceptions import ValidationError
+
+REQUIRED_COLUMNS = ('name', 'registration_number', 'department', 'faculty', 'level')
+# column order used by both COPY and INSERT
+RECORD_COLUMNS = ('name', 'registration_number', 'department', 'faculty', 'level', 'created_at', 'election_id')
+
+
+def open_csv(binary_stream):
+    """DictReader over an uploaded file, with header validation."""
+    try:
+        reader = csv.DictReader(io.TextIOWrapper(binary_stream, encoding='utf-8'))
+        header_cols = {c.strip().lower() for c in reader.fieldnames or []}
+    except Exception as e:
+        raise ValidationError(message='Failed to read CSV file', errors={'file': str(e)}, status_code=400)
+    missing = set(REQUIRED_COLUMNS) - header_cols
+    if missing:
+        raise ValidationError(message='CSV missing required columns', errors={'missing_columns': list(missing)}, status_code=400)
+    return reader
+
+
+def _validate(idx, row, seen):
+    """Normalized record dict, or (None, error entry)"""
+    data = {k.strip().lower(): (v.strip() if v is not None else '') for k, v in row.items() if k is not None}
+    row_errors = {}
+    for col in REQUIRED_COLUMNS:
+        if not data.get(col):
+            row_errors[col] = 'Required field missing'
+
+    if 'level' not in row_errors:
+        try:
+            data['level'] = int(data['level'])
+        except Exception:
+            row_errors['level'] = 'Level must be an integer'
+
+    reg_no = data.get('registration_number')
+    if reg_no and reg_no in seen:
+        row_errors['registration_number'] = 'Duplicate registration_number in CSV'
+
+    if row_errors:
+        return None, {'row': idx, 'errors': row_errors, 'data': data}
+    return data, None
+
+
+def _existing(election_id, reg_nos):
+    if not reg_nos:
+        return set()
+    return {r[0] for r in db.session.query(InstitutionalRecord.registration_number).filter(
+        InstitutionalRecord.election_id == election_id,
+        InstitutionalRecord.registration_number.in_(reg_nos)
+    ).all()}
+
+
+def _use_copy():
+    engine = db.engine
+    return engine.dialect.name == 'postgresql' and engine.dialect.driver == 'psycopg2'
+
+
+def _copy_rows(rows):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for row in rows:
+        writer.writerow([row[c].isoformat() if c == 'created_at' else row[c] for c in RECORD_COLUMNS])
+    buf.seek(0)
+    statement = f"COPY {InstitutionalRecord.__tablename__} ({', '.join(RECORD_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+    raw = db.session.connection().connection.driver_connection
+    try:
+        with raw.cursor() as cursor:
+            cursor.copy_expert(statement, buf)
+    except db.engine.dialect.dbapi.IntegrityError as e:
+        # the raw cursor bypasses SQLAlchemy; raise what the INSERT path would
+        raise IntegrityError(statement, None, e) from e
+
+
+def _write_rows(rows):
+    if not rows:
+        return
+    if _use_copy():
+        _copy_rows(rows)
+    else:
+        db.session.execute(insert(InstitutionalRecord.__table__), rows)
+
+
+class IngestSummary:
+    def __init__(self, max_errors):
+        self.max_errors = max_errors
+        self.rows_processed = 0
+        self.saved_count = 0
+        self.error_count = 0
+        self.errors = []
+        self.started_at = time.monotonic()
+
+    def add_error(self, entry):
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append(entry)
+
+    def to_dict(self):
+        elapsed = time.monotonic() - self.started_at
+        return {
+            'rows_processed': self.rows_processed,
+            'saved_count': self.saved_count,
+            'error_count': self.error_count,
+            'errors': self.errors,
+            'errors_truncated': self.error_count > len(self.errors),
+            'elapsed_seconds': round(elapsed, 3),
+            'rows_per_second': round(self.rows_processed / elapsed, 1) if elapsed > 0 else None
+        }
+
+
+def ingest_records(election_id, reader, chunk_size=None, skip_rows=0, on_chunk=None, summary=None):
+    """Stream rows from `reader` into institutional_records for an election.
+
+    skip_rows: data rows already ingested by an earlier run (they are read but
+    not processed). on_chunk(summary) is called for every chunk after its rows
+    are written and before the commit, so progress recorded there is committed
+    together with the rows.
+    """
+    chunk_size = chunk_size or current_app.config.get('INGEST_CHUNK_SIZE', 5000)
+    summary = summary or IngestSummary(current_app.config.get('INGEST_MAX_ERRORS', 1000))
+    seen = set()
+    chunk = []
+
+    for idx, row in enumerate(reader, start=1):
+        if idx <= skip_rows:
+            continue
+        chunk.append((idx, row))
+        if len(chunk) >= chunk_size:
+            _ingest_chunk(election_id, chunk, seen, summary, on_chunk)
+            chunk = []
+    if chunk:
+        _ingest_chunk(election_id, chunk, seen, summary, on_chunk)
+    return summary
+
+
+def _ingest_chunk(election_id, chunk, seen, summary, on_chunk=None):
+    now = datetime.now()
+    valid = []
+    for idx, row in chunk:
+        data, error = _validate(idx, row, seen)
+        if error:
+            summary.add_error(error)
+            continue
+        seen.add(data['registration_number'])
+        valid.append((idx, data))
+
+    for attempt in range(2):
+        existing = _existing(election_id, [data['registration_number'] for _, data in valid])
+        rows = []
+        for idx, data in valid:
+            if data['registration_number'] in existing:
+                summary.add_error({'row': idx, 'errors': {'registration_number': 'registration_number already exists for this election'}, 'data': data})
+                continue
+            rows.append({
+                'name': data['name'],
+                'registration_number': data['registration_number'],
+                'department': data['department'],
+                'faculty': data['faculty'],
+                'level': data['level'],
+                'created_at': now,
+                'election_id': election_id
+            })
+        try:
+            _write_rows(rows)
+            break
+        except IntegrityError:
+            # a concurrent upload took some of these registration numbers; look again
+            db.session.rollback()
+            if attempt:
+                raise
+            valid = [(idx, data) for idx, data in valid if data['registration_number'] not in existing]
+        except Exception:
+            db.session.rollback()
+            raise
+
+    summary.rows_processed += len(chunk)
+    summary.saved_count += len(rows)
+    try:
+        if on_chunk:
+            on_chunk(summary)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
@@ -0,0 +1,87 @@
+"""
+Listing helpers for the BEEVS application
+
+List endpoints (voters, institutional records, elections) share three
+request parameters:
+
+- fields=id,name,...  only these columns are selected (with_entities), so no
+  ORM objects are built and unrequested columns never leave the database
+- limit=N&cursor=C    keyset pagination on the primary key; the response
+  carries next_cursor (null on the last page). Without limit a page holds
+  LIST_PAGE_DEFAULT_SIZE rows, so a listing is never read unbounded; clients
+  follow next_cursor for the rest.
+- per-endpoint search filters, built by the endpoint itself
+
+Rows are ordered by id, which the (election_id, id) indexes serve directly.
+The selected column tuples are encoded to JSON by the configured serializer
+(see beevs.response.JSONSerializer.encode_rows), without building models or
+calling to_dict().
+"""
+
+from flask import request, current_app
+from beevs.exceptions import ValidationError
+from beevs.response import json_serializer
+
+
+def parse_fields(columns):
+    """Columns named in ?fields= (id always included), or all of them.
+
+    `columns` maps output field name -> column and defines what can be asked for.
+    """
+    raw = request.args.get('fields')
+    if not raw:
+        return dict(columns)
+
+    names = [name.strip() for name in raw.split(',') if name.strip()]
+    unknown = [name for name in names if name not in columns]
+    if unknown:
+        raise ValidationError(message='Unknown fields requested', errors={'fields': f'Unknown: {", ".join(unknown)}; allowed: {", ".join(columns)}'})
+    selected = {'id': columns['id']}
+    for name in names:
+        selected[name] = columns[name]
+    return selected
+
+
+def parse_int_arg(name, minimum=None):
+    raw = request.args.get(name)
+    if raw is None or raw == '':
+        return None
+    try:
+        value = int(raw)
+    except ValueError:
+        raise ValidationError(message=f'Invalid {name}', errors={name: 'Must be an integer'})
+    if minimum is not None and value < minimum:
+        raise ValidationError(message=f'Invalid {name}', errors={name: f'Must be at least {minimum}'})
+    return value
+
+
+def like_pattern(text):
+    """ILIKE pattern matching `text` anywhere, with wildcards in the input escaped."""
+    escaped = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escaped}%'
+
+
+def paginate(query, id_column, columns, descending=False):
+    """Run a listing query with projection and keyset pagination.
+
+    Returns (items, next_cursor) where items is a RawJSON array of objects
+    shaped like the model's to_dict() restricted to the selected fields.
+    """
+    selected = parse_fields(columns)
+    limit = parse_int_arg('limit', minimum=1)
+    cursor = parse_int_arg('cursor')
+
+    if cursor is not None:
+        query = query.filter(id_column < cursor if descending else id_column > cursor)
+    query = query.order_by(id_column.desc() if descending else id_column.asc())
+
+    max_size = current_app.config.get('LIST_PAGE_MAX_SIZE', 1000)
+    limit = min(limit or current_app.config.get('LIST_PAGE_DEFAULT_SIZE', 100), max_size)
+    # one extra row tells us whether there is another page
+    rows = query.with_entities(*selected.values()).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    # id is always the first selected column
+    next_cursor = rows[-1][0] if has_more else None
+    return json_serializer.encode_rows(selected, rows), next_cursor
@@ -0,0 +1,209 @@
+"""
+Live results publisher for the BEEVS application
+
+Feeds GET /api/v1/elections/<id>/results/stream (server-sent events). Each
+election being watched has one channel with one poller thread in this
+process, however many viewers are connected:
+
+- the poller checks a cheap fingerprint of the election's candidate_tallies
+  rows every LIVE_RESULTS_INTERVAL seconds (or at once when notify() is
+  called, e.g. by the relayer after confirming a ballot) and only recomputes
+  the results when it changed
+- changes are stored once as numbered delta events in a short ring buffer;
+  every viewer's generator reads from that buffer, so a publish costs the
+  same for one viewer or thousands
+- viewers get a full snapshot on connect, after falling further behind than
+  the buffer reaches, and when candidates are added or removed
+
+Each open stream holds a worker thread, so serve this with a threaded worker
+class (gunicorn.conf.py uses gthread).
+"""
+
+import json
+import threading
+from collections import deque
+from sqlalchemy import func
+from beevs import db
+from beevs.models import Election, CandidateTally
+from beevs.results import election_results
+
+
+def _fingerprint(election_id):
+    return tuple(db.session.query(
+        func.count(CandidateTally.candidate_id),
+        func.coalesce(func.sum(CandidateTally.confirmed_count), 0),
+        func.coalesce(func.sum(CandidateTally.pending_count), 0),
+        func.max(CandidateTally.updated_at)
+    ).filter(CandidateTally.election_id == election_id).one())
+
+
+def _by_candidate(results):
+    return {
+        candidate['id']: dict(candidate, post_id=post['id'])
+        for post in results for candidate in post['candidates']
+    }
+
+
+def _sse(event, data, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event}')
+    lines.append(f'data: {json.dumps(data)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+class _Channel:
+    def __init__(self, election_id, history):
+        self.election_id = election_id
+        self.cond = threading.Condition()
+        self.wake = threading.Event()
+        self.seq = 0
+        self.results = None
+        self.fingerprint = None
+        self.deltas = deque(maxlen=history)  # (seq, payload)
+        self.snapshot_seq = 0  # deltas before this seq cannot be applied to the current structure
+        self.subscribers = 0
+        self.stopped = False
+        self.thread = None
+
+
+class ResultsPublisher:
+    def __init__(self, app=None):
+        self.interval = 2.0
+        self.keepalive = 15.0
+        self.history = 256
+        self._app = None
+        self._channels = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self._app = app
+        self.interval = app.config.get('LIVE_RESULTS_INTERVAL', self.interval)
+        self.keepalive = app.config.get('LIVE_RESULTS_KEEPALIVE', self.keepalive)
+        app.extensions['results_publisher'] = self
+
+    def notify(self, election_id):
+        """Ask the election's poller (if anyone is watching here) to check for changes now."""
+        channel = self._channels.get(election_id)
+        if channel is not None:
+            channel.wake.set()
+
+    # ------------------------------------------------------------------
+    # Publisher side
+    # ------------------------------------------------------------------
+
+    def _refresh(self, channel):
+        """Recompute results if the tallies moved; append a delta (or a new snapshot) event."""
+        with self._app.app_context():
+            try:
+                fingerprint = _fingerprint(channel.election_id)
+                if fingerprint == channel.fingerprint and channel.results is not None:
+                    return
+                election = Election.query.get(channel.election_id)
+                if election is None:
+                    return
+                results = election_results(election)
+            finally:
+                db.session.remove()
+
+        with channel.cond:
+            previous = channel.results
+            channel.fingerprint = fingerprint
+            channel.results = results
+            if previous is None:
+                # viewers that stopped waiting for the first results watch seq
+                channel.seq += 1
+                channel.snapshot_seq = channel.seq
+                channel.cond.notify_all()
+                return
+
+            old, new = _by_candidate(previous), _by_candidate(results)
+            if old.keys() != new.keys():
+                # candidates added or removed: viewers need the new structure
+                channel.seq += 1
+                channel.snapshot_seq = channel.seq
+                channel.deltas.clear()
+                channel.cond.notify_all()
+                return
+
+            changed = [
+                {k: new[cid][k] for k in ('id', 'post_id', 'votes', 'onchain_votes', 'db_votes', 'pending_votes')}
+                for cid in new if new[cid] != old[cid]
+            ]
+            winners = {post['id']: post['winner'] for post in results}
+            if not changed:
+                return
+            channel.seq += 1
+            channel.deltas.append((channel.seq, {'candidates': changed, 'winners': winners}))
+            channel.cond.notify_all()
+
+    def _run(self, channel):
+        while not channel.stopped:
+            try:
+                self._refresh(channel)
+            except Exception:
+                self._app.logger.exception('Live results refresh failed for election %s', channel.election_id)
+            channel.wake.wait(self.interval)
+            channel.wake.clear()
+
+    def _subscribe(self, election_id):
+        with self._lock:
+            channel = self._channels.get(election_id)
+            if channel is None:
+                channel = _Channel(election_id, self.history)
+                self._channels[election_id] = channel
+            channel.subscribers += 1
+            if channel.thread is None:
+                channel.thread = threading.Thread(target=self._run, args=(channel,), name=f'beevs-live-{election_id}', daemon=True)
+                channel.thread.start()
+        return channel
+
+    def _unsubscribe(self, channel):
+        with self._lock:
+            channel.subscribers -= 1
+            if channel.subscribers <= 0:
+                channel.stopped = True
+                channel.wake.set()
+                if self._channels.get(channel.election_id) is channel:
+                    del self._channels[channel.election_id]
+
+    # ------------------------------------------------------------------
+    # Viewer side
+    # ------------------------------------------------------------------
+
+    def stream(self, election_id):
+        """Generator of SSE frames for one viewer."""
+        channel = self._subscribe(election_id)
+        try:
+            with channel.cond:
+                channel.cond.wait_for(lambda: channel.results is not None, timeout=self.keepalive)
+                seq, results = channel.seq, channel.results
+            yield 'retry: 5000\n\n'
+            if results is not None:
+                yield _sse('snapshot', {'results': results}, seq)
+
+            while True:
+                with channel.cond:
+                    channel.cond.wait_for(lambda: channel.seq > seq, timeout=self.keepalive)
+                    if channel.seq == seq:
+                        frames = None
+                    elif channel.snapshot_seq > seq or not channel.deltas or channel.deltas[0][0] > seq + 1:
+                        # structure changed, or we fell behind the ring buffer
+                        seq = channel.seq
+                        frames = [_sse('snapshot', {'results': channel.results}, seq)]
+                    else:
+                        frames = [_sse('delta', payload, n) for n, payload in channel.deltas if n > seq]
+                        seq = channel.seq
+                if frames is None:
+                    yield ': keepalive\n\n'
+                else:
+                    for frame in frames:
+                        yield frame
+        finally:
+            self._unsubscribe(channel)
+
+
+results_publisher = ResultsPublisher()
@@ -69,6 +69,20 @@ class Election(db.Model):
     def __repr__(self):
         return f'<Election {self.title} ({self.id})>'
 
+    @classmethod
+    def list_columns(cls):
+        """Columns a listing may select, keyed like to_dict() (see beevs.listing)"""
+        return {
+            'id': cls.id,
+            'title': cls.title,
+            'created_at': cls.created_at,
+            'scheduled_for': cls.scheduled_for,
+            'starts_at': cls.starts_at,
+            'ends_at': cls.ends_at,
+            'super_admin_id': cls.super_admin_id,
+            'onchain_id': cls.onchain_id
+        }
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -88,7 +102,7 @@ class Post(db.Model):
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     title = db.Column(db.String(255), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.now, nullable=False)
-    election_id = db.Column(db.Integer, db.ForeignKey('elections.id', ondelete='CASCADE'), nullable=False)
+    election_id = db.Column(db.Integer, db.ForeignKey('elections.id', ondelete='CASCADE'), nullable=False, index=True)
 
     election = db.relationship('Election', backref=db.backref('posts', lazy=True, passive_deletes=True))
 
@@ -113,7 +127,7 @@ class Candidate(db.Model):
     wallet_address = db.Column(db.String(255), unique=True, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.now, nullable=False)
     election_id = db.Column(db.Integer, db.ForeignKey('elections.id', ondelete='CASCADE'), nullable=False)
-    post_id = db.Column(db.Integer, db.ForeignKey('posts.id', ondelete='CASCADE'), nullable=False)
+    post_id = db.Column(db.Integer, db.ForeignKey('posts.id', ondelete='CASCADE'), nullable=False, index=True)
     onchain_id = db.Column(db.Integer, nullable=True)
 
     election = db.relationship('Election', backref=db.backref('candidates', lazy=True, passive_deletes=True))
@@ -136,6 +150,8 @@ class InstitutionalRecord(db.Model):
     __tablename__ = 'institutional_records'
     __table_args__ = (
         db.UniqueConstraint('registration_number', 'election_id', name='uq_institutional_record_registration_election'),
+        # listings walk an election's rows in id order (keyset pagination)
+        db.Index('ix_institutional_records_election_id_id', 'election_id', 'id'),
     )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
@@ -149,6 +165,20 @@ class InstitutionalRecord(db.Model):
 
     election = db.relationship('Election', backref=db.backref('institutional_records', lazy=True, passive_deletes=True))
 
+    @classmethod
+    def list_columns(cls):
+        """Columns a listing may select, keyed like to_dict() (see beevs.listing)"""
+        return {
+            'id': cls.id,
+            'name': cls.name,
+            'registration_number': cls.registration_number,
+            'department': cls.department,
+            'faculty': cls.faculty,
+            'level': cls.level,
+            'created_at': cls.created_at,
+            'election_id': cls.election_id
+        }
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -164,6 +194,12 @@ class InstitutionalRecord(db.Model):
 
 class Voter(db.Model):
     __tablename__ = 'voters'
+    __table_args__ = (
+        # listings walk an election's rows in id order (keyset pagination)
+        db.Index('ix_voters_election_id_id', 'election_id', 'id'),
+        # voter lookups by institutional record (registration number) within an election
+        db.Index('ix_voters_student_record_id_election_id', 'student_record_id', 'election_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     name = db.Column(db.String(255), nullable=False)
@@ -174,10 +210,28 @@ class Voter(db.Model):
     election_id = db.Column(db.Integer, db.ForeignKey('elections.id', ondelete='CASCADE'), nullable=False)
     student_record_id = db.Column(db.Integer, db.ForeignKey('institutional_records.id', ondelete='CASCADE'), nullable=False)
     onchain_id = db.Column(db.Integer, nullable=True)
+    # float32 face embedding of the reference photo, tagged with the model/detector that produced it
+    face_embedding = db.Column(db.LargeBinary, nullable=True)
+    face_embedding_version = db.Column(db.String(64), nullable=True)
 
     election = db.relationship('Election', backref=db.backref('voters', lazy=True, passive_deletes=True))
     student_record = db.relationship('InstitutionalRecord', backref=db.backref('voter', lazy=True))
 
+    @classmethod
+    def list_columns(cls):
+        """Columns a listing may select, keyed like to_dict() (see beevs.listing)"""
+        return {
+            'id': cls.id,
+            'name': cls.name,
+            'email': cls.email,
+            'image_url': cls.image_url,
+            'wallet_address': cls.wallet_address,
+            'created_at': cls.created_at,
+            'election_id': cls.election_id,
+            'student_record_id': cls.student_record_id,
+            'onchain_id': cls.onchain_id
+        }
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -194,6 +248,14 @@ class Voter(db.Model):
 
 class Vote(db.Model):
     __tablename__ = 'votes'
+    __table_args__ = (
+        # "has this voter voted / what did they vote" probes and the audit trail
+        db.Index('ix_votes_election_id_voter_id_action', 'election_id', 'voter_id', 'action'),
+        # per-candidate counts (results fallback, tally rebuilds)
+        db.Index('ix_votes_candidate_id_action_status', 'candidate_id', 'action', 'status'),
+        # the relayer loads a transaction's votes when finishing it
+        db.Index('ix_votes_outbox_id', 'outbox_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     election_id = db.Column(db.Integer, db.ForeignKey('elections.id', ondelete='CASCADE'), nullable=True)
@@ -204,12 +266,14 @@ class Vote(db.Model):
     status = db.Column(db.String(32), nullable=False, default='pending')
     block_number = db.Column(db.Integer, nullable=True)
     receipt = db.Column(db.JSON, nullable=True)
+    outbox_id = db.Column(db.Integer, db.ForeignKey('outbox_transactions.id', ondelete='SET NULL'), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.now, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now, nullable=False)
 
     election = db.relationship('Election', backref=db.backref('votes', lazy=True, passive_deletes=True))
     voter = db.relationship('Voter', backref=db.backref('votes', lazy=True, passive_deletes=True))
     candidate = db.relationship('Candidate', backref=db.backref('votes', lazy=True, passive_deletes=True))
+    outbox = db.relationship('OutboxTransaction', backref=db.backref('votes', lazy=True, passive_deletes=True))
 
     def __repr__(self):
         return f'<Vote {self.action} {self.tx_hash} ({self.status})>'
@@ -225,6 +289,179 @@ class Vote(db.Model):
             'status': self.status,
             'block_number': self.block_number,
             'receipt': self.receipt,
+            'outbox_id': self.outbox_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+
+class OutboxTransaction(db.Model):
+    """A contract call queued for the relayer.
+
+    Rows move queued -> submitted -> confirmed | failed. The relayer assigns the
+    nonce at submission time and stores the signed tx (raw_tx, tx_hash) before
+    broadcasting it, so a retry re-sends that same tx. Vote rows linked through
+    outbox_id mirror the final status for auditing.
+    """
+    __tablename__ = 'outbox_transactions'
+    __table_args__ = (
+        db.Index('ix_outbox_transactions_status_id', 'status', 'id'),
+        # one live castBallot per voter and election: the schema-level duplicate-vote guard;
+        # a failed ballot does not count, so the voter can vote again
+        db.Index('uq_outbox_transactions_ballot', 'election_id', 'voter_id', unique=True,
+                 postgresql_where=db.text("action = 'vote' AND status <> 'failed'"),
+                 sqlite_where=db.text("action = 'vote' AND status <> 'failed'")),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    function_name = db.Column(db.String(64), nullable=False)
+    args = db.Column(db.JSON, nullable=False)
+    action = db.Column(db.String(64), nullable=False)
+    election_id = db.Column(db.Integer, db.ForeignKey('elections.id', ondelete='CASCADE'), nullable=True)
+    candidate_id = db.Column(db.Integer, db.ForeignKey('candidates.id', ondelete='SET NULL'), nullable=True)
+    voter_id = db.Column(db.Integer, db.ForeignKey('voters.id', ondelete='SET NULL'), nullable=True)
+    status = db.Column(db.String(32), nullable=False, default='queued')
+    sender = db.Column(db.String(64), nullable=True)
+    nonce = db.Column(db.Integer, nullable=True)
+    tx_hash = db.Column(db.String(255), nullable=True)
+    raw_tx = db.Column(db.Text, nullable=True)
+    block_number = db.Column(db.Integer, nullable=True)
+    receipt = db.Column(db.JSON, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    submitted_at = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.now, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now, nullable=False)
+
+    def __repr__(self):
+        return f'<OutboxTransaction {self.function_name} ({self.status})>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'function_name': self.function_name,
+            'action': self.action,
+            'election_id': self.election_id,
+            'candidate_id': self.candidate_id,
+            'voter_id': self.voter_id,
+            'status': self.status,
+            'nonce': self.nonce,
+            'tx_hash': self.tx_hash,
+            'block_number': self.block_number,
+            'error': self.error,
+            'attempts': self.attempts,
+            'submitted_at': self.submitted_at.isoformat() if self.submitted_at else None,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
\ No newline at end of file
+        }
+
+
+class RelayerNonce(db.Model):
+    """Next nonce to hand out per relayer address; the row lock serialises submitters."""
+    __tablename__ = 'relayer_nonces'
+
+    address = db.Column(db.String(64), primary_key=True)
+    next_nonce = db.Column(db.Integer, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now, nullable=False)
+
+
+class CandidateTally(db.Model):
+    """Live vote counters per candidate, kept in step with the votes table.
+
+    cast_vote adds to pending_count in the transaction that inserts the Vote
+    rows; the relayer moves them to confirmed_count (or drops them on failure)
+    in the transaction that finalises the ballot. scripts/rebuild_tallies.py
+    recomputes the table from votes.
+    """
+    __tablename__ = 'candidate_tallies'
+
+    candidate_id = db.Column(db.Integer, db.ForeignKey('candidates.id', ondelete='CASCADE'), primary_key=True)
+    election_id = db.Column(db.Integer, db.ForeignKey('elections.id', ondelete='CASCADE'), nullable=False, index=True)
+    post_id = db.Column(db.Integer, db.ForeignKey('posts.id', ondelete='CASCADE'), nullable=False)
+    confirmed_count = db.Column(db.Integer, nullable=False, default=0)
+    pending_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now, nullable=False)
+
+    def to_dict(self):
+        return {
+            'candidate_id': self.candidate_id,
+            'election_id': self.election_id,
+            'post_id': self.post_id,
+            'confirmed_count': self.confirmed_count,
+            'pending_count': self.pending_count,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+
+class ElectionTally(db.Model):
+    """Number of voters who have cast a ballot, maintained alongside CandidateTally."""
+    __tablename__ = 'election_tallies'
+
+    election_id = db.Column(db.Integer, db.ForeignKey('elections.id', ondelete='CASCADE'), primary_key=True)
+    ballot_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now, nullable=False)
+
+
+class ImportJob(db.Model):
+    """A roster CSV upload being loaded in the background (see beevs.imports).
+
+    Rows move queued -> running -> completed | failed. rows_processed is the
+    resume point: it is updated in the same transaction as each inserted
+    chunk, so a restarted job skips exactly the rows already committed.
+    """
+    __tablename__ = 'import_jobs'
+    __table_args__ = (
+        db.Index('ix_import_jobs_election_id_file_sha256', 'election_id', 'file_sha256'),
+        db.Index('ix_import_jobs_status_updated_at', 'status', 'updated_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    election_id = db.Column(db.Integer, db.ForeignKey('elections.id', ondelete='CASCADE'), nullable=False)
+    admin_id = db.Column(db.Integer, db.ForeignKey('admins.id', ondelete='SET NULL'), nullable=True)
+    kind = db.Column(db.String(64), nullable=False, default='institutional_records')
+    filename = db.Column(db.String(255), nullable=True)
+    spool_path = db.Column(db.Text, nullable=False)
+    file_sha256 = db.Column(db.String(64), nullable=False)
+    file_size = db.Column(db.BigInteger, nullable=False, default=0)
+    status = db.Column(db.String(32), nullable=False, default='queued')
+    rows_processed = db.Column(db.Integer, nullable=False, default=0)
+    saved_count = db.Column(db.Integer, nullable=False, default=0)
+    error_count = db.Column(db.Integer, nullable=False, default=0)
+    error_samples = db.Column(db.JSON, nullable=True)
+    resumed_from = db.Column(db.Integer, nullable=False, default=0)  # rows_processed when the current run started
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text, nullable=True)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.now, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now, nullable=False)
+
+    def __repr__(self):
+        return f'<ImportJob {self.kind} {self.id} ({self.status})>'
+
+    def to_dict(self):
+        rate = None
+        if self.started_at and self.updated_at and self.rows_processed > self.resumed_from:
+            elapsed = (self.updated_at - self.started_at).total_seconds()
+            if elapsed > 0:
+                rate = round((self.rows_processed - self.resumed_from) / elapsed, 1)
+        return {
+            'id': self.id,
+            'election_id': self.election_id,
+            'kind': self.kind,
+            'filename': self.filename,
+            'file_size': self.file_size,
+            'status': self.status,
+            'rows_processed': self.rows_processed,
+            'saved_count': self.saved_count,
+            'error_count': self.error_count,
+            'error_samples': self.error_samples or [],
+            'rows_per_second': rate,
+            'resumed_from': self.resumed_from,
+            'attempts': self.attempts,
+            'error': self.error,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
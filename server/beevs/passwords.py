@@ -0,0 +1,166 @@
+"""
+Admin password checks for the BEEVS application
+
+Login is the only endpoint that does deliberately slow work for an
+anonymous caller, so it is fenced in:
+
+- bcrypt runs on a dedicated thread pool (BCRYPT_WORKERS threads; the
+  bcrypt library releases the GIL). At most BCRYPT_WORKERS +
+  BCRYPT_QUEUE_SIZE checks may be running or waiting; beyond that the login
+  is rejected with a 503 instead of taking every CPU from other requests
+- the cost is BCRYPT_LOG_ROUNDS (read by Flask-Bcrypt as well). A hash made
+  with a different cost is replaced with one at the configured cost after
+  its next successful login, so raising or lowering the cost needs no reset
+- LoginLimiter sits in front of the bcrypt work: every attempt counts
+  against the client address (LOGIN_IP_LIMIT per LOGIN_LIMIT_WINDOW
+  seconds) and failures count against the email (LOGIN_EMAIL_LIMIT), so
+  credential stuffing is turned away with a 429 before any hash is checked.
+  Counters live in each web process. Behind a reverse proxy set
+  TRUSTED_PROXIES so the client address comes from X-Forwarded-For.
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from beevs import bcrypt
+from beevs.exceptions import ServiceUnavailableError, TooManyRequestsError
+
+
+class LoginLimiter:
+    """Fixed-window counters per client address and per email, LRU-bounded"""
+
+    def __init__(self, app=None):
+        self.window = 300
+        self.ip_limit = 30
+        self.email_limit = 5
+        self.max_keys = 10000
+        self._counters = OrderedDict()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.window = app.config.get('LOGIN_LIMIT_WINDOW', self.window)
+        self.ip_limit = app.config.get('LOGIN_IP_LIMIT', self.ip_limit)
+        self.email_limit = app.config.get('LOGIN_EMAIL_LIMIT', self.email_limit)
+        self.max_keys = app.config.get('LOGIN_LIMITER_MAX_KEYS', self.max_keys)
+        app.extensions['login_limiter'] = self
+
+    def _counter(self, key, now):
+        counter = self._counters.get(key)
+        if counter is None or counter[0] + self.window <= now:
+            counter = [now, 0]
+            self._counters[key] = counter
+        self._counters.move_to_end(key)
+        while len(self._counters) > self.max_keys:
+            self._counters.popitem(last=False)
+        return counter
+
+    def _reject(self, counter, now):
+        retry_after = max(int(counter[0] + self.window - now) + 1, 1)
+        return TooManyRequestsError(message='Too many login attempts, please retry later', retry_after=retry_after)
+
+    def check(self, ip, email):
+        """Count an attempt; raises TooManyRequestsError when the address or email is over its limit"""
+        now = time.monotonic()
+        with self._lock:
+            if self.email_limit > 0:
+                counter = self._counter(('email', email), now)
+                if counter[1] >= self.email_limit:
+                    raise self._reject(counter, now)
+            if self.ip_limit > 0:
+                counter = self._counter(('ip', ip), now)
+                counter[1] += 1
+                if counter[1] > self.ip_limit:
+                    raise self._reject(counter, now)
+
+    def failed(self, email):
+        if self.email_limit > 0:
+            with self._lock:
+                self._counter(('email', email), time.monotonic())[1] += 1
+
+    def succeeded(self, email):
+        with self._lock:
+            self._counters.pop(('email', email), None)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+
+
+class PasswordHasher:
+    """bcrypt on a bounded thread pool; BCRYPT_WORKERS = 0 hashes on the request thread"""
+
+    def __init__(self, app=None):
+        self.workers = 2
+        self.queue_size = 8
+        self.timeout = 10
+        self.log_rounds = 12
+        self._dummy_hash = None
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+        self._slots = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.workers = app.config.get('BCRYPT_WORKERS', self.workers)
+        self.queue_size = app.config.get('BCRYPT_QUEUE_SIZE', self.queue_size)
+        self.timeout = app.config.get('BCRYPT_TIMEOUT', self.timeout)
+        self.log_rounds = app.config.get('BCRYPT_LOG_ROUNDS', self.log_rounds)
+        self._slots = threading.BoundedSemaphore(max(self.workers + self.queue_size, 1))
+        self._dummy_hash = None
+        app.extensions['password_hasher'] = self
+
+    def _get_executor(self):
+        if self._executor is None or self._executor_pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._executor_pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='beevs-bcrypt')
+                    self._executor_pid = os.getpid()
+        return self._executor
+
+    def _run(self, fn, *args):
+        if self.workers <= 0:
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            raise ServiceUnavailableError(message='Login is busy, please retry shortly', retry_after=1)
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        # The slot is held until the hash really finishes, even if the caller gave up on it
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise ServiceUnavailableError(message='Login timed out, please retry', retry_after=1)
+
+    def hash(self, plain_password):
+        return self._run(bcrypt.generate_password_hash, plain_password, self.log_rounds).decode('utf-8')
+
+    def verify(self, pw_hash, plain_password):
+        """Check a password against a stored hash. With pw_hash None a throwaway hash
+        is checked instead, so unknown emails cost the same time as wrong passwords."""
+        if pw_hash is None:
+            if self._dummy_hash is None:
+                self._dummy_hash = self.hash(os.urandom(16).hex())
+            self._run(bcrypt.check_password_hash, self._dummy_hash, plain_password)
+            return False
+        return self._run(bcrypt.check_password_hash, pw_hash, plain_password)
+
+    def needs_rehash(self, pw_hash):
+        """Whether a stored hash was made with a cost other than BCRYPT_LOG_ROUNDS"""
+        try:
+            return int(pw_hash.split('$')[2]) != self.log_rounds
+        except (AttributeError, IndexError, ValueError):
+            return False
+
+
+login_limiter = LoginLimiter()
+password_hasher = PasswordHasher()
@@ -0,0 +1,526 @@
+"""
+Transaction relayer for the BEEVS application
+
+Endpoints no longer sign and wait for transactions inside the HTTP request.
+They enqueue an OutboxTransaction in the same DB transaction as their own
+rows and return 202 with the outbox id. The relayer then:
+
+- submits queued rows in id order, handing out nonces from the
+  relayer_nonces row, which is locked while each row is signed so only one
+  submitter per relayer address hands out nonces at a time, across threads
+  and processes. The signed tx is committed before it is broadcast, and
+  retries re-send those bytes rather than signing the call again
+- confirms submitted rows by polling receipts (no blocking waits), applies
+  the on-chain ids from emitted events and mirrors the final status onto the
+  linked Vote audit rows
+
+Voters are not registered one transaction at a time: each tick also gathers
+unregistered voters of on-chain elections into registerVoters batches (see
+queue_voter_registrations).
+
+It runs as a daemon thread in every web process (RELAYER_BACKGROUND) and/or as
+a dedicated process via scripts/run_relayer.py.
+"""
+
+import os
+import threading
+from datetime import datetime, timedelta
+from flask import current_app
+from web3 import Web3
+from web3.exceptions import ContractLogicError, TransactionNotFound
+from beevs import db
+from beevs.config import Config
+from beevs.contract import get_contract_service, compute_voter_hash
+from beevs.models import OutboxTransaction, RelayerNonce, Election, Candidate, Voter, Vote, InstitutionalRecord
+from beevs.utils import sanitize_for_json
+from beevs import tallies
+from beevs.cache import response_cache
+from beevs.live import results_publisher
+
+
+def _revert_reason(exc):
+    msg = str(exc.args[0]) if exc.args else str(exc)
+    if 'execution reverted: ' in msg:
+        return msg.split('execution reverted: ', 1)[1].strip() or msg
+    return msg
+
+
+class Relayer:
+    def __init__(self, app=None):
+        self.batch_size = Config.RELAYER_BATCH_SIZE
+        self.poll_interval = Config.RELAYER_POLL_INTERVAL
+        self.resubmit_after = Config.RELAYER_RESUBMIT_AFTER
+        self.confirmations = Config.TX_CONFIRMATIONS
+        self.voter_batch_max = Config.VOTER_BATCH_MAX_SIZE
+        self.voter_batch_gas = Config.VOTER_BATCH_GAS_TARGET
+        self.voter_batch_linger = Config.VOTER_BATCH_LINGER
+        self.voter_max_attempts = Config.VOTER_REGISTRATION_MAX_ATTEMPTS
+        self._voter_batch_sizes = {}  # election onchain id -> tuned registerVoters chunk size
+        self._reported_missing = set()  # contract functions already logged as not deployed
+        self._app = None
+        self._thread = None
+        self._thread_pid = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        # on-chain side effects of a confirmed tx, keyed by OutboxTransaction.action
+        self.handlers = {
+            'create_election': self._on_election_created,
+            'add_candidate': self._on_candidate_added,
+            'register_voter': self._on_voter_registered,
+            'register_voters': self._on_voters_registered,
+        }
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self._app = app
+        app.extensions['relayer'] = self
+        if app.config.get('RELAYER_BACKGROUND'):
+            # Started lazily so a worker forked after create_app() gets its own thread
+            app.before_request(self.ensure_worker)
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+
+    def enqueue(self, function_name, args, action, election_id=None, candidate_id=None, voter_id=None):
+        """Queue a contract call. The row is added to the session; the caller commits."""
+        tx = OutboxTransaction(
+            function_name=function_name,
+            args=list(args),
+            action=action,
+            election_id=election_id,
+            candidate_id=candidate_id,
+            voter_id=voter_id,
+            status='queued'
+        )
+        db.session.add(tx)
+        return tx
+
+    def notify(self):
+        """Wake the background worker, e.g. right after committing a queued row."""
+        self._wake.set()
+
+    # ------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------
+
+    def ensure_worker(self):
+        if self._thread_pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread_pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run_forever, name='beevs-relayer', daemon=True)
+            self._thread_pid = os.getpid()
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def run_forever(self, app=None):
+        app = app or self._app
+        backoff = self.poll_interval
+        while not self._stop.is_set():
+            try:
+                with app.app_context():
+                    busy = self.run_once()
+                backoff = self.poll_interval
+            except Exception:
+                app.logger.exception('Relayer tick failed')
+                busy = False
+                backoff = min(backoff * 2, 60)
+            finally:
+                with app.app_context():
+                    db.session.remove()
+            if not busy:
+                self._wake.wait(backoff)
+                self._wake.clear()
+
+    def run_once(self):
+        """Batch voter registrations, submit queued rows, then confirm submitted ones.
+
+        Returns True if anything moved.
+        """
+        batched = self.queue_voter_registrations()
+
+        pending = db.session.query(OutboxTransaction.id).filter(
+            OutboxTransaction.status.in_(('queued', 'submitted'))
+        ).first()
+        if not pending:
+            return bool(batched)
+
+        cs = get_contract_service()
+        submitted = 0
+        if OutboxTransaction.query.filter_by(status='queued').first():
+            submitted = self.submit_pending(cs)
+        confirmed = self.confirm_submitted(cs)
+        return bool(batched or submitted or confirmed)
+
+    def queue_voter_registrations(self, cs=None, linger=None):
+        """Gather unregistered voters of on-chain elections into registerVoters batches.
+
+        A voter is picked up when it has no onchain_id and no pending or confirmed
+        register_voter audit row. A voter whose registration failed
+        VOTER_REGISTRATION_MAX_ATTEMPTS times is given up on (see
+        abandoned_voter_registrations). Nothing is queued while the deployed
+        contract lacks registerVoters. An election's voters are held back while new
+        ones are still arriving (linger seconds) unless a full batch is ready.
+        Returns the number of outbox rows queued.
+        """
+        linger = self.voter_batch_linger if linger is None else linger
+        in_flight = db.session.query(Vote.voter_id).filter(
+            Vote.action == 'register_voter',
+            Vote.status.in_(('pending', 'confirmed')),
+            Vote.voter_id.isnot(None)
+        )
+        rows = db.session.query(
+            Voter.id, Voter.created_at, Election.id, Election.onchain_id, InstitutionalRecord.registration_number
+        ).join(Election, Voter.election_id == Election.id).join(
+            InstitutionalRecord, Voter.student_record_id == InstitutionalRecord.id
+        ).filter(
+            Voter.onchain_id.is_(None),
+            Election.onchain_id.isnot(None),
+            ~Voter.id.in_(in_flight),
+            ~Voter.id.in_(self._failed_registrations().with_only_columns(Vote.voter_id))
+        ).order_by(Election.id.asc(), Voter.id.asc()).limit(self.voter_batch_max * 20).with_for_update(of=Voter, skip_locked=True).all()
+        if not rows:
+            return 0
+
+        cs = cs or get_contract_service()
+        if not self._deployed(cs, 'registerVoters'):
+            # every batch would revert and use up the voters' attempts; wait for a redeploy
+            db.session.rollback()
+            return 0
+
+        by_election = {}
+        for voter_id, created_at, election_id, onchain_id, reg_no in rows:
+            by_election.setdefault((election_id, onchain_id), []).append((voter_id, created_at, reg_no))
+
+        queued = 0
+        quiet_since = datetime.now() - timedelta(seconds=linger)
+        for (election_id, onchain_id), voters in by_election.items():
+            if len(voters) < self.voter_batch_max and max(created for _, created, _ in voters) > quiet_since:
+                continue
+
+            hashes = [compute_voter_hash(['uint256', 'string'], [int(onchain_id), reg_no]) for _, _, reg_no in voters]
+            size = self._voter_batch_sizes.get(onchain_id)
+            if size is None:
+                try:
+                    size = cs.voter_batch_size(onchain_id, hashes[:2], self.voter_batch_gas, self.voter_batch_max)
+                except Exception as e:
+                    current_app.logger.warning('Could not size registerVoters batch for election %s: %s', election_id, e)
+                    size = min(self.voter_batch_max, 100)
+                else:
+                    self._voter_batch_sizes[onchain_id] = size
+
+            for start in range(0, len(voters), size):
+                chunk = voters[start:start + size]
+                tx = self.enqueue('registerVoters', [int(onchain_id), hashes[start:start + size]], action='register_voters', election_id=election_id)
+                for voter_id, _, _ in chunk:
+                    db.session.add(Vote(
+                        election_id=election_id,
+                        voter_id=voter_id,
+                        candidate_id=None,
+                        action='register_voter',
+                        status='pending',
+                        outbox=tx
+                    ))
+                queued += 1
+
+        db.session.commit()
+        return queued
+
+    def _deployed(self, cs, function_name):
+        """Whether the deployed contract has function_name; logs once per process when not."""
+        if cs.implements(function_name):
+            return True
+        if function_name not in self._reported_missing:
+            self._reported_missing.add(function_name)
+            current_app.logger.error('The contract at %s has no %s; rebuild EVoting.json from BEEVS.sol and redeploy (see /api/v1/health/contract)', cs.contract_address, function_name)
+        return False
+
+    def _failed_registrations(self):
+        """Voters whose register_voter attempts failed voter_max_attempts times or more."""
+        return db.select(
+            Vote.voter_id,
+            Vote.election_id,
+            db.func.count(Vote.id).label('attempts'),
+            db.func.max(Vote.updated_at).label('last_failed_at'),
+            db.func.max(Vote.outbox_id).label('last_outbox_id')
+        ).where(
+            Vote.action == 'register_voter',
+            Vote.status == 'failed',
+            Vote.voter_id.isnot(None)
+        ).group_by(Vote.voter_id, Vote.election_id).having(db.func.count(Vote.id) >= self.voter_max_attempts)
+
+    def abandoned_voter_registrations(self, election_id=None):
+        """Unregistered voters the relayer has stopped retrying, most recent failure first."""
+        failed = self._failed_registrations().subquery()
+        query = db.session.query(failed, OutboxTransaction.error).join(
+            Voter, Voter.id == failed.c.voter_id
+        ).outerjoin(
+            OutboxTransaction, OutboxTransaction.id == failed.c.last_outbox_id
+        ).filter(Voter.onchain_id.is_(None))
+        if election_id is not None:
+            query = query.filter(failed.c.election_id == election_id)
+        return [{
+            'voter_id': row.voter_id,
+            'election_id': row.election_id,
+            'attempts': row.attempts,
+            'last_failed_at': row.last_failed_at.isoformat() if row.last_failed_at else None,
+            'last_transaction_id': row.last_outbox_id,
+            'last_error': row.error
+        } for row in query.order_by(failed.c.last_failed_at.desc()).all()]
+
+    def _lock_nonce(self, cs, address):
+        """Lock this address's nonce row for the current DB transaction, reconciling with the chain."""
+        chain_next = cs.w3.eth.get_transaction_count(address, 'pending')
+        row = RelayerNonce.query.filter_by(address=address).with_for_update().first()
+        if row is None:
+            row = RelayerNonce(address=address, next_nonce=chain_next)
+            db.session.add(row)
+            db.session.flush()
+        elif row.next_nonce < chain_next:
+            # txs were sent outside the relayer (or a commit was lost after broadcast)
+            row.next_nonce = chain_next
+        return row
+
+    def submit_pending(self, cs):
+        """Sign, record and broadcast queued rows one at a time, in id order.
+
+        Each row is signed under the locked nonce and committed as submitted with
+        its tx_hash, nonce and raw_tx before it is broadcast. If the broadcast
+        fails, or the process dies right after it, the row keeps that signed tx:
+        confirm_submitted finds it on-chain by hash or re-sends the same bytes, so
+        a call is never signed twice under different nonces.
+        """
+        address = cs.relayer_address()
+        sent = 0
+        for n in range(self.batch_size):
+            # reconcile with the chain once; later rounds just re-lock the row
+            nonce_row = self._lock_nonce(cs, address) if n == 0 else RelayerNonce.query.filter_by(address=address).with_for_update().one()
+            tx = OutboxTransaction.query.filter_by(status='queued').order_by(
+                OutboxTransaction.id.asc()
+            ).with_for_update(skip_locked=True).first()
+            if tx is None:
+                db.session.commit()
+                break
+
+            tx.attempts = (tx.attempts or 0) + 1
+            try:
+                signed = cs.sign_transaction(tx.function_name, tx.args, tx_from=address, nonce=nonce_row.next_nonce)
+            except ContractLogicError as cle:
+                # Reverts during gas estimation: nothing was signed, the nonce stays free
+                self._finish(tx, 'failed', error=_revert_reason(cle))
+                db.session.commit()
+                self._finished(tx)
+                continue
+            except Exception as e:
+                # Provider trouble: keep the row queued and stop so nonces stay in order
+                tx.error = str(e)
+                db.session.commit()
+                current_app.logger.warning('Relayer failed to sign outbox %s: %s', tx.id, e)
+                break
+
+            tx.status = 'submitted'
+            tx.sender = address
+            tx.nonce = nonce_row.next_nonce
+            tx.tx_hash = signed['tx_hash']
+            tx.raw_tx = signed['raw_tx']
+            tx.submitted_at = datetime.now()
+            tx.error = None
+            for vote in tx.votes:
+                vote.tx_hash = tx.tx_hash
+            nonce_row.next_nonce += 1
+            db.session.commit()
+
+            try:
+                cs.send_raw_transaction(tx.raw_tx)
+            except Exception as e:
+                # it may have reached the node anyway; confirm_submitted checks and re-sends it
+                tx.error = str(e)
+                db.session.commit()
+                current_app.logger.warning('Relayer failed to broadcast outbox %s: %s', tx.id, e)
+                break
+            sent += 1
+        return sent
+
+    def confirm_submitted(self, cs):
+        rows = OutboxTransaction.query.filter_by(status='submitted').order_by(
+            OutboxTransaction.id.asc()
+        ).limit(self.batch_size * 5).all()
+        if not rows:
+            return 0
+
+        latest = cs.w3.eth.block_number
+        done = 0
+        for tx in rows:
+            try:
+                receipt = cs.w3.eth.get_transaction_receipt(tx.tx_hash)
+            except TransactionNotFound:
+                self._maybe_rebroadcast(cs, tx)
+                continue
+
+            if latest - int(receipt['blockNumber']) + 1 < self.confirmations:
+                continue
+
+            tx.receipt = sanitize_for_json(receipt)
+            tx.block_number = int(receipt['blockNumber'])
+            if int(receipt.get('status', 1)) == 1:
+                handler = self.handlers.get(tx.action)
+                if handler:
+                    try:
+                        handler(cs, tx, receipt)
+                    except Exception:
+                        current_app.logger.exception('Failed to apply receipt for outbox %s', tx.id)
+                self._finish(tx, 'confirmed')
+            else:
+                self._finish(tx, 'failed', error='Transaction reverted')
+            db.session.commit()
+            self._finished(tx)
+            done += 1
+        return done
+
+    def _maybe_rebroadcast(self, cs, tx):
+        """Re-send a tx the node has forgotten, so later nonces are not stuck behind it.
+
+        The stored raw_tx is sent again, never a newly signed call. Only when the
+        nonce has been used by another tx (ours is then known not to be mined)
+        is the row queued again to be signed under a fresh nonce.
+        """
+        # a failed broadcast (tx.error) is retried at once; otherwise give the node time
+        if tx.error is None and (not tx.submitted_at or (datetime.now() - tx.submitted_at).total_seconds() < self.resubmit_after):
+            return
+        try:
+            cs.w3.eth.get_transaction(tx.tx_hash)
+            return  # still in the mempool, just slow
+        except TransactionNotFound:
+            pass
+
+        if tx.nonce is not None and cs.w3.eth.get_transaction_count(tx.sender, 'latest') > tx.nonce:
+            try:
+                cs.w3.eth.get_transaction_receipt(tx.tx_hash)
+                return  # mined in the meantime; the next confirm pass picks it up
+            except TransactionNotFound:
+                pass
+            current_app.logger.warning('Nonce %s of outbox %s was used by another transaction; queueing it again', tx.nonce, tx.id)
+            tx.status = 'queued'
+            tx.nonce = tx.tx_hash = tx.raw_tx = tx.submitted_at = None
+            for vote in tx.votes:
+                vote.tx_hash = None
+            db.session.commit()
+            return
+
+        try:
+            if tx.raw_tx:
+                cs.send_raw_transaction(tx.raw_tx)
+            else:
+                # rows submitted before raw_tx was stored: re-sign under the same nonce
+                tx.tx_hash = cs.send_transaction(tx.function_name, tx.args, tx_from=tx.sender, nonce=tx.nonce).get('tx_hash')
+                for vote in tx.votes:
+                    vote.tx_hash = tx.tx_hash
+        except Exception as e:
+            tx.error = str(e)
+            tx.attempts = (tx.attempts or 0) + 1
+            db.session.commit()
+            current_app.logger.warning('Relayer failed to rebroadcast outbox %s: %s', tx.id, e)
+            return
+        tx.submitted_at = datetime.now()
+        tx.attempts = (tx.attempts or 0) + 1
+        tx.error = None
+        db.session.commit()
+
+    def _finish(self, tx, status, error=None):
+        tallies.record_outcome(tx.votes, status)
+        tx.status = status
+        tx.error = error
+        for vote in tx.votes:
+            vote.status = status
+            vote.tx_hash = tx.tx_hash
+            vote.block_number = tx.block_number
+            vote.receipt = tx.receipt
+
+    def _finished(self, tx):
+        """After the final status is committed: refresh public pages, release failed ballots."""
+        # tallies and on-chain ids shown on public pages changed
+        response_cache.invalidate(tx.election_id)
+        results_publisher.notify(tx.election_id)
+        if tx.status == 'failed' and tx.action == 'vote' and tx.voter_id is not None:
+            # a failed ballot is released; the voter may vote again
+            ballot_guard = current_app.extensions.get('ballot_guard')
+            if ballot_guard is not None:
+                ballot_guard.ballot_failed(tx.election_id, tx.voter_id)
+
+    # ------------------------------------------------------------------
+    # Receipt handlers
+    # ------------------------------------------------------------------
+
+    def _on_election_created(self, cs, tx, receipt):
+        events = cs.get_contract().events.ElectionCreated().process_receipt(receipt)
+        election = Election.query.get(tx.election_id) if tx.election_id else None
+        if events and election:
+            election.onchain_id = int(events[0]['args']['electionId'])
+            self._queue_pending_candidates(election)
+
+    def _queue_pending_candidates(self, election):
+        """Queue addPostCandidate for candidates added before the election was on-chain.
+
+        The candidates endpoint only queues the call once election.onchain_id is
+        set; candidates without an onchain_id and without a pending or confirmed
+        add_candidate audit row are picked up here, in the same DB transaction.
+        """
+        in_flight = db.session.query(Vote.candidate_id).filter(
+            Vote.action == 'add_candidate',
+            Vote.status.in_(('pending', 'confirmed')),
+            Vote.candidate_id.isnot(None)
+        )
+        candidates = Candidate.query.filter(
+            Candidate.election_id == election.id,
+            Candidate.onchain_id.is_(None),
+            ~Candidate.id.in_(in_flight)
+        ).order_by(Candidate.id.asc()).all()
+        for candidate in candidates:
+            tx = self.enqueue('addPostCandidate', [int(election.onchain_id), int(candidate.post_id), candidate.name], action='add_candidate', election_id=election.id, candidate_id=candidate.id)
+            db.session.add(Vote(
+                election_id=election.id,
+                voter_id=None,
+                candidate_id=candidate.id,
+                action='add_candidate',
+                status='pending',
+                outbox=tx
+            ))
+
+    def _on_candidate_added(self, cs, tx, receipt):
+        events = cs.get_contract().events.CandidateAdded().process_receipt(receipt)
+        candidate = Candidate.query.get(tx.candidate_id) if tx.candidate_id else None
+        if events and candidate:
+            candidate.onchain_id = int(events[0]['args']['candidateId'])
+
+    def _on_voter_registered(self, cs, tx, receipt):
+        events = cs.get_contract().events.VoterRegistered().process_receipt(receipt)
+        voter = Voter.query.get(tx.voter_id) if tx.voter_id else None
+        if events and voter:
+            maybe_id = events[0]['args'].get('voterId')
+            if maybe_id is not None:
+                voter.onchain_id = int(maybe_id)
+
+    def _on_voters_registered(self, cs, tx, receipt):
+        """Map VoterRegistered events of a registerVoters batch back to Voter.onchain_id."""
+        events = cs.get_contract().events.VoterRegistered().process_receipt(receipt)
+        ids_by_hash = {Web3.to_hex(ev['args']['voterIdHash']): int(ev['args']['voterId']) for ev in events}
+        election_onchain_id = int(tx.args[0])
+        for vote in tx.votes:
+            voter = vote.voter
+            if voter is None or voter.student_record is None:
+                continue
+            voter_hash = compute_voter_hash(['uint256', 'string'], [election_onchain_id, voter.student_record.registration_number])
+            # hashes missing from the events were already registered on-chain
+            if voter_hash in ids_by_hash:
+                voter.onchain_id = ids_by_hash[voter_hash]
+
+
+relayer = Relayer()
@@ -1,4 +1,34 @@
+"""
+Response envelope and JSON serialization for the BEEVS application
+
+APIResponse wraps every payload in the {success, message, data|errors}
+envelope and renders it with jsonify, which goes through app.json. The
+json_serializer extension installs itself there, so every response is
+encoded by one pluggable backend chosen by JSON_SERIALIZER:
+
+- orjson, used by "auto" when the package is installed
+- the standard library json module otherwise
+
+Both encode date/datetime values as ISO 8601 (what the models' to_dict()
+produce), so handlers may hand over raw column values. A payload orjson cannot
+encode (integers beyond 64 bits) falls back to the standard library.
+
+encode_rows() turns column tuples from a with_entities() listing into a JSON
+array of objects, returned as a RawJSON fragment that is spliced into the
+envelope unchanged. The rows are zipped into plain dicts and encoded raw,
+skipping the per-row isoformat() of to_dict() (scripts/bench_json.py
+compares the paths).
+"""
+
+import json
+import uuid
+import dataclasses
+from decimal import Decimal
+from datetime import date, datetime
+from enum import Enum
 from flask import jsonify
+from flask.json.provider import JSONProvider
+
 
 class APIResponse:
     @staticmethod
@@ -17,4 +47,118 @@ class APIResponse:
             "message": message,
             "errors": errors
         }
-        return jsonify(response), status_code
\ No newline at end of file
+        return jsonify(response), status_code
+
+
+class RawJSON(bytes):
+    """Already encoded JSON, written into the response as is"""
+
+
+def _default(value):
+    """Types the encoders do not know natively, as Flask's default provider handles them"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, uuid.UUID)):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.value
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if hasattr(value, '__html__'):
+        return str(value.__html__())
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+class StdlibBackend:
+    name = 'json'
+
+    def dumps(self, obj, default=_default):
+        return json.dumps(obj, default=default, separators=(',', ':')).encode('ascii')
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+class OrjsonBackend:
+    name = 'orjson'
+
+    def __init__(self):
+        import orjson
+        self.orjson = orjson
+        self.options = orjson.OPT_NON_STR_KEYS
+        self.fallback = StdlibBackend()
+
+    def dumps(self, obj, default=_default):
+        try:
+            return self.orjson.dumps(obj, default=default, option=self.options)
+        except self.orjson.JSONEncodeError:
+            return self.fallback.dumps(obj, default)
+
+    def loads(self, data):
+        return self.orjson.loads(data)
+
+
+def make_backend(name):
+    if name == 'json':
+        return StdlibBackend()
+    try:
+        return OrjsonBackend()
+    except ImportError:
+        if name == 'orjson':
+            raise RuntimeError('JSON_SERIALIZER is orjson but the orjson package is not installed')
+        return StdlibBackend()
+
+
+class SerializerJSONProvider(JSONProvider):
+    """app.json provider backed by a JSONSerializer"""
+
+    def __init__(self, app, serializer):
+        super().__init__(app)
+        self.serializer = serializer
+
+    def dumps(self, obj, **kwargs):
+        return self.serializer.dumps(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return self.serializer.backend.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.serializer.dumps(obj) + b'\n', mimetype='application/json')
+
+
+class JSONSerializer:
+    def __init__(self, app=None):
+        self.backend = make_backend('auto')
+        # placeholder for RawJSON fragments; random so request data cannot forge it
+        self._marker = f'__beevs_raw_{uuid.uuid4().hex}_'
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.backend = make_backend(app.config.get('JSON_SERIALIZER', 'auto'))
+        app.json = SerializerJSONProvider(app, self)
+        app.extensions['json_serializer'] = self
+
+    def dumps(self, obj):
+        """Encode obj to bytes, splicing in any RawJSON fragments"""
+        fragments = []
+
+        def default(value):
+            if isinstance(value, RawJSON):
+                fragments.append(value)
+                return f'{self._marker}{len(fragments) - 1}'
+            return _default(value)
+
+        body = self.backend.dumps(obj, default)
+        for index, fragment in enumerate(fragments):
+            body = body.replace(f'"{self._marker}{index}"'.encode('ascii'), fragment, 1)
+        return body
+
+    def encode_rows(self, names, rows):
+        """JSON array of {name: value} objects from column tuples"""
+        names = list(names)
+        return RawJSON(self.backend.dumps([dict(zip(names, row)) for row in rows]))
+
+
+json_serializer = JSONSerializer()
@@ -0,0 +1,118 @@
+"""
+Results engine for the BEEVS application
+
+Per-candidate counts for a whole election come from a single query over
+posts, candidates and the candidate_tallies counters (see beevs.tallies), so
+the cost of a results page grows neither with the number of posts and
+candidates nor with the number of ballots cast. On-chain tallies, when the
+election is on-chain, are read in one batched contract call.
+"""
+
+from flask import current_app
+from sqlalchemy import and_, func
+from beevs import db
+from beevs.contract import get_contract_service
+from beevs.models import Post, Candidate, Vote, CandidateTally
+
+
+def tally_query(election_id):
+    """One row per (post, candidate) with the candidate's confirmed and pending counters.
+
+    Posts without candidates come back once with NULL candidate columns.
+    """
+    return db.session.query(
+        Post.id,
+        Post.title,
+        Candidate.id,
+        Candidate.name,
+        Candidate.image_url,
+        Candidate.onchain_id,
+        func.coalesce(CandidateTally.confirmed_count, 0),
+        func.coalesce(CandidateTally.pending_count, 0)
+    ).outerjoin(
+        Candidate, Candidate.post_id == Post.id
+    ).outerjoin(
+        CandidateTally, CandidateTally.candidate_id == Candidate.id
+    ).filter(
+        Post.election_id == election_id
+    ).order_by(
+        Post.id.asc(), Candidate.id.asc()
+    )
+
+
+def vote_counts_query(election_id):
+    """Like tally_query, but counts confirmed Vote rows instead of reading counters.
+
+    Kept for reconciliation checks and benchmarks; results pages use tally_query.
+    """
+    return db.session.query(
+        Post.id,
+        Post.title,
+        Candidate.id,
+        Candidate.name,
+        Candidate.image_url,
+        Candidate.onchain_id,
+        func.count(Vote.id)
+    ).outerjoin(
+        Candidate, Candidate.post_id == Post.id
+    ).outerjoin(
+        Vote, and_(
+            Vote.candidate_id == Candidate.id,
+            Vote.action == 'vote',
+            Vote.status == 'confirmed'
+        )
+    ).filter(
+        Post.election_id == election_id
+    ).group_by(
+        Post.id, Post.title, Candidate.id, Candidate.name, Candidate.image_url, Candidate.onchain_id
+    ).order_by(
+        Post.id.asc(), Candidate.id.asc()
+    )
+
+
+def onchain_tallies(election, onchain_ids):
+    """Vote counts keyed by candidate onchain_id; empty if the chain cannot be read."""
+    if not election.onchain_id or not onchain_ids:
+        return {}
+    try:
+        return get_contract_service().get_candidate_votes(election.onchain_id, onchain_ids)
+    except Exception as e:
+        current_app.logger.warning(f'Failed to fetch on-chain votes for election {election.id}: {e}')
+        return {}
+
+
+def election_results(election):
+    """Results grouped by post, candidates sorted by votes descending.
+
+    On-chain counts win over DB counts when available; both are reported.
+    """
+    rows = tally_query(election.id).all()
+    chain_tallies = onchain_tallies(election, [row[5] for row in rows if row[5] is not None])
+
+    results = []
+    by_post = {}
+    for post_id, post_title, candidate_id, name, image_url, onchain_id, db_votes, pending_votes in rows:
+        post = by_post.get(post_id)
+        if post is None:
+            post = {'id': post_id, 'title': post_title, 'candidates': [], 'winner': None}
+            by_post[post_id] = post
+            results.append(post)
+        if candidate_id is None:
+            continue
+
+        onchain_votes = chain_tallies.get(onchain_id) if onchain_id is not None else None
+        post['candidates'].append({
+            'id': candidate_id,
+            'name': name,
+            'image_url': image_url,
+            'votes': onchain_votes if onchain_votes is not None else db_votes,
+            'onchain_votes': onchain_votes,
+            'db_votes': db_votes,
+            'pending_votes': pending_votes
+        })
+
+    for post in results:
+        post['candidates'].sort(key=lambda x: x['votes'], reverse=True)
+        post['winner'] = post['candidates'][0]['name'] if post['candidates'] else None
+
+    return results
@@ -0,0 +1,40 @@
+"""
+Election counters for the BEEVS application
+
+election_stats(election_id) returns an election's candidate, post, voter and
+institutional record counts and its cast ballots from one SELECT of scalar
+subqueries, each answered from an election_id index, instead of loading the
+related collections to count them. Results are cached in the response cache
+under the election's generation, so every write that calls
+response_cache.invalidate() also refreshes them.
+"""
+
+from sqlalchemy import select, func
+from beevs import db
+from beevs.models import Candidate, Post, Voter, InstitutionalRecord, ElectionTally
+from beevs.cache import response_cache
+
+
+def stats_query(election_id):
+    def count(column, *criteria):
+        return select(func.count(column)).where(*criteria).scalar_subquery()
+
+    return select(
+        # candidates have no election_id index; their post_id index is reached through the election's posts
+        count(Candidate.id, Candidate.post_id.in_(select(Post.id).where(Post.election_id == election_id))).label('candidate_count'),
+        count(Post.id, Post.election_id == election_id).label('post_count'),
+        count(Voter.id, Voter.election_id == election_id).label('voter_count'),
+        count(InstitutionalRecord.id, InstitutionalRecord.election_id == election_id).label('record_count'),
+        # unique voters who have cast a ballot, from the live counters (see beevs.tallies)
+        select(ElectionTally.ballot_count).where(ElectionTally.election_id == election_id).scalar_subquery().label('cast_votes')
+    )
+
+
+def compute_stats(election_id):
+    row = db.session.execute(stats_query(election_id)).one()
+    return {name: int(value or 0) for name, value in row._mapping.items()}
+
+
+def election_stats(election_id):
+    """{candidate_count, post_count, voter_count, record_count, cast_votes} for an election"""
+    return response_cache.memoize('stats', int(election_id), lambda: compute_stats(election_id))
@@ -0,0 +1,135 @@
+"""
+Live tally maintenance for the BEEVS application
+
+candidate_tallies and election_tallies are counters kept in step with the
+votes table so results pages do not count Vote rows. Every helper here only
+issues statements on the current session; the caller commits, so counters
+change in the same transaction as the Vote rows they describe.
+"""
+
+from sqlalchemy import update, func, case
+from sqlalchemy.exc import IntegrityError
+from beevs import db
+from beevs.models import Candidate, CandidateTally, ElectionTally, Vote
+
+
+def _increment(model, key_column, key, values):
+    return db.session.execute(
+        update(model).where(key_column == key).values(**{
+            name: getattr(model, name) + delta for name, delta in values.items()
+        })
+    ).rowcount
+
+
+def _bump(model, key_column, key, values, new_row):
+    """Atomically add to counters, creating the row if it does not exist yet."""
+    if _increment(model, key_column, key, values):
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.add(new_row())
+    except IntegrityError:
+        # created concurrently; add to the row that won
+        _increment(model, key_column, key, values)
+
+
+def add_candidate(candidate):
+    """Create the (empty) tally row for a new candidate."""
+    db.session.add(CandidateTally(
+        candidate_id=candidate.id,
+        election_id=candidate.election_id,
+        post_id=candidate.post_id,
+        confirmed_count=0,
+        pending_count=0
+    ))
+
+
+def _bump_candidate(candidate, pending=0, confirmed=0):
+    values = {name: delta for name, delta in (('pending_count', pending), ('confirmed_count', confirmed)) if delta}
+    if not values:
+        return
+    _bump(CandidateTally, CandidateTally.candidate_id, candidate.id, values, lambda: CandidateTally(
+        candidate_id=candidate.id,
+        election_id=candidate.election_id,
+        post_id=candidate.post_id,
+        confirmed_count=max(confirmed, 0),
+        pending_count=max(pending, 0)
+    ))
+
+
+def record_ballot(election_id, candidates, first_ballot=True):
+    """A ballot was accepted: one pending vote per candidate, one more voter for the election."""
+    for candidate in candidates:
+        _bump_candidate(candidate, pending=1)
+    if first_ballot:
+        _bump(ElectionTally, ElectionTally.election_id, election_id, {'ballot_count': 1}, lambda: ElectionTally(
+            election_id=election_id,
+            ballot_count=1
+        ))
+
+
+def record_outcome(votes, status):
+    """Move still-pending 'vote' rows to confirmed (or drop them on failure).
+
+    votes are the audit rows of one transaction, i.e. at most one ballot; a
+    failed ballot no longer counts towards the election's ballot_count. Call
+    before the rows' status is overwritten; rows that are not pending are
+    skipped so a ballot is never counted twice.
+    """
+    failed_ballots = set()
+    for vote in votes:
+        if vote.action != 'vote' or vote.status != 'pending':
+            continue
+        if status != 'confirmed' and vote.election_id is not None:
+            failed_ballots.add(vote.election_id)
+        if vote.candidate is not None:
+            _bump_candidate(vote.candidate, pending=-1, confirmed=1 if status == 'confirmed' else 0)
+    for election_id in failed_ballots:
+        _increment(ElectionTally, ElectionTally.election_id, election_id, {'ballot_count': -1})
+
+
+def rebuild(election_id=None):
+    """Recompute tallies from the votes table (all elections, or one). Returns rows written."""
+    candidates = Candidate.query
+    vote_counts = db.session.query(
+        Vote.candidate_id,
+        func.sum(case((Vote.status == 'confirmed', 1), else_=0)),
+        func.sum(case((Vote.status == 'pending', 1), else_=0))
+    ).filter(Vote.action == 'vote', Vote.candidate_id.isnot(None))
+    voters = db.session.query(Vote.election_id, func.count(func.distinct(Vote.voter_id))).filter(
+        Vote.action == 'vote', Vote.status != 'failed', Vote.voter_id.isnot(None), Vote.election_id.isnot(None)
+    )
+    stale_tallies = CandidateTally.query
+    stale_ballots = ElectionTally.query
+    if election_id is not None:
+        candidates = candidates.filter(Candidate.election_id == election_id)
+        vote_counts = vote_counts.filter(Vote.election_id == election_id)
+        voters = voters.filter(Vote.election_id == election_id)
+        stale_tallies = stale_tallies.filter(CandidateTally.election_id == election_id)
+        stale_ballots = stale_ballots.filter(ElectionTally.election_id == election_id)
+
+    counts = {row[0]: (int(row[1] or 0), int(row[2] or 0)) for row in vote_counts.group_by(Vote.candidate_id).all()}
+    stale_tallies.delete(synchronize_session=False)
+    stale_ballots.delete(synchronize_session=False)
+
+    written = 0
+    for candidate in candidates.all():
+        confirmed, pending = counts.get(candidate.id, (0, 0))
+        db.session.add(CandidateTally(
+            candidate_id=candidate.id,
+            election_id=candidate.election_id,
+            post_id=candidate.post_id,
+            confirmed_count=confirmed,
+            pending_count=pending
+        ))
+        written += 1
+
+    for eid, count in voters.group_by(Vote.election_id).all():
+        db.session.add(ElectionTally(election_id=eid, ballot_count=int(count)))
+
+    return written
+
+
+def ballot_count(election_id):
+    row = db.session.query(ElectionTally.ballot_count).filter(ElectionTally.election_id == election_id).first()
+    return int(row[0]) if row else 0
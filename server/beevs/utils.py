@@ -70,3 +70,42 @@ def validate_password_strength(password):
     if not any(c.isdigit() for c in password):
         return False, "Password must contain at least one number"
     return True, "Password is valid"
+
+
+def sanitize_for_json(obj):
+    """Recursively convert web3/eth types (HexBytes, bytes) into JSON-serializable forms.
+
+    - bytes/bytearray/HexBytes -> 0x-prefixed hex string
+    - lists/dicts -> processed recursively
+    - other scalars returned unchanged
+    """
+    if obj is None:
+        return None
+
+    # Convert bytes-like to hex (HexBytes subclasses bytes)
+    if isinstance(obj, (bytes, bytearray)):
+        try:
+            return '0x' + bytes(obj).hex()
+        except Exception:
+            return str(obj)
+
+    # Lists/tuples/sets -> sanitize elements
+    if isinstance(obj, (list, tuple, set)):
+        return [sanitize_for_json(v) for v in obj]
+
+    # Dict-like objects (including web3 AttributeDict) -> sanitize key/values
+    if hasattr(obj, 'items'):
+        try:
+            return {k: sanitize_for_json(v) for k, v in dict(obj).items()}
+        except Exception:
+            return str(obj)
+
+    # Primitive types that are JSON-serializable
+    if isinstance(obj, (str, int, float, bool)):
+        return obj
+
+    # Unknown types -> string representation
+    try:
+        return str(obj)
+    except Exception:
+        return None
@@ -0,0 +1,30 @@
+"""
+Gunicorn settings for BEEVS, read automatically when gunicorn is started from
+this directory:
+
+    gunicorn wsgi:app
+
+The results stream (GET /api/v1/elections/<id>/results/stream) keeps its
+request open for as long as the viewer watches, so the default sync worker
+would give each viewer a whole worker process and kill it after the 30 s
+timeout. The gthread worker serves each request on a thread of the worker
+and its timeout only checks that the worker process itself is alive, so open
+streams are not killed. Size GUNICORN_THREADS for the expected viewers plus
+normal traffic. gevent is not used: the relayer, the live results poller and
+the face models rely on real threads.
+
+Every setting can be overridden with the GUNICORN_* variables below or on the
+command line.
+"""
+
+import os
+
+wsgi_app = 'wsgi:app'
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.getenv("GUNICORN_WORKERS", "2"))  # each loads the face models (FACE_PRELOAD)
+worker_class = 'gthread'
+threads = int(os.getenv("GUNICORN_THREADS", "64"))  # concurrent requests per worker, open result streams included
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))  # worker heartbeat; also covers face model loading at startup
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+# no preload_app: the relayer thread and the face models belong to each worker process
@@ -0,0 +1,44 @@
+"""empty message
+
+Revision ID: 9a5f3c2e7d18
+Revises: 4c9e1d7a2b63
+Create Date: 2025-12-04 16:41:09.527730
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a5f3c2e7d18'
+down_revision = '4c9e1d7a2b63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # A failed castBallot no longer holds the voter's ballot, so they can vote again
+    with op.batch_alter_table('outbox_transactions', schema=None) as batch_op:
+        batch_op.drop_index('uq_outbox_transactions_ballot')
+        batch_op.create_index('uq_outbox_transactions_ballot', ['election_id', 'voter_id'], unique=True,
+                              postgresql_where=sa.text("action = 'vote' AND status <> 'failed'"),
+                              sqlite_where=sa.text("action = 'vote' AND status <> 'failed'"))
+
+
+def downgrade():
+    # Voters who voted again after a failed ballot would break the old index; list them
+    duplicates = op.get_bind().execute(sa.text(
+        "SELECT election_id, voter_id, COUNT(*) FROM outbox_transactions "
+        "WHERE action = 'vote' AND voter_id IS NOT NULL "
+        "GROUP BY election_id, voter_id HAVING COUNT(*) > 1"
+    )).fetchall() if not op.get_context().as_sql else []
+    if duplicates:
+        raise RuntimeError(
+            'Voters with more than one ballot (election_id, voter_id, count): '
+            + ', '.join(str(tuple(row)) for row in duplicates)
+        )
+
+    with op.batch_alter_table('outbox_transactions', schema=None) as batch_op:
+        batch_op.drop_index('uq_outbox_transactions_ballot')
+        batch_op.create_index('uq_outbox_transactions_ballot', ['election_id', 'voter_id'], unique=True,
+                              postgresql_where=sa.text("action = 'vote'"), sqlite_where=sa.text("action = 'vote'"))
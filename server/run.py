@@ -1,3 +1,8 @@
+import os
+
+# Serving process: load the face models at startup (scripts leave them unloaded)
+os.environ.setdefault('FACE_PRELOAD', 'true')
+
 from beevs import create_app
 
 
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Script to backfill stored face embeddings for existing voters.
+Voters whose reference photo has no embedding (or one produced by a different
+model/detector) are embedded from their Voter.image_url file.
+"""
+
+import sys
+import os
+import argparse
+
+# Add the parent directory to the path to import the beevs module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from beevs import create_app, db, face_engine
+from beevs.models import Voter
+from beevs import face
+
+
+def backfill_face_embeddings(election_id=None, force=False, batch_size=50):
+    """Compute and store missing face embeddings"""
+    print("=== BEEVS Face Embedding Backfill ===\n")
+
+    app = create_app()
+    with app.app_context():
+        query = Voter.query.filter(Voter.image_url.isnot(None))
+        if election_id is not None:
+            query = query.filter(Voter.election_id == election_id)
+        if not force:
+            query = query.filter(db.or_(
+                Voter.face_embedding.is_(None),
+                Voter.face_embedding_version.is_(None),
+                Voter.face_embedding_version != face.embedding_version()
+            ))
+
+        voter_ids = [row[0] for row in query.with_entities(Voter.id).order_by(Voter.id.asc()).all()]
+        print(f"Voters to embed: {len(voter_ids)}")
+
+        done = 0
+        failed = 0
+        for start in range(0, len(voter_ids), batch_size):
+            chunk = voter_ids[start:start + batch_size]
+            for voter in Voter.query.filter(Voter.id.in_(chunk)).all():
+                path = face.reference_image_path(voter.image_url)
+                if not os.path.exists(path):
+                    print(f"  voter {voter.id}: image file missing ({path})")
+                    failed += 1
+                    continue
+                try:
+                    face.store_embedding(voter, face_engine.embed(path))
+                    done += 1
+                except Exception as e:
+                    print(f"  voter {voter.id}: {str(e)}")
+                    failed += 1
+            db.session.commit()
+            print(f"Processed {min(start + batch_size, len(voter_ids))}/{len(voter_ids)}")
+
+        print(f"\nEmbedded: {done}, failed: {failed}")
+        return failed == 0
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Backfill voter face embeddings')
+    parser.add_argument('--election-id', type=int, default=None, help='Only backfill voters of this election')
+    parser.add_argument('--force', action='store_true', help='Recompute embeddings that are already stored')
+    parser.add_argument('--batch-size', type=int, default=50, help='Voters committed per batch')
+    args = parser.parse_args()
+
+    try:
+        success = backfill_face_embeddings(args.election_id, args.force, args.batch_size)
+        sys.exit(0 if success else 1)
+    except KeyboardInterrupt:
+        print("\n\nOperation cancelled by user.")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\nUnexpected error: {str(e)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Gas and latency benchmark for ballot submission against a local chain
+(anvil / hardhat node / ganache) running the EVoting contract.
+
+Compares the old path (one voteOnBehalf per post, waiting for each receipt)
+with a single castBallot transaction. Uses WEB3_PROVIDER_URL,
+RELAYER_PRIVATE_KEY and CONTRACT_ADDRESS from the environment; pass --deploy
+to deploy a fresh contract from the EVoting.json artifact instead (refused
+when its bytecode does not match its ABI; see scripts/build_contract.py).
+"""
+
+import sys
+import os
+import time
+import argparse
+import statistics
+
+# Add the parent directory to the path to import the beevs module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from beevs.config import Config
+from beevs.contract import ContractService, compute_voter_hash, missing_selectors
+
+
+def deploy(cs):
+    """Deploy EVoting from the artifact bytecode and point cs at it"""
+    import json
+    with open(Config.CONTRACT_ABI_PATH) as fh:
+        artifact = json.load(fh)
+    missing = missing_selectors(artifact)
+    if missing:
+        raise RuntimeError(f"{Config.CONTRACT_ABI_PATH} bytecode lacks {', '.join(missing)}; rebuild it with scripts/build_contract.py")
+    bytecode = artifact['data']['bytecode']['object']
+    address = cs.relayer_address()
+    factory = cs.w3.eth.contract(abi=cs.abi, bytecode=bytecode)
+    tx = factory.constructor().build_transaction({
+        'chainId': cs.chain_id,
+        'from': address,
+        'nonce': cs.w3.eth.get_transaction_count(address),
+    })
+    tx_hash = cs.sign_and_send_raw_tx(tx)
+    receipt = cs.wait_for_receipt(tx_hash)
+    cs.contract_address = receipt['contractAddress']
+    cs._contract = cs.w3.eth.contract(address=cs.contract_address, abi=cs.abi)
+    return cs.contract_address
+
+
+def send(cs, function_name, args):
+    """Send a tx and wait for its receipt; returns (receipt, seconds)"""
+    started = time.perf_counter()
+    res = cs.send_transaction(function_name, args, wait_for_receipt=True)
+    receipt = res['receipt']
+    if int(receipt.get('status', 1)) != 1:
+        raise RuntimeError(f'{function_name} reverted')
+    return receipt, time.perf_counter() - started
+
+
+def setup_election(cs, posts, candidates_per_post):
+    """Create an election with posts x candidates; returns (election_id, ballot per post)"""
+    now = cs.w3.eth.get_block('latest')['timestamp']
+    receipt, _ = send(cs, 'createElection', [f'bench-{int(time.time())}', now - 60, now + 86400])
+    election_id = int(cs.get_contract().events.ElectionCreated().process_receipt(receipt)[0]['args']['electionId'])
+
+    ballot = []
+    for post_id in range(1, posts + 1):
+        first = None
+        for n in range(candidates_per_post):
+            receipt, _ = send(cs, 'addPostCandidate', [election_id, post_id, f'post{post_id}-cand{n}'])
+            candidate_id = int(cs.get_contract().events.CandidateAdded().process_receipt(receipt)[0]['args']['candidateId'])
+            first = first or candidate_id
+        ballot.append(first)
+    return election_id, ballot
+
+
+def register(cs, election_id, reg_no):
+    voter_hash = compute_voter_hash(['uint256', 'string'], [election_id, reg_no])
+    send(cs, 'registerVoter', [election_id, voter_hash])
+    return voter_hash
+
+
+def summarize(label, gas, seconds):
+    print(f"{label:<22} gas mean {statistics.mean(gas):>10,.0f}   latency mean {statistics.mean(seconds) * 1000:8.1f} ms   p50 {statistics.median(seconds) * 1000:8.1f} ms")
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Benchmark per-post votes against castBallot')
+    parser.add_argument('--posts', type=int, default=8)
+    parser.add_argument('--candidates', type=int, default=2, help='Candidates per post')
+    parser.add_argument('--voters', type=int, default=5, help='Ballots cast per path')
+    parser.add_argument('--deploy', action='store_true', help='Deploy a fresh contract first')
+    args = parser.parse_args()
+
+    cs = ContractService()
+    if args.deploy:
+        print(f"Deployed EVoting at {deploy(cs)}")
+
+    election_id, ballot = setup_election(cs, args.posts, args.candidates)
+    print(f"Election {election_id}: {args.posts} posts, {args.candidates} candidates each, {args.voters} ballots per path\n")
+
+    per_post_gas, per_post_time = [], []
+    batch_gas, batch_time = [], []
+    for i in range(args.voters):
+        voter_hash = register(cs, election_id, f'bench-post-{i}')
+        gas, seconds = 0, 0.0
+        for candidate_id in ballot:
+            receipt, elapsed = send(cs, 'voteOnBehalf', [election_id, voter_hash, candidate_id])
+            gas += int(receipt['gasUsed'])
+            seconds += elapsed
+        per_post_gas.append(gas)
+        per_post_time.append(seconds)
+
+        voter_hash = register(cs, election_id, f'bench-ballot-{i}')
+        started = time.perf_counter()
+        receipt = cs.cast_ballot(election_id, voter_hash, ballot, wait_for_receipt=True)['receipt']
+        batch_time.append(time.perf_counter() - started)
+        batch_gas.append(int(receipt['gasUsed']))
+
+    summarize(f'{args.posts} x voteOnBehalf', per_post_gas, per_post_time)
+    summarize('1 x castBallot', batch_gas, batch_time)
+
+
+if __name__ == "__main__":
+    main()
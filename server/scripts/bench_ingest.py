@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the institutional records CSV ingest.
+Generates CSV files of 10k, 100k and 1M rows and loads each into a fresh
+election twice: through the old one-ORM-object-per-row path and through
+beevs.ingest (COPY on PostgreSQL, chunked executemany elsewhere), reporting
+rows per second and peak resident memory. The old path is skipped above
+--legacy-max rows. Runs against an in-memory SQLite database by default;
+pass --database-url to use a real database (fixture elections are deleted
+afterwards).
+"""
+
+import sys
+import os
+import io
+import csv
+import time
+import argparse
+import resource
+import tempfile
+
+# Add the parent directory to the path to import the beevs module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark institutional record CSV ingest')
+    parser.add_argument('--database-url', default='sqlite://', help='Database to load into (default: in-memory SQLite)')
+    parser.add_argument('--sizes', default='10000,100000,1000000', help='Comma-separated row counts')
+    parser.add_argument('--legacy-max', type=int, default=100000, help='Largest file to run through the per-row ORM path')
+    parser.add_argument('--chunk-size', type=int, default=None, help='Override INGEST_CHUNK_SIZE')
+    return parser.parse_args()
+
+
+args = parse_args()
+os.environ['DATABASE_URL'] = args.database_url
+os.environ.setdefault('FACE_PRELOAD', 'false')
+os.environ.setdefault('RELAYER_BACKGROUND', 'false')
+
+from datetime import datetime, timedelta
+
+from beevs import create_app, db
+from beevs.models import Admin, AdminRole, Election, InstitutionalRecord
+from beevs.ingest import open_csv, ingest_records
+
+
+def write_csv(path, rows):
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['name', 'registration_number', 'department', 'faculty', 'level'])
+        for n in range(rows):
+            writer.writerow([f'Student {n}', f'REG/{n:07d}', f'Department {n % 40}', f'Faculty {n % 8}', 100 * (n % 5 + 1)])
+
+
+def make_election(admin_id):
+    now = datetime.now()
+    election = Election(title='ingest-bench', scheduled_for=now.date(), starts_at=now, ends_at=now + timedelta(days=1), super_admin_id=admin_id)
+    db.session.add(election)
+    db.session.commit()
+    return election.id
+
+
+def legacy_ingest(election_id, path):
+    """The upload loop as it was before beevs.ingest: preload, one ORM object per row, one commit"""
+    with open(path, 'rb') as f:
+        reader = csv.DictReader(io.TextIOWrapper(f, encoding='utf-8'))
+        existing = {r[0] for r in InstitutionalRecord.query.with_entities(InstitutionalRecord.registration_number).filter_by(election_id=election_id).all()}
+        saved = []
+        for row in reader:
+            data = {k.strip().lower(): v.strip() for k, v in row.items()}
+            if data['registration_number'] in existing:
+                continue
+            record = InstitutionalRecord(
+                name=data['name'], registration_number=data['registration_number'], department=data['department'],
+                faculty=data['faculty'], level=int(data['level']), election_id=election_id
+            )
+            db.session.add(record)
+            saved.append(record)
+        db.session.commit()
+        # the old endpoint echoed every saved row back
+        payload = [r.to_dict() for r in saved]
+    return len(payload)
+
+
+def chunked_ingest(election_id, path):
+    with open(path, 'rb') as f:
+        summary = ingest_records(election_id, open_csv(f), chunk_size=args.chunk_size)
+    return summary.saved_count
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run(label, fn, admin_id, path, rows):
+    election_id = make_election(admin_id)
+    started = time.perf_counter()
+    saved = fn(election_id, path)
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<8} {rows:>9} rows  {elapsed:8.2f} s  {rows / elapsed:>10.0f} rows/s  peak RSS {peak_rss_mb():7.1f} MB")
+    if saved != rows:
+        print(f"  !! {label} saved {saved} of {rows} rows")
+    db.session.expunge_all()
+    # bulk deletes do not cascade on SQLite, and it reuses the freed election id
+    InstitutionalRecord.query.filter_by(election_id=election_id).delete()
+    Election.query.filter_by(id=election_id).delete()
+    db.session.commit()
+
+
+def main():
+    """Main function"""
+    print("=== BEEVS CSV Ingest Benchmark ===\n")
+    app = create_app()
+    with app.app_context():
+        if args.database_url == 'sqlite://':
+            db.create_all()
+        print(f"Database: {db.engine.dialect.name} ({'COPY' if db.engine.dialect.driver == 'psycopg2' else 'executemany'})\n")
+
+        admin = Admin.query.filter_by(role=AdminRole.SUPER_ADMIN).first()
+        created_admin = admin is None
+        if created_admin:
+            admin = Admin('Ingest Bench', 'ingest-bench@beevs.local', AdminRole.SUPER_ADMIN)
+            admin.password = os.urandom(16).hex()
+            db.session.add(admin)
+            db.session.commit()
+        admin_id = admin.id
+
+        with tempfile.TemporaryDirectory() as tmp:
+            try:
+                for rows in [int(n) for n in args.sizes.split(',')]:
+                    path = os.path.join(tmp, f'records-{rows}.csv')
+                    write_csv(path, rows)
+                    print(f"{rows} rows ({os.path.getsize(path) / 1e6:.1f} MB CSV)")
+                    # peak RSS only grows, so run the leaner path first
+                    run('chunked', chunked_ingest, admin_id, path, rows)
+                    if rows <= args.legacy_max:
+                        run('per-row', legacy_ingest, admin_id, path, rows)
+                    os.remove(path)
+                    print()
+            finally:
+                if created_admin:
+                    db.session.delete(db.session.get(Admin, admin_id))
+                    db.session.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for response serialization (beevs.response).
+
+Encodes a voter listing of --rows column tuples, shaped like
+Voter.list_columns(), into the APIResponse envelope three ways:
+
+- previous path: a dict per row with isoformat() per datetime, rendered by
+  Flask's default JSON provider
+- encode_rows with the standard library backend (a dict per row, datetimes
+  left to the encoder)
+- encode_rows with the orjson backend, when orjson is installed
+
+then encodes the same rows as to_dict()-style dicts through each serializer.
+Every path is checked to decode to the same document before it is timed.
+Needs no database.
+"""
+
+import sys
+import os
+import time
+import argparse
+import statistics
+from datetime import datetime, timedelta
+
+# Add the parent directory to the path to import the beevs module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, json
+from flask.json.provider import DefaultJSONProvider
+from beevs.models import Voter
+from beevs.response import JSONSerializer, StdlibBackend, make_backend
+
+
+def make_rows(count):
+    names = list(Voter.list_columns())
+    started = datetime(2025, 1, 1, 8, 0, 0)
+    rows = [(n + 1, f'Student {n}', f'student{n}@example.edu', f'http://localhost/media/{n:064x}.jpg', f'0x{n:040x}',
+             started + timedelta(seconds=n, microseconds=n % 1000), 1, n + 1, n if n % 3 else None)
+            for n in range(count)]
+    return names, rows
+
+
+def legacy_items(names, rows):
+    return [{name: value.isoformat() if isinstance(value, datetime) else value for name, value in zip(names, row)}
+            for row in rows]
+
+
+def envelope(data):
+    return {'success': True, 'message': 'Success', 'data': data}
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return min(timings), statistics.median(timings)
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Compare JSON serialization paths for API responses')
+    parser.add_argument('--rows', type=int, default=10000, help='Rows in the listing')
+    parser.add_argument('--repeat', type=int, default=15, help='Timed runs per path')
+    args = parser.parse_args()
+
+    print("=== BEEVS JSON Serialization Benchmark ===\n")
+    app = Flask(__name__)
+    legacy = DefaultJSONProvider(app)
+    names, rows = make_rows(args.rows)
+
+    serializers = {'stdlib': JSONSerializer()}
+    serializers['stdlib'].backend = StdlibBackend()
+    backend = make_backend('auto')
+    if backend.name == 'orjson':
+        serializers['orjson'] = JSONSerializer()
+        serializers['orjson'].backend = backend
+    else:
+        print("orjson is not installed; timing the standard library backend only\n")
+
+    listing = {'previous (dict per row)': lambda: legacy.response(envelope({'voters': legacy_items(names, rows), 'next_cursor': None})).get_data()}
+    for label, serializer in serializers.items():
+        listing[f'encode_rows, {label}'] = (
+            lambda s=serializer: s.dumps(envelope({'voters': s.encode_rows(names, rows), 'next_cursor': None}))
+        )
+
+    # to_dict() output, as detail endpoints return it
+    dicts = legacy_items(names, rows)
+    payload = {'previous (Flask provider)': lambda: legacy.response(envelope({'voters': dicts})).get_data()}
+    for label, serializer in serializers.items():
+        payload[f'dumps, {label}'] = lambda s=serializer: s.dumps(envelope({'voters': dicts}))
+
+    for title, paths in ((f'Listing of {args.rows} rows', listing), (f'Payload of {args.rows} dicts', payload)):
+        expected = None
+        print(title)
+        for label, fn in paths.items():
+            document = json.loads(fn())
+            if expected is None:
+                expected = document
+            elif document != expected:
+                print(f"  {label}: output differs from the previous path")
+                sys.exit(1)
+            best, median = best_of(fn, args.repeat)
+            print(f"  {label:<32} best {best:8.1f} ms   median {median:8.1f} ms   {len(fn()) / 1024:8.0f} KiB")
+        print()
+
+
+if __name__ == "__main__":
+    main()
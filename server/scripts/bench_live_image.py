@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the live-capture image path used by vote-auth and audit-auth.
+Compares the old temp-file path (save upload to static/images, let the
+detector read it back, unlink) with decoding the upload in memory.
+Pass --with-model to include face embedding in each iteration.
+"""
+
+import sys
+import os
+import io
+import time
+import uuid
+import argparse
+import statistics
+import tempfile
+
+# Add the parent directory to the path to import the beevs module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import numpy as np
+from werkzeug.datastructures import FileStorage
+
+from beevs.face import decode_image
+
+
+def make_capture(width, height):
+    """Encode a noisy JPEG roughly the size of a webcam capture"""
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 255, size=(height, width, 3), dtype=np.uint8)
+    ok, encoded = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 90])
+    if not ok:
+        raise RuntimeError('Failed to encode benchmark image')
+    return encoded.tobytes()
+
+
+def upload(payload):
+    return FileStorage(stream=io.BytesIO(payload), filename='capture.jpg', content_type='image/jpeg')
+
+
+def temp_file_path(payload, images_dir, embed):
+    temp_path = os.path.join(images_dir, f"vote_live_{uuid.uuid4().hex}.jpg")
+    upload(payload).save(temp_path)
+    try:
+        # DeepFace loads paths with cv2.imread before detection
+        image = cv2.imread(temp_path)
+        if embed:
+            embed(temp_path)
+        return image
+    finally:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+
+
+def in_memory_path(payload, images_dir, embed):
+    image = decode_image(upload(payload))
+    if embed:
+        embed(image)
+    return image
+
+
+def run(label, fn, payload, images_dir, embed, iterations):
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn(payload, images_dir, embed)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{label:<12} mean {statistics.mean(timings):8.2f} ms   p50 {statistics.median(timings):8.2f} ms   p95 {p95:8.2f} ms")
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Benchmark live capture handling')
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--width', type=int, default=1280)
+    parser.add_argument('--height', type=int, default=720)
+    parser.add_argument('--images-dir', default=None, help='Directory for temp files (defaults to a temp dir)')
+    parser.add_argument('--with-model', action='store_true', help='Also embed the face in every iteration')
+    args = parser.parse_args()
+
+    embed = None
+    if args.with_model:
+        from beevs.face import FaceEngine
+        engine = FaceEngine()
+        engine.pool_workers = 0
+        engine.preload()
+        embed = engine.embed
+
+    payload = make_capture(args.width, args.height)
+    print(f"Capture: {args.width}x{args.height} JPEG, {len(payload) / 1024:.0f} KiB, {args.iterations} iterations\n")
+
+    images_dir = args.images_dir or tempfile.mkdtemp(prefix='beevs-bench-')
+    run('temp file', temp_file_path, payload, images_dir, embed, args.iterations)
+    run('in memory', in_memory_path, payload, images_dir, embed, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Latency benchmark for admin login (beevs.passwords).
+
+Fires --concurrency threads of back-to-back logins through the Flask test
+client and reports login p50/p95/p99, while one more thread times a cheap
+request (the readiness probe) to show what the bcrypt work costs the rest of
+the process. Runs once with bcrypt on the dedicated pool and once inline on
+the request thread (BCRYPT_WORKERS = 0), then replays a credential-stuffing
+burst from one address with the login limiter at its configured limits.
+Runs against a temporary SQLite file by default; pass --database-url to use
+a real database (the fixture admin is deleted afterwards).
+"""
+
+import sys
+import os
+import time
+import argparse
+import tempfile
+import threading
+
+# Add the parent directory to the path to import the beevs module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark admin login latency under concurrency')
+    parser.add_argument('--database-url', default=None, help='Database to use (default: a temporary SQLite file)')
+    parser.add_argument('--concurrency', type=int, default=8, help='Threads logging in at once')
+    parser.add_argument('--logins', type=int, default=10, help='Logins per thread')
+    parser.add_argument('--workers', type=int, default=None, help='BCRYPT_WORKERS for the pool run (default: config)')
+    parser.add_argument('--stuffing', type=int, default=200, help='Attempts in the credential-stuffing burst')
+    return parser.parse_args()
+
+
+args = parse_args()
+_tmp_db = None
+if args.database_url is None:
+    _tmp_db = tempfile.NamedTemporaryFile(prefix='beevs-bench-', suffix='.db', delete=False)
+    args.database_url = f'sqlite:///{_tmp_db.name}'
+os.environ['DATABASE_URL'] = args.database_url
+os.environ.setdefault('FACE_PRELOAD', 'false')
+os.environ.setdefault('RELAYER_BACKGROUND', 'false')
+
+from beevs import create_app, db
+from beevs.models import Admin, AdminRole
+from beevs.passwords import password_hasher, login_limiter
+
+EMAIL = 'bench-login@beevs.local'
+PASSWORD = 'bench-' + os.urandom(8).hex()
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * pct / 100), len(ordered) - 1)]
+
+
+def run_load(app):
+    """Concurrent logins plus one thread of light requests; returns (login ms, light ms, statuses)"""
+    login_times, light_times, statuses = [], [], {}
+    lock = threading.Lock()
+    done = threading.Event()
+    barrier = threading.Barrier(args.concurrency + 1)
+
+    def login_worker():
+        client = app.test_client()
+        barrier.wait()
+        for _ in range(args.logins):
+            started = time.perf_counter()
+            response = client.post('/api/v1/auth/login', json={'email': EMAIL, 'password': PASSWORD})
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                login_times.append(elapsed)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    def light_worker():
+        client = app.test_client()
+        barrier.wait()
+        while not done.is_set():
+            started = time.perf_counter()
+            client.get('/api/v1/health/ready')
+            light_times.append((time.perf_counter() - started) * 1000)
+            time.sleep(0.005)
+
+    threads = [threading.Thread(target=login_worker) for _ in range(args.concurrency)]
+    light = threading.Thread(target=light_worker)
+    light.start()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    done.set()
+    light.join()
+    return login_times, light_times, statuses
+
+
+def report(label, login_times, light_times, statuses):
+    print(f"{label}")
+    print(f"  login    p50 {percentile(login_times, 50):8.1f} ms   p95 {percentile(login_times, 95):8.1f} ms   "
+          f"p99 {percentile(login_times, 99):8.1f} ms   max {max(login_times):8.1f} ms")
+    print(f"  probe    p50 {percentile(light_times, 50):8.1f} ms   p99 {percentile(light_times, 99):8.1f} ms   "
+          f"({len(light_times)} requests)")
+    print(f"  statuses {dict(sorted(statuses.items()))}\n")
+
+
+def run_stuffing(app):
+    """One address trying many emails, then one email many passwords"""
+    client = app.test_client()
+    environ = {'REMOTE_ADDR': '203.0.113.7'}
+    statuses = {}
+    started = time.perf_counter()
+    for n in range(args.stuffing):
+        response = client.post('/api/v1/auth/login', json={'email': f'user{n}@example.com', 'password': 'hunter2'},
+                               environ_base=environ)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    elapsed = time.perf_counter() - started
+    print(f"Credential stuffing from one address ({args.stuffing} attempts): {dict(sorted(statuses.items()))} "
+          f"in {elapsed:.2f} s")
+
+    statuses = {}
+    for n in range(args.stuffing):
+        response = client.post('/api/v1/auth/login', json={'email': EMAIL, 'password': f'guess-{n}'},
+                               environ_base={'REMOTE_ADDR': f'198.51.100.{n % 250}'})
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    print(f"Password guessing on one email ({args.stuffing} attempts): {dict(sorted(statuses.items()))}")
+
+
+def main():
+    """Main function"""
+    print("=== BEEVS Login Benchmark ===\n")
+    app = create_app()
+    limits = {key: app.config.get(key) for key in ('LOGIN_IP_LIMIT', 'LOGIN_EMAIL_LIMIT')}
+    with app.app_context():
+        if db.engine.dialect.name == 'sqlite':
+            db.create_all()
+        admin = Admin('Login Benchmark', EMAIL, AdminRole.ADMIN)
+        admin.password = PASSWORD
+        db.session.add(admin)
+        db.session.commit()
+        admin_id = admin.id
+
+    workers = args.workers if args.workers is not None else app.config['BCRYPT_WORKERS']
+    print(f"bcrypt cost {password_hasher.log_rounds}, {args.concurrency} threads x {args.logins} logins\n")
+    try:
+        # limiter off for the load runs, so every login reaches bcrypt
+        app.config.update(LOGIN_IP_LIMIT=0, LOGIN_EMAIL_LIMIT=0)
+        login_limiter.init_app(app)
+        for label, pool_workers in ((f'Pool ({workers} workers)', workers), ('Inline (BCRYPT_WORKERS = 0)', 0)):
+            app.config['BCRYPT_WORKERS'] = pool_workers
+            password_hasher.init_app(app)
+            report(label, *run_load(app))
+
+        app.config.update(BCRYPT_WORKERS=workers, **limits)
+        password_hasher.init_app(app)
+        login_limiter.init_app(app)
+        login_limiter.reset()
+        run_stuffing(app)
+    finally:
+        with app.app_context():
+            db.session.delete(db.session.get(Admin, admin_id))
+            db.session.commit()
+        if _tmp_db is not None:
+            os.remove(_tmp_db.name)
+
+
+if __name__ == "__main__":
+    main()
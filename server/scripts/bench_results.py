@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Benchmark fixture for the election results query.
+Seeds an election with 50 posts and 500 candidates (plus confirmed votes) and
+compares the old per-post / per-candidate queries, a grouped count over the
+votes table and the candidate_tallies counters read by beevs.results,
+counting SQL statements for each. Runs against an in-memory
+SQLite database by default; pass --database-url to use a real database
+(the fixture election is deleted afterwards).
+"""
+
+import sys
+import os
+import time
+import argparse
+import statistics
+
+# Add the parent directory to the path to import the beevs module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark election results queries')
+    parser.add_argument('--database-url', default='sqlite://', help='Database to seed (default: in-memory SQLite)')
+    parser.add_argument('--posts', type=int, default=50)
+    parser.add_argument('--candidates', type=int, default=500, help='Candidates in total, spread over the posts')
+    parser.add_argument('--votes-per-candidate', type=int, default=20)
+    parser.add_argument('--iterations', type=int, default=20)
+    return parser.parse_args()
+
+
+args = parse_args()
+os.environ['DATABASE_URL'] = args.database_url
+os.environ.setdefault('FACE_PRELOAD', 'false')
+os.environ.setdefault('RELAYER_BACKGROUND', 'false')
+
+from datetime import datetime, timedelta
+from sqlalchemy import event
+
+from beevs import create_app, db
+from beevs.models import Admin, AdminRole, Election, Post, Candidate, Vote, CandidateTally
+from beevs import tallies
+from beevs.results import vote_counts_query, tally_query
+
+
+def seed(posts, candidates, votes_per_candidate):
+    now = datetime.now()
+    admin = Admin.query.filter_by(role=AdminRole.SUPER_ADMIN).first()
+    created_admin = admin is None
+    if created_admin:
+        admin = Admin('Results Bench', 'results-bench@beevs.local', AdminRole.SUPER_ADMIN)
+        admin.password = os.urandom(16).hex()
+        db.session.add(admin)
+        db.session.flush()
+    election = Election(title='results-bench', scheduled_for=now.date(), starts_at=now, ends_at=now + timedelta(days=1), super_admin_id=admin.id)
+    db.session.add(election)
+    db.session.flush()
+
+    post_rows = [Post(title=f'Post {n}', election_id=election.id) for n in range(posts)]
+    db.session.add_all(post_rows)
+    db.session.flush()
+
+    candidate_rows = [
+        Candidate(name=f'Candidate {n}', wallet_address=f'bench-{election.id}-{n}', election_id=election.id, post_id=post_rows[n % posts].id)
+        for n in range(candidates)
+    ]
+    db.session.add_all(candidate_rows)
+    db.session.flush()
+
+    db.session.bulk_insert_mappings(Vote, [
+        {'election_id': election.id, 'candidate_id': c.id, 'action': 'vote', 'status': 'confirmed', 'created_at': now, 'updated_at': now}
+        for c in candidate_rows for _ in range(votes_per_candidate)
+    ])
+    tallies.rebuild(election.id)
+    db.session.commit()
+    return election.id, (admin.id if created_admin else None)
+
+
+def legacy_results(election_id):
+    """The results loop as it was before beevs.results: one query per post and per candidate"""
+    results = []
+    for post in Post.query.filter_by(election_id=election_id).order_by(Post.id.asc()).all():
+        candidates = Candidate.query.filter_by(post_id=post.id).order_by(Candidate.id.asc()).all()
+        counts = [db.session.query(Vote).filter(
+            Vote.candidate_id == candidate.id,
+            Vote.action == 'vote',
+            Vote.status == 'confirmed'
+        ).count() for candidate in candidates]
+        results.append((post.id, counts))
+    return results
+
+
+def grouped_results(election_id):
+    return vote_counts_query(election_id).all()
+
+
+def counter_results(election_id):
+    return tally_query(election_id).all()
+
+
+def run(label, fn, election_id, iterations, statements):
+    timings = []
+    counts = []
+    for _ in range(iterations):
+        db.session.expire_all()
+        before = statements[0]
+        started = time.perf_counter()
+        fn(election_id)
+        timings.append((time.perf_counter() - started) * 1000)
+        counts.append(statements[0] - before)
+    print(f"{label:<10} queries {max(counts):>5}   mean {statistics.mean(timings):8.2f} ms   p50 {statistics.median(timings):8.2f} ms")
+
+
+def main():
+    """Main function"""
+    app = create_app()
+    with app.app_context():
+        if db.engine.dialect.name == 'sqlite':
+            db.create_all()
+
+        statements = [0]
+
+        @event.listens_for(db.engine, 'before_cursor_execute')
+        def count_statement(*_):
+            statements[0] += 1
+
+        election_id, bench_admin_id = seed(args.posts, args.candidates, args.votes_per_candidate)
+        print(f"Fixture: {args.posts} posts, {args.candidates} candidates, {args.candidates * args.votes_per_candidate} votes\n")
+        try:
+            run('per-row', legacy_results, election_id, args.iterations, statements)
+            run('grouped', grouped_results, election_id, args.iterations, statements)
+            run('counters', counter_results, election_id, args.iterations, statements)
+        finally:
+            db.session.rollback()
+            CandidateTally.query.filter_by(election_id=election_id).delete()
+            Vote.query.filter_by(election_id=election_id).delete()
+            Candidate.query.filter_by(election_id=election_id).delete()
+            Post.query.filter_by(election_id=election_id).delete()
+            Election.query.filter_by(id=election_id).delete()
+            if bench_admin_id is not None:
+                Admin.query.filter_by(id=bench_admin_id).delete()
+            db.session.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Script to compile BEEVS.sol into the EVoting artifact (beevs/EVoting.json).
+
+The artifact keeps the Remix layout the app and scripts read: 'abi' plus
+'data' holding solc's evm output (bytecode, deployedBytecode, gasEstimates,
+methodIdentifiers). Compiles with py-solc-x (pip install py-solc-x), which
+installs the requested solc version on first use. Every ABI function is then
+checked against the deployed bytecode's dispatcher (beevs.contract.missing_selectors),
+so an ABI edited without recompiling cannot be written or shipped. Offline,
+pass --solc-binary with the path of a solc executable instead of installing one.
+
+Pass --check to only verify the committed artifact; exits non-zero when its
+ABI lists functions the bytecode does not contain.
+"""
+
+import sys
+import os
+import json
+import argparse
+
+# Add the parent directory to the path to import the beevs module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from beevs.contract import missing_selectors
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SOURCE = os.path.join(os.path.dirname(SERVER_DIR), 'BEEVS.sol')
+DEFAULT_ARTIFACT = os.path.join(SERVER_DIR, 'beevs', 'EVoting.json')
+
+
+def check(artifact_path):
+    """Report ABI functions missing from the artifact's bytecode"""
+    with open(artifact_path) as fh:
+        artifact = json.load(fh)
+    missing = missing_selectors(artifact)
+    if missing:
+        print(f"{artifact_path}: the bytecode does not contain {len(missing)} ABI function(s):")
+        for signature in missing:
+            print(f"  {signature}")
+        print("\nRecompile with: python scripts/build_contract.py")
+        return False
+    print(f"{artifact_path}: ABI and bytecode agree")
+    return True
+
+
+def compile_contract(source_path, solc_version, optimize_runs, solc_binary=None):
+    try:
+        import solcx
+    except ImportError:
+        raise RuntimeError('py-solc-x is not installed (pip install py-solc-x)')
+    if solc_binary:
+        solc_version = None
+    elif solc_version not in [str(v) for v in solcx.get_installed_solc_versions()]:
+        print(f"Installing solc {solc_version}...")
+        solcx.install_solc(solc_version)
+
+    with open(source_path) as fh:
+        source = fh.read()
+    settings = {
+        'outputSelection': {'*': {'*': ['abi', 'evm.bytecode', 'evm.deployedBytecode', 'evm.gasEstimates', 'evm.methodIdentifiers']}},
+    }
+    if optimize_runs:
+        settings['optimizer'] = {'enabled': True, 'runs': optimize_runs}
+    output = solcx.compile_standard(
+        {'language': 'Solidity', 'sources': {os.path.basename(source_path): {'content': source}}, 'settings': settings},
+        solc_version=solc_version,
+        solc_binary=solc_binary,
+    )
+    contract = output['contracts'][os.path.basename(source_path)]['EVoting']
+    return contract['abi'], contract['evm']
+
+
+def build(source_path, artifact_path, solc_version, optimize_runs, solc_binary=None):
+    """Compile and write the artifact, keeping its 'deploy' section"""
+    print("=== BEEVS Contract Build ===\n")
+    abi, evm = compile_contract(source_path, solc_version, optimize_runs, solc_binary)
+
+    artifact = {}
+    if os.path.exists(artifact_path):
+        with open(artifact_path) as fh:
+            artifact = json.load(fh)
+    artifact['data'] = evm
+    artifact['abi'] = abi
+    missing = missing_selectors(artifact)
+    if missing:
+        raise RuntimeError(f"compiled bytecode lacks {', '.join(missing)}")
+
+    with open(artifact_path, 'w') as fh:
+        json.dump(artifact, fh, indent=4)
+    print(f"Wrote {artifact_path} (solc {solc_binary or solc_version}, optimizer {'runs=' + str(optimize_runs) if optimize_runs else 'off'})")
+    print(f"Functions: {', '.join(sorted(evm['methodIdentifiers']))}")
+    print(f"Creation gas: {evm['gasEstimates']['creation']['totalCost']}")
+    return True
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Compile BEEVS.sol into the EVoting artifact')
+    parser.add_argument('--source', default=DEFAULT_SOURCE)
+    parser.add_argument('--artifact', default=DEFAULT_ARTIFACT)
+    parser.add_argument('--solc-version', default='0.8.20')
+    parser.add_argument('--solc-binary', help='Compile with this solc executable instead of an installed version')
+    parser.add_argument('--optimize-runs', type=int, default=0, help='Enable the optimizer with this many runs (default: off)')
+    parser.add_argument('--check', action='store_true', help='Only verify the existing artifact')
+    args = parser.parse_args()
+
+    try:
+        if args.check:
+            success = check(args.artifact)
+        else:
+            success = build(args.source, args.artifact, args.solc_version, args.optimize_runs, args.solc_binary)
+        sys.exit(0 if success else 1)
+    except KeyboardInterrupt:
+        print("\n\nOperation cancelled by user.")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\nError: {str(e)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
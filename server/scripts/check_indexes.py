@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Script to check that the database planner uses the hot-path indexes.
+Runs EXPLAIN (EXPLAIN QUERY PLAN on SQLite) for the query shapes issued by
+the voters and elections endpoints and the relayer, and fails if a plan
+scans a whole table or does not mention the index it is meant to use. Runs
+against an in-memory SQLite database built from the models by default; pass
+--database-url to check a migrated database (on PostgreSQL sequential scans are disabled for the
+session so tiny tables still show the index).
+"""
+
+import sys
+import os
+import argparse
+
+# Add the parent directory to the path to import the beevs module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Check that hot queries use their indexes')
+    parser.add_argument('--database-url', default='sqlite://', help='Database to check (default: in-memory SQLite from the models)')
+    parser.add_argument('--verbose', action='store_true', help='Print every plan')
+    return parser.parse_args()
+
+
+args = parse_args()
+os.environ['DATABASE_URL'] = args.database_url
+os.environ.setdefault('FACE_PRELOAD', 'false')
+os.environ.setdefault('RELAYER_BACKGROUND', 'false')
+
+from sqlalchemy import func
+from beevs import create_app, db
+from beevs.models import Vote, Voter, InstitutionalRecord
+from beevs.results import tally_query, vote_counts_query
+from beevs.stats import stats_query
+
+
+def hot_queries():
+    """(description, expected index or indexes, query) for each hot lookup, shaped like the endpoint code"""
+    return [
+        ('vote_auth / cast_vote: has this voter voted', 'ix_votes_election_id_voter_id_action',
+         Vote.query.filter_by(election_id=1, voter_id=1, action='vote')),
+        ('get_audit: a voter\'s ballot rows', 'ix_votes_election_id_voter_id_action',
+         Vote.query.filter_by(election_id=1, voter_id=1, action='vote').order_by(Vote.created_at.asc())),
+        ('vote_counts_query: confirmed votes per candidate', 'ix_votes_candidate_id_action_status',
+         vote_counts_query(1)),
+        ('tallies.rebuild: counts per candidate', 'ix_votes_candidate_id_action_status',
+         db.session.query(Vote.candidate_id, func.count(Vote.id)).filter(
+             Vote.candidate_id == 1, Vote.action == 'vote', Vote.status == 'confirmed')),
+        ('relayer: votes of an outbox transaction', 'ix_votes_outbox_id',
+         Vote.query.filter(Vote.outbox_id == 1)),
+        ('vote_auth / face check: voter by registration number', ('ix_voters_student_record_id_election_id', 'ix_voters_election_id_id'),
+         db.session.query(Voter).join(InstitutionalRecord, Voter.student_record_id == InstitutionalRecord.id).filter(
+             InstitutionalRecord.registration_number == 'REG/001', Voter.election_id == 1)),
+        ('create_voter: existing voter for a record', 'ix_voters_student_record_id_election_id',
+         Voter.query.filter_by(student_record_id=1, election_id=1)),
+        ('create_voter: institutional record by registration number', 'uq_institutional_record_registration_election',
+         InstitutionalRecord.query.filter_by(registration_number='REG/001', election_id=1)),
+        ('list_voters: keyset page', 'ix_voters_election_id_id',
+         Voter.query.filter(Voter.election_id == 1, Voter.id > 100).order_by(Voter.id.asc()).limit(100)),
+        ('results: posts of an election', 'ix_posts_election_id',
+         tally_query(1)),
+        ('results: candidates of a post', 'ix_candidates_post_id',
+         tally_query(1)),
+        ('election_stats: counters in one statement', 'ix_voters_election_id_id',
+         stats_query(1)),
+    ]
+
+
+def full_scans(plan, dialect):
+    """Plan lines that read a whole table"""
+    if dialect == 'sqlite':
+        # a SELECT without FROM (scalar subqueries only) shows up as SCAN CONSTANT ROW
+        return [line for line in plan.splitlines() if ' SCAN ' in f' {line} ' and 'USING' not in line and 'CONSTANT ROW' not in line]
+    return [line for line in plan.splitlines() if 'Seq Scan' in line]
+
+
+def uses_index(plan, index_name):
+    if index_name in plan:
+        return True
+    # SQLite reports a unique constraint's index under its autoindex name
+    return index_name.startswith('uq_') and 'sqlite_autoindex_institutional_records' in plan
+
+
+def explain(query):
+    dialect = db.engine.dialect.name
+    statement = getattr(query, 'statement', query)
+    sql = str(statement.compile(dialect=db.engine.dialect, compile_kwargs={'literal_binds': True}))
+    prefix = 'EXPLAIN QUERY PLAN ' if dialect == 'sqlite' else 'EXPLAIN '
+    rows = db.session.connection().exec_driver_sql(prefix + sql).fetchall()
+    return '\n'.join(' '.join(str(col) for col in row) for row in rows)
+
+
+def main():
+    """Main function"""
+    print("=== BEEVS Index Check ===\n")
+    app = create_app()
+    with app.app_context():
+        if db.engine.dialect.name == 'sqlite' and args.database_url == 'sqlite://':
+            db.create_all()
+        if db.engine.dialect.name == 'postgresql':
+            db.session.connection().exec_driver_sql('SET enable_seqscan = off')
+
+        missing = 0
+        dialect = db.engine.dialect.name
+        for description, index_names, query in hot_queries():
+            if isinstance(index_names, str):
+                index_names = (index_names,)
+            plan = explain(query)
+            used = any(uses_index(plan, name) for name in index_names) and not full_scans(plan, dialect)
+            print(f"{'ok  ' if used else 'MISS'} {description} -> {' or '.join(index_names)}")
+            if args.verbose or not used:
+                print('     ' + plan.replace('\n', '\n     '))
+            missing += 0 if used else 1
+
+        db.session.rollback()
+        print(f"\nQueries not using their index: {missing}")
+        sys.exit(1 if missing else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Script to move candidate and voter photos from static/images into the
+content-addressed image store (beevs.images). Each legacy file is stored (with
+its resized variants) and the row's image_url is rewritten from
+<host>/static/images/<file> to <host>/media/<digest>.<ext>. Pass
+--delete-legacy to remove the static/images files once their rows are moved.
+"""
+
+import sys
+import os
+import argparse
+
+# Add the parent directory to the path to import the beevs module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from beevs import create_app, db
+from beevs.models import Candidate, Voter
+from beevs.images import image_store
+from beevs.exceptions import ValidationError
+
+
+def migrate_images(delete_legacy=False, batch_size=100):
+    """Store legacy images and rewrite their URLs"""
+    print("=== BEEVS Image Store Migration ===\n")
+
+    app = create_app()
+    with app.app_context():
+        moved = 0
+        failed = 0
+        legacy_paths = set()
+        for model in (Candidate, Voter):
+            query = model.query.filter(model.image_url.isnot(None), ~model.image_url.like('%/media/%'))
+            ids = [row[0] for row in query.with_entities(model.id).order_by(model.id.asc()).all()]
+            print(f"{model.__tablename__} to migrate: {len(ids)}")
+
+            for start in range(0, len(ids), batch_size):
+                for row in model.query.filter(model.id.in_(ids[start:start + batch_size])).all():
+                    path = image_store.resolve(row.image_url)
+                    if not os.path.exists(path):
+                        print(f"  {model.__tablename__} {row.id}: image file missing ({path})")
+                        failed += 1
+                        continue
+                    try:
+                        with open(path, 'rb') as f:
+                            name = image_store.save(f, path.rsplit('.', 1)[-1])
+                    except ValidationError:
+                        print(f"  {model.__tablename__} {row.id}: not a decodable image ({path})")
+                        failed += 1
+                        continue
+                    host = row.image_url.split('/static/images/', 1)[0] if '/static/images/' in row.image_url else ''
+                    row.image_url = image_store.url(name, host)
+                    legacy_paths.add(path)
+                    moved += 1
+                db.session.commit()
+
+        if delete_legacy:
+            for path in legacy_paths:
+                os.remove(path)
+            print(f"Removed {len(legacy_paths)} legacy files")
+
+        print(f"\nMigrated: {moved}, failed: {failed}")
+        return failed == 0
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Move photos from static/images into the image store')
+    parser.add_argument('--delete-legacy', action='store_true', help='Remove migrated files from static/images')
+    parser.add_argument('--batch-size', type=int, default=100, help='Rows committed per batch')
+    args = parser.parse_args()
+
+    try:
+        success = migrate_images(args.delete_legacy, args.batch_size)
+        sys.exit(0 if success else 1)
+    except KeyboardInterrupt:
+        print("\n\nOperation cancelled by user.")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\nUnexpected error: {str(e)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
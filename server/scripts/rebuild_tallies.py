@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Script to rebuild the live tally tables (candidate_tallies, election_tallies)
+from the votes table. Run it after restoring a backup, after editing votes by
+hand, or whenever --check reports drift.
+"""
+
+import sys
+import os
+import argparse
+
+# Add the parent directory to the path to import the beevs module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from beevs import create_app, db
+from beevs import tallies
+from beevs.models import CandidateTally, Election
+from beevs.results import vote_counts_query
+
+
+def find_drift(election_id):
+    """Candidates whose confirmed counter differs from a count of their Vote rows"""
+    counters = dict(db.session.query(CandidateTally.candidate_id, CandidateTally.confirmed_count).filter(
+        CandidateTally.election_id == election_id
+    ).all())
+    drift = []
+    for row in vote_counts_query(election_id).all():
+        candidate_id, counted = row[2], row[6]
+        if candidate_id is not None and counters.get(candidate_id, 0) != counted:
+            drift.append((candidate_id, counters.get(candidate_id), counted))
+    return drift
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Rebuild live vote tallies from the votes table')
+    parser.add_argument('--election-id', type=int, default=None, help='Only rebuild this election')
+    parser.add_argument('--check', action='store_true', help='Report drift without rewriting anything')
+    args = parser.parse_args()
+
+    print("=== BEEVS Tally Rebuild ===\n")
+    app = create_app()
+    with app.app_context():
+        if args.check:
+            election_ids = [args.election_id] if args.election_id else [e.id for e in Election.query.order_by(Election.id).all()]
+            drifted = 0
+            for election_id in election_ids:
+                for candidate_id, counter, counted in find_drift(election_id):
+                    print(f"  election {election_id} candidate {candidate_id}: counter {counter}, votes {counted}")
+                    drifted += 1
+            print(f"\nCandidates with drift: {drifted}")
+            sys.exit(1 if drifted else 0)
+
+        written = tallies.rebuild(args.election_id)
+        db.session.commit()
+        print(f"Rebuilt {written} candidate tallies")
+
+
+if __name__ == "__main__":
+    main()
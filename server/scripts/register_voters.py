@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Script to queue on-chain registration for every voter that is not registered yet.
+The relayer does this on its own once voters stop arriving; run this after a
+bulk import to batch immediately (ignores VOTER_BATCH_LINGER). The queued
+registerVoters transactions are submitted by the relayer.
+"""
+
+import sys
+import os
+import argparse
+
+# Add the parent directory to the path to import the beevs module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from beevs import create_app, db
+from beevs.models import OutboxTransaction
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Queue registerVoters batches for unregistered voters')
+    parser.add_argument('--submit', action='store_true', help='Also run one relayer submit/confirm pass')
+    args = parser.parse_args()
+
+    app = create_app()
+    from beevs.relayer import relayer
+
+    print("=== BEEVS Voter Registration Batching ===\n")
+    with app.app_context():
+        total = 0
+        while True:
+            queued = relayer.queue_voter_registrations(linger=0)
+            if not queued:
+                break
+            total += queued
+
+        pending = OutboxTransaction.query.filter_by(action='register_voters', status='queued').count()
+        print(f"Batches queued now: {total}")
+        print(f"registerVoters batches waiting for submission: {pending}")
+
+        if args.submit:
+            relayer.run_once()
+        db.session.remove()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Script to run the BEEVS transaction relayer as a dedicated process.
+Use it with RELAYER_BACKGROUND=false on the web workers, or alongside them;
+the nonce row lock keeps concurrent submitters safe either way.
+"""
+
+import sys
+import os
+import argparse
+
+# Add the parent directory to the path to import the beevs module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from beevs import create_app, db
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Run the BEEVS transaction relayer')
+    parser.add_argument('--once', action='store_true', help='Process one submit/confirm pass and exit')
+    args = parser.parse_args()
+
+    app = create_app()
+    from beevs.relayer import relayer
+
+    print("=== BEEVS Relayer ===\n")
+    try:
+        if args.once:
+            with app.app_context():
+                relayer.run_once()
+                db.session.remove()
+        else:
+            relayer.run_forever(app)
+    except KeyboardInterrupt:
+        print("\n\nRelayer stopped.")
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
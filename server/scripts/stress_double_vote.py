@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Concurrency stress test for the duplicate-vote guard (beevs.ballots).
+Seeds an election with voters, then for every voter fires --attempts ballots
+at once from separate threads, released together by a barrier, through the
+same has_voted / cast_ballot path as cast_vote. Afterwards it checks that
+every voter holds exactly one queued castBallot, that the audit Vote rows and
+election_tallies agree, and times repeat attempts answered by the in-memory
+bitmap against the database probe. Exits non-zero if any voter got two
+ballots. Runs against a temporary SQLite file by default; pass
+--database-url to use a real database (the fixture election is deleted
+afterwards).
+"""
+
+import sys
+import os
+import time
+import argparse
+import tempfile
+import threading
+import statistics
+
+# Add the parent directory to the path to import the beevs module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Stress the duplicate-vote guard with concurrent ballots')
+    parser.add_argument('--database-url', default=None, help='Database to use (default: a temporary SQLite file)')
+    parser.add_argument('--voters', type=int, default=200)
+    parser.add_argument('--attempts', type=int, default=8, help='Concurrent ballots per voter')
+    parser.add_argument('--posts', type=int, default=3, help='Posts on the ballot (one Vote row each)')
+    return parser.parse_args()
+
+
+args = parse_args()
+_tmp_db = None
+if args.database_url is None:
+    _tmp_db = tempfile.NamedTemporaryFile(prefix='beevs-stress-', suffix='.db', delete=False)
+    args.database_url = f'sqlite:///{_tmp_db.name}'
+os.environ['DATABASE_URL'] = args.database_url
+os.environ.setdefault('FACE_PRELOAD', 'false')
+os.environ.setdefault('RELAYER_BACKGROUND', 'false')
+
+from datetime import datetime, timedelta
+from sqlalchemy import func
+
+from beevs import create_app, db
+from beevs.models import Admin, AdminRole, Election, Post, Candidate, Voter, InstitutionalRecord, Vote, OutboxTransaction, ElectionTally
+from beevs.ballots import ballot_guard
+from beevs.exceptions import ValidationError
+from beevs import tallies
+
+
+def seed():
+    now = datetime.now()
+    admin = Admin.query.filter_by(role=AdminRole.SUPER_ADMIN).first()
+    created_admin = admin is None
+    if created_admin:
+        admin = Admin('Stress Test', 'stress-test@beevs.local', AdminRole.SUPER_ADMIN)
+        admin.password = os.urandom(16).hex()
+        db.session.add(admin)
+        db.session.flush()
+    election = Election(title='double-vote-stress', scheduled_for=now.date(), starts_at=now, ends_at=now + timedelta(days=1),
+                        super_admin_id=admin.id, onchain_id=1)
+    db.session.add(election)
+    db.session.flush()
+
+    candidates = []
+    for n in range(args.posts):
+        post = Post(title=f'Post {n}', election_id=election.id)
+        db.session.add(post)
+        db.session.flush()
+        candidate = Candidate(name=f'Candidate {n}', wallet_address=f'stress-{election.id}-{n}', election_id=election.id,
+                              post_id=post.id, onchain_id=n + 1)
+        db.session.add(candidate)
+        db.session.flush()
+        tallies.add_candidate(candidate)
+        candidates.append(candidate.id)
+
+    records = [InstitutionalRecord(name=f'Voter {n}', registration_number=f'STRESS/{n:06d}', department='d', faculty='f',
+                                   level=100, election_id=election.id) for n in range(args.voters)]
+    db.session.add_all(records)
+    db.session.flush()
+    voters = [Voter(name=r.name, wallet_address=f'stress-{election.id}-v{n}', election_id=election.id, student_record_id=r.id)
+              for n, r in enumerate(records)]
+    db.session.add_all(voters)
+    db.session.commit()
+    return election.id, candidates, [v.id for v in voters], (admin.id if created_admin else None)
+
+
+def attempt(app, election_id, candidate_ids, voter_id, barrier, outcomes):
+    with app.app_context():
+        try:
+            candidates = Candidate.query.filter(Candidate.id.in_(candidate_ids)).all()
+            barrier.wait()
+            if ballot_guard.has_voted(election_id, voter_id):
+                outcomes.append('rejected (check)')
+                return
+            ballot_guard.cast_ballot(election_id, voter_id, candidates, [election_id, f'0x{voter_id:064x}', candidate_ids])
+            outcomes.append('cast')
+        except ValidationError:
+            outcomes.append('rejected (unique index)')
+        except Exception as e:
+            outcomes.append(f'error: {type(e).__name__}: {e}')
+        finally:
+            db.session.remove()
+
+
+def time_repeats(election_id, voter_ids):
+    timings = []
+    for voter_id in voter_ids:
+        started = time.perf_counter()
+        ballot_guard.has_voted(election_id, voter_id)
+        timings.append((time.perf_counter() - started) * 1e6)
+    return statistics.mean(timings), statistics.median(timings)
+
+
+def main():
+    """Main function"""
+    print("=== BEEVS Duplicate Vote Stress Test ===\n")
+    app = create_app()
+    with app.app_context():
+        if db.engine.dialect.name == 'sqlite':
+            db.create_all()
+        election_id, candidate_ids, voter_ids, created_admin_id = seed()
+        dialect = db.engine.dialect.name
+
+    print(f"Database: {dialect}; {len(voter_ids)} voters x {args.attempts} concurrent ballots, {args.posts} posts\n")
+    outcomes = []
+    started = time.perf_counter()
+    for voter_id in voter_ids:
+        barrier = threading.Barrier(args.attempts)
+        threads = [threading.Thread(target=attempt, args=(app, election_id, candidate_ids, voter_id, barrier, outcomes))
+                   for _ in range(args.attempts)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    elapsed = time.perf_counter() - started
+
+    summary = {}
+    for outcome in outcomes:
+        summary[outcome] = summary.get(outcome, 0) + 1
+    for outcome, count in sorted(summary.items()):
+        print(f"  {outcome:<28} {count:>7}")
+    print(f"  {'elapsed':<28} {elapsed:>7.2f} s\n")
+
+    with app.app_context():
+        try:
+            ballots = dict(db.session.query(OutboxTransaction.voter_id, func.count(OutboxTransaction.id)).filter(
+                OutboxTransaction.election_id == election_id, OutboxTransaction.action == 'vote'
+            ).group_by(OutboxTransaction.voter_id).all())
+            vote_rows = db.session.query(func.count(Vote.id)).filter(Vote.election_id == election_id, Vote.action == 'vote').scalar()
+            ballot_count = tallies.ballot_count(election_id)
+            duplicates = {v: n for v, n in ballots.items() if n > 1}
+            missing = [v for v in voter_ids if v not in ballots]
+
+            print(f"Voters with one ballot:     {len(ballots) - len(duplicates)}")
+            print(f"Voters with duplicates:     {len(duplicates)}")
+            print(f"Voters without a ballot:    {len(missing)}")
+            print(f"Vote rows:                  {vote_rows} (expected {len(ballots) * args.posts})")
+            print(f"election_tallies count:     {ballot_count} (expected {len(ballots)})\n")
+
+            mean_bitmap, p50_bitmap = time_repeats(election_id, voter_ids)
+            ballot_guard.enabled = False
+            mean_db, p50_db = time_repeats(election_id, voter_ids)
+            ballot_guard.enabled = True
+            print(f"Repeat attempt, bitmap:     mean {mean_bitmap:8.1f} us   p50 {p50_bitmap:8.1f} us")
+            print(f"Repeat attempt, database:   mean {mean_db:8.1f} us   p50 {p50_db:8.1f} us")
+
+            ok = not duplicates and vote_rows == len(ballots) * args.posts and ballot_count == len(ballots)
+        finally:
+            Vote.query.filter_by(election_id=election_id).delete()
+            OutboxTransaction.query.filter_by(election_id=election_id).delete()
+            ElectionTally.query.filter_by(election_id=election_id).delete()
+            db.session.delete(db.session.get(Election, election_id))
+            if created_admin_id:
+                db.session.delete(db.session.get(Admin, created_admin_id))
+            db.session.commit()
+
+    if _tmp_db is not None:
+        os.remove(_tmp_db.name)
+    print(f"\n{'PASS' if ok else 'FAIL'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
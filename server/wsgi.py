@@ -0,0 +1,12 @@
+"""
+WSGI entry point for production servers: gunicorn wsgi:app
+"""
+
+import os
+
+# Serving process: load the face models at startup (scripts leave them unloaded)
+os.environ.setdefault('FACE_PRELOAD', 'true')
+
+from beevs import create_app
+
+app = create_app()